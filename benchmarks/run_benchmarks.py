@@ -0,0 +1,374 @@
+"""
+Benchmarks par facteur d'échelle du générateur et des indicateurs
+Projet: Mobilité Côte d'Ivoire - ANStat
+
+Chaque facteur d'échelle (nombre d'utilisateurs) est exécuté dans un
+processus séparé; pour chaque étape on mesure le temps d'exécution, le
+débit (lignes/s) et le pic de mémoire résidente (RSS).
+
+Usage:
+    python benchmarks/run_benchmarks.py run --scale 1k 10k
+    python benchmarks/run_benchmarks.py compare benchmarks/baseline.json \\
+        benchmarks/results/bench_<version>.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import yaml
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+# Facteurs d'échelle (style TPC): nombre d'utilisateurs
+SCALE_FACTORS = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+# Régression signalée au-delà de ce ratio (temps ou mémoire)
+DEFAULT_THRESHOLD = 0.20
+
+# Écarts ignorés sous ces valeurs absolues (bruit de mesure)
+MIN_SECONDS = 0.05
+MIN_RSS_MB = 20.0
+
+
+class PeakRSSMonitor:
+    """
+    Mesure le pic de mémoire résidente d'un intervalle de code
+
+    Échantillonne /proc/self/statm dans un thread; sur les systèmes sans
+    /proc, se rabat sur ru_maxrss (pic du processus depuis son démarrage).
+    """
+
+    STATM = Path("/proc/self/statm")
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.page_size = resource.getpagesize()
+        self.peak = 0
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def _current_rss(self) -> int:
+        if self.STATM.exists():
+            return int(self.STATM.read_text().split()[1]) * self.page_size
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def _sample(self) -> None:
+        while self._running:
+            self.peak = max(self.peak, self._current_rss())
+            time.sleep(self.interval)
+
+    def start(self) -> None:
+        self.peak = self._current_rss()
+        self._running = True
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> float:
+        """Arrête l'échantillonnage et retourne le pic en Mo"""
+        self._running = False
+        self._thread.join()
+        self.peak = max(self.peak, self._current_rss())
+        return self.peak / 1e6
+
+
+@contextmanager
+def measure(results: Dict, stage: str, rows: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Mesure une étape et enregistre temps, débit et pic RSS
+
+    Args:
+        results: Dictionnaire des résultats par étape (complété)
+        stage: Nom de l'étape
+        rows: Nombre de lignes traitées (peut être renseigné dans le bloc)
+    """
+    monitor = PeakRSSMonitor()
+    info = {"rows": rows}
+    monitor.start()
+    start = time.perf_counter()
+    try:
+        yield info
+    finally:
+        seconds = time.perf_counter() - start
+        peak_rss_mb = monitor.stop()
+        rows = info["rows"] or 0
+        results[stage] = {
+            "seconds": round(seconds, 4),
+            "rows": int(rows),
+            "rows_per_s": round(rows / seconds, 1) if seconds > 0 else None,
+            "peak_rss_mb": round(peak_rss_mb, 1),
+        }
+
+
+def _write_config(n_users: int, mobility_days: Optional[int], workdir: Path) -> Path:
+    """Écrit une configuration dérivée de config/data_params.yml"""
+    with open(ROOT / "config" / "data_params.yml", "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+
+    config["generation"]["n_users"] = n_users
+    config["mobility"]["max_days"] = mobility_days
+    config["paths"]["raw_dir"] = str(ROOT / config["paths"]["raw_dir"])
+    config["paths"]["output_dir"] = str(workdir / "synthetic")
+
+    config_path = workdir / "bench_config.yml"
+    with open(config_path, "w", encoding="utf-8") as f:
+        yaml.dump(config, f, allow_unicode=True)
+    return config_path
+
+
+def run_scale_factor(
+    n_users: int, mobility_days: Optional[int], cdr_days: int = 0
+) -> Dict:
+    """
+    Exécute toutes les étapes pour un nombre d'utilisateurs
+
+    Args:
+        n_users: Nombre d'utilisateurs
+        mobility_days: Jours de trajets générés (None = période complète)
+        cdr_days: Jours d'événements CDR bruts (0 = étapes CDR ignorées)
+
+    Returns:
+        Résultats par étape
+    """
+    import pandas as pd
+    from loguru import logger
+
+    logger.remove()
+
+    from data_generation.cdr_events import CDREventGenerator
+    from data_generation.synthetic_generator import SyntheticDataGenerator
+    from indicators.migration_flows import MigrationDetector
+    from indicators.mobility_metrics import MobilityMetrics
+    from indicators.poverty_index import PovertyIndexCalculator
+
+    stages: Dict[str, Dict] = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = _write_config(n_users, mobility_days, Path(tmp))
+
+        with measure(stages, "generator_init"):
+            generator = SyntheticDataGenerator(str(config_path))
+
+        with measure(stages, "generate_user_profiles", n_users):
+            users_df = generator.generate_user_profiles()
+
+        with measure(stages, "generate_poverty_data") as info:
+            poverty_df = generator.generate_poverty_data(users_df)
+            info["rows"] = len(poverty_df)
+
+        with measure(stages, "generate_migration_data") as info:
+            migration_df = generator.generate_migration_data(users_df)
+            info["rows"] = len(migration_df)
+
+        with measure(stages, "generate_mobility_data") as info:
+            mobility_df = generator.generate_mobility_data(users_df)
+            info["rows"] = len(mobility_df)
+
+        with measure(stages, "poverty_index_process", len(poverty_df)):
+            PovertyIndexCalculator().process(poverty_df)
+
+        with measure(stages, "migration_detector_process", len(migration_df)):
+            MigrationDetector().process(migration_df)
+
+        with measure(stages, "mobility_metrics_process", len(mobility_df)):
+            MobilityMetrics().process(mobility_df)
+
+        # Traces brutes: génération en flux puis détection des domiciles
+        if cdr_days:
+            cdr_path = Path(tmp) / "cdr_events.parquet"
+            with measure(stages, "generate_cdr_events") as info:
+                sink = CDREventGenerator(
+                    users_df, migration_df, n_days=cdr_days
+                ).write_parquet(cdr_path)
+                info["rows"] = sink.rows
+
+            events_df = pd.read_parquet(cdr_path)
+            with measure(stages, "detect_home_location", len(events_df)):
+                MigrationDetector().detect_home_location(events_df)
+
+    return stages
+
+
+def _run_in_subprocess(
+    n_users: int, mobility_days: Optional[int], cdr_days: int = 0
+) -> Dict:
+    """Exécute un facteur d'échelle dans un processus neuf (RSS isolé)"""
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(1) as pool:
+        return pool.apply(run_scale_factor, (n_users, mobility_days, cdr_days))
+
+
+def run(args: argparse.Namespace) -> Path:
+    """Exécute les benchmarks et écrit le fichier de résultats JSON"""
+    results = {
+        "version": datetime.now().strftime("%Y%m%d_%H%M%S"),
+        "created": datetime.now().isoformat(),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": multiprocessing.cpu_count(),
+        },
+        "mobility_days": args.mobility_days,
+        "cdr_days": args.cdr_days,
+        "scale_factors": {},
+    }
+
+    for scale in args.scale:
+        n_users = SCALE_FACTORS[scale]
+        print(f"=== Facteur d'échelle {scale} ({n_users} utilisateurs) ===")
+        stages = _run_in_subprocess(n_users, args.mobility_days, args.cdr_days)
+        results["scale_factors"][scale] = {"n_users": n_users, "stages": stages}
+
+        for stage, m in stages.items():
+            print(
+                f"  {stage:30s} {m['seconds']:9.3f} s {m['rows']:>10d} lignes "
+                f"{m['rows_per_s'] or 0:>12.0f} l/s {m['peak_rss_mb']:>8.1f} Mo"
+            )
+
+    output = (
+        Path(args.output)
+        if args.output
+        else (Path(__file__).parent / "results" / f"bench_{results['version']}.json")
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\n✓ Résultats écrits dans {output}")
+    return output
+
+
+def compare_results(
+    baseline: Dict, current: Dict, threshold: float = DEFAULT_THRESHOLD
+) -> List[Dict]:
+    """
+    Compare deux fichiers de résultats étape par étape
+
+    Args:
+        baseline: Résultats de référence
+        current: Résultats à évaluer
+        threshold: Dégradation relative tolérée (0.2 = +20%)
+
+    Returns:
+        Liste des comparaisons (une par facteur, étape et métrique)
+    """
+    rows = []
+    for scale, current_sf in current["scale_factors"].items():
+        baseline_sf = baseline["scale_factors"].get(scale)
+        if baseline_sf is None:
+            continue
+
+        for stage, cur in current_sf["stages"].items():
+            ref = baseline_sf["stages"].get(stage)
+            if ref is None:
+                continue
+
+            for metric, min_delta in (
+                ("seconds", MIN_SECONDS),
+                ("peak_rss_mb", MIN_RSS_MB),
+            ):
+                ratio = cur[metric] / ref[metric] if ref[metric] else float("inf")
+                rows.append(
+                    {
+                        "scale": scale,
+                        "stage": stage,
+                        "metric": metric,
+                        "baseline": ref[metric],
+                        "current": cur[metric],
+                        "ratio": round(ratio, 3),
+                        "regression": ratio > 1 + threshold
+                        and cur[metric] - ref[metric] > min_delta,
+                    }
+                )
+    return rows
+
+
+def compare(args: argparse.Namespace) -> int:
+    """Compare deux fichiers de résultats; code de sortie 1 si régression"""
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, "r", encoding="utf-8") as f:
+        current = json.load(f)
+
+    rows = compare_results(baseline, current, args.threshold)
+    for row in rows:
+        flag = "RÉGRESSION" if row["regression"] else ""
+        print(
+            f"  {row['scale']:>5s} {row['stage']:30s} {row['metric']:12s} "
+            f"{row['baseline']:>10.3f} -> {row['current']:>10.3f} "
+            f"(x{row['ratio']:.2f}) {flag}"
+        )
+
+    regressions = [row for row in rows if row["regression"]]
+    if regressions:
+        print(f"\n✗ {len(regressions)} régression(s) au-delà de +{args.threshold:.0%}")
+        return 1
+
+    print(f"\n✓ Aucune régression au-delà de +{args.threshold:.0%}")
+    return 0
+
+
+def main() -> int:
+    """Point d'entrée principal"""
+    parser = argparse.ArgumentParser(
+        description="Benchmarks par facteur d'échelle du générateur et des indicateurs"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Exécuter les benchmarks")
+    run_parser.add_argument(
+        "--scale",
+        nargs="+",
+        choices=list(SCALE_FACTORS),
+        default=["1k", "10k"],
+        help="Facteurs d'échelle à exécuter",
+    )
+    run_parser.add_argument(
+        "--mobility-days",
+        type=int,
+        default=7,
+        help="Jours de trajets générés (borne la taille du dataset mobilité)",
+    )
+    run_parser.add_argument(
+        "--cdr-days",
+        type=int,
+        default=0,
+        help="Jours d'événements CDR bruts (génération + domiciles, 0 = ignoré)",
+    )
+    run_parser.add_argument(
+        "--output", type=str, default=None, help="Fichier JSON de sortie"
+    )
+
+    compare_parser = subparsers.add_parser(
+        "compare", help="Comparer des résultats à une référence"
+    )
+    compare_parser.add_argument("baseline", help="Fichier JSON de référence")
+    compare_parser.add_argument("current", help="Fichier JSON à évaluer")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Dégradation relative tolérée (défaut: 0.2 = +20%%)",
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        run(args)
+        return 0
+    return compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
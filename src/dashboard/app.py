@@ -15,6 +15,13 @@ import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
 
+# Ajout du chemin src pour les imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data_generation.schema import find_latest_dataset, load_dataset
+from indicators.poverty_index import PovertyIndexCalculator
+from indicators.wealth_model import DEFAULT_MODEL_PATH
+
 # Import du module de mobilité temporelle
 from temporal_mobility import show_temporal_mobility_page
 
@@ -138,10 +145,9 @@ def load_data():
     datasets = {}
 
     for dataset_name in ["users", "poverty", "migration", "mobility"]:
-        files = list(data_dir.glob(f"{dataset_name}_*.csv"))
-        if files:
-            latest_file = max(files, key=lambda x: x.stat().st_mtime)
-            datasets[dataset_name] = pd.read_csv(latest_file)
+        latest_file = find_latest_dataset(data_dir, dataset_name)
+        if latest_file is not None:
+            datasets[dataset_name] = load_dataset(latest_file, dataset_name)
 
     return datasets
 
@@ -150,7 +156,8 @@ def load_data():
 def calculate_wealth_index(poverty_df: pd.DataFrame) -> pd.DataFrame:
     """
     Calcule l'indice de richesse à partir des données de pauvreté
-    Utilise les colonnes disponibles dans poverty_df
+    Utilise le modèle figé du pipeline s'il existe (sans réapprentissage),
+    sinon la moyenne des features normalisées de poverty_df
     """
     if poverty_df.empty:
         return pd.DataFrame()
@@ -185,20 +192,30 @@ def calculate_wealth_index(poverty_df: pd.DataFrame) -> pd.DataFrame:
 
     user_stats = poverty_df.groupby("user_id").agg(agg_dict).reset_index()
 
-    # Normalisation min-max pour chaque feature
-    for col in feature_cols:
-        col_min = user_stats[col].min()
-        col_max = user_stats[col].max()
-        if col_max > col_min:
-            user_stats[f"{col}_norm"] = (user_stats[col] - col_min) / (
-                col_max - col_min
-            )
-        else:
-            user_stats[f"{col}_norm"] = 0.5
-
-    # Score de richesse = moyenne des features normalisées
-    norm_cols = [f"{col}_norm" for col in feature_cols]
-    user_stats["wealth_index"] = user_stats[norm_cols].mean(axis=1)
+    if Path(DEFAULT_MODEL_PATH).exists():
+        # Notation par le modèle figé: indices comparables entre chargements
+        scored = PovertyIndexCalculator.from_model(DEFAULT_MODEL_PATH).transform(
+            poverty_df
+        )
+        user_stats = user_stats.merge(
+            scored[["user_id", "wealth_index"]], on="user_id", how="left"
+        )
+    else:
+        # Normalisation min-max pour chaque feature
+        for col in feature_cols:
+            col_min = user_stats[col].min()
+            col_max = user_stats[col].max()
+            if col_max > col_min:
+                user_stats[f"{col}_norm"] = (user_stats[col] - col_min) / (
+                    col_max - col_min
+                )
+            else:
+                user_stats[f"{col}_norm"] = 0.5
+
+        # Score de richesse = moyenne des features normalisées
+        norm_cols = [f"{col}_norm" for col in feature_cols]
+        user_stats["wealth_index"] = user_stats[norm_cols].mean(axis=1)
+        user_stats = user_stats.drop(columns=norm_cols)
 
     # Quintiles de richesse
     user_stats["wealth_quintile"] = pd.qcut(
@@ -212,9 +229,6 @@ def calculate_wealth_index(poverty_df: pd.DataFrame) -> pd.DataFrame:
         ["Q1_Très pauvre", "Q2_Pauvre"]
     )
 
-    # Supprimer les colonnes normalisées intermédiaires
-    user_stats = user_stats.drop(columns=norm_cols)
-
     return user_stats
 
 
@@ -876,7 +890,7 @@ def show_congestion_analysis(mobility_df: pd.DataFrame):
     # Calculer l'indice de congestion
     mobility_df = mobility_df.copy()
     mobility_df["free_flow_speed"] = (
-        mobility_df["transport_mode"].map(free_flow_speeds).fillna(30)
+        mobility_df["transport_mode"].map(free_flow_speeds).astype(float).fillna(30)
     )
     mobility_df["congestion_index"] = mobility_df["free_flow_speed"] / mobility_df[
         "speed_kmh"
@@ -6,106 +6,21 @@ Dépendances supplémentaires:
     pip install pydeck streamlit-folium
 """
 
-import json
-from datetime import datetime, timedelta
+import sys
+from datetime import datetime
 from pathlib import Path
 
-import numpy as np
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
 
+# Ajout du chemin src pour les imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
-def generate_temporal_mobility_data(
-    n_days: int = 365, n_users: int = 1000
-) -> pd.DataFrame:
-    """
-    Génère des données de mobilité temporelles simulées pour toute l'année.
-    En production, ces données viendraient des CDR réels.
-    """
-    np.random.seed(42)
-
-    # Localités principales avec coordonnées
-    localities = {
-        "Abidjan": {"lat": 5.36, "lon": -4.01, "weight": 0.35},
-        "Bouaké": {"lat": 7.69, "lon": -5.03, "weight": 0.12},
-        "Yamoussoukro": {"lat": 6.82, "lon": -5.28, "weight": 0.08},
-        "Korhogo": {"lat": 9.46, "lon": -5.63, "weight": 0.07},
-        "San-Pédro": {"lat": 4.75, "lon": -6.64, "weight": 0.06},
-        "Daloa": {"lat": 6.88, "lon": -6.45, "weight": 0.05},
-        "Man": {"lat": 7.41, "lon": -7.55, "weight": 0.05},
-        "Gagnoa": {"lat": 6.13, "lon": -5.95, "weight": 0.04},
-        "Abengourou": {"lat": 6.73, "lon": -3.50, "weight": 0.04},
-        "Divo": {"lat": 5.84, "lon": -5.36, "weight": 0.04},
-        "Bondoukou": {"lat": 8.04, "lon": -2.80, "weight": 0.03},
-        "Odienné": {"lat": 9.51, "lon": -7.57, "weight": 0.03},
-        "Séguéla": {"lat": 7.96, "lon": -6.67, "weight": 0.02},
-        "Ferkessédougou": {"lat": 9.59, "lon": -5.19, "weight": 0.02},
-    }
-
-    records = []
-    start_date = datetime(2025, 1, 1)
-
-    for day in range(n_days):
-        current_date = start_date + timedelta(days=day)
-        month = current_date.month
-        day_of_week = current_date.weekday()
-
-        # Facteurs saisonniers
-        # Plus de mobilité vers Abidjan en septembre-octobre (rentrée)
-        # Plus de mobilité vers les régions en décembre (fêtes)
-        seasonal_factor = 1.0
-        if month in [9, 10]:  # Rentrée
-            seasonal_factor = 1.3
-        elif month == 12:  # Fêtes
-            seasonal_factor = 1.5
-        elif month in [7, 8]:  # Vacances
-            seasonal_factor = 1.2
-        elif month in [4, 5, 6]:  # Saison des pluies
-            seasonal_factor = 0.8
-
-        # Moins de mobilité le weekend
-        if day_of_week >= 5:
-            seasonal_factor *= 0.7
-
-        # Nombre de mouvements ce jour
-        n_movements = int(np.random.poisson(50 * seasonal_factor))
-
-        for _ in range(n_movements):
-            # Choisir origine et destination
-            locs = list(localities.keys())
-            weights = [localities[l]["weight"] for l in locs]
-
-            origin = np.random.choice(locs, p=weights)
-            # Destination biaisée vers Abidjan
-            dest_weights = weights.copy()
-            dest_weights[0] *= 2  # Abidjan plus attractif
-            dest_weights = [w / sum(dest_weights) for w in dest_weights]
-            destination = np.random.choice(locs, p=dest_weights)
-
-            if origin != destination:
-                records.append(
-                    {
-                        "date": current_date,
-                        "month": month,
-                        "week": current_date.isocalendar()[1],
-                        "day_of_week": day_of_week,
-                        "origin": origin,
-                        "origin_lat": localities[origin]["lat"],
-                        "origin_lon": localities[origin]["lon"],
-                        "destination": destination,
-                        "dest_lat": localities[destination]["lat"],
-                        "dest_lon": localities[destination]["lon"],
-                        "flow_count": np.random.randint(1, 20),
-                        "migration_type": np.random.choice(
-                            ["Travail", "Études", "Famille", "Commerce", "Autre"],
-                            p=[0.35, 0.20, 0.25, 0.12, 0.08],
-                        ),
-                    }
-                )
+from data_generation.temporal_flows import load_temporal_flows
 
-    return pd.DataFrame(records)
+# Artefact Parquet des flux temporels (régénéré si absent)
+TEMPORAL_FLOWS_PATH = "data/processed/temporal_flows.parquet"
 
 
 def show_temporal_mobility_page():
@@ -118,10 +33,10 @@ def show_temporal_mobility_page():
         "Visualisez l'évolution des flux de mobilité tout au long de l'année 2025."
     )
 
-    # Charger ou générer les données
+    # Charger l'artefact Parquet (généré au premier lancement)
     @st.cache_data
     def load_temporal_data():
-        return generate_temporal_mobility_data()
+        return load_temporal_flows(TEMPORAL_FLOWS_PATH)
 
     df = load_temporal_data()
 
@@ -3,6 +3,7 @@ Data Service - Chargement et traitement des données
 Couche métier pour le dashboard Django
 """
 import os
+import sys
 from pathlib import Path
 from typing import Dict, Optional, Any
 from functools import lru_cache
@@ -10,6 +11,13 @@ import pandas as pd
 import numpy as np
 from django.conf import settings
 
+# Ajout du chemin src pour les imports
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from data_generation.schema import find_latest_dataset, load_dataset
+from indicators.poverty_index import PovertyIndexCalculator
+from indicators.wealth_model import DEFAULT_MODEL_PATH
+
 
 class DataService:
     """Service de gestion des données du dashboard"""
@@ -59,6 +67,7 @@ class DataService:
     
     def __init__(self):
         self.data_dir = getattr(settings, 'DATA_DIR', Path('data/synthetic'))
+        self.wealth_model_path = Path(getattr(settings, 'WEALTH_MODEL_PATH', DEFAULT_MODEL_PATH))
         self._cache = {}
     
     def get_data_dir(self) -> Path:
@@ -77,10 +86,9 @@ class DataService:
             return datasets
         
         for dataset_name in ['users', 'poverty', 'migration', 'mobility']:
-            files = list(data_path.glob(f"{dataset_name}_*.csv"))
-            if files:
-                latest_file = max(files, key=lambda x: x.stat().st_mtime)
-                datasets[dataset_name] = pd.read_csv(latest_file)
+            latest_file = find_latest_dataset(data_path, dataset_name)
+            if latest_file is not None:
+                datasets[dataset_name] = load_dataset(latest_file, dataset_name)
         
         self._cache = datasets
         return datasets
@@ -146,7 +154,7 @@ class DataService:
         }
     
     def calculate_wealth_index(self, poverty_df: pd.DataFrame) -> pd.DataFrame:
-        """Calcule l'indice de richesse"""
+        """Calcule l'indice de richesse (modèle figé du pipeline s'il existe)"""
         if poverty_df.empty:
             return pd.DataFrame()
         
@@ -173,18 +181,24 @@ class DataService:
         
         user_stats = poverty_df.groupby('user_id').agg(agg_dict).reset_index()
         
-        # Normalisation min-max
-        for col in feature_cols:
-            col_min = user_stats[col].min()
-            col_max = user_stats[col].max()
-            if col_max > col_min:
-                user_stats[f'{col}_norm'] = (user_stats[col] - col_min) / (col_max - col_min)
-            else:
-                user_stats[f'{col}_norm'] = 0.5
-        
-        # Score de richesse
-        norm_cols = [f'{col}_norm' for col in feature_cols]
-        user_stats['wealth_index'] = user_stats[norm_cols].mean(axis=1)
+        if self.wealth_model_path.exists():
+            # Notation par le modèle figé (sans réapprentissage)
+            scored = PovertyIndexCalculator.from_model(self.wealth_model_path).transform(poverty_df)
+            user_stats = user_stats.merge(scored[['user_id', 'wealth_index']], on='user_id', how='left')
+        else:
+            # Normalisation min-max
+            for col in feature_cols:
+                col_min = user_stats[col].min()
+                col_max = user_stats[col].max()
+                if col_max > col_min:
+                    user_stats[f'{col}_norm'] = (user_stats[col] - col_min) / (col_max - col_min)
+                else:
+                    user_stats[f'{col}_norm'] = 0.5
+            
+            # Score de richesse
+            norm_cols = [f'{col}_norm' for col in feature_cols]
+            user_stats['wealth_index'] = user_stats[norm_cols].mean(axis=1)
+            user_stats = user_stats.drop(columns=norm_cols)
         
         # Quintiles
         user_stats['wealth_quintile'] = pd.qcut(
@@ -193,7 +207,6 @@ class DataService:
         )
         
         user_stats['is_poor'] = user_stats['wealth_quintile'].isin(['Q1_Très pauvre', 'Q2_Pauvre'])
-        user_stats = user_stats.drop(columns=norm_cols)
         
         return user_stats
     
@@ -332,7 +345,7 @@ class DataService:
         
         # Calculer l'indice de congestion
         mobility_df = mobility_df.copy()
-        mobility_df['free_flow_speed'] = mobility_df['transport_mode'].map(self.FREE_FLOW_SPEEDS).fillna(30)
+        mobility_df['free_flow_speed'] = mobility_df['transport_mode'].map(self.FREE_FLOW_SPEEDS).astype(float).fillna(30)
         mobility_df['congestion_index'] = mobility_df['free_flow_speed'] / mobility_df['speed_kmh'].clip(lower=1)
         mobility_df['congestion_index'] = mobility_df['congestion_index'].clip(upper=5)
         
@@ -0,0 +1,172 @@
+"""
+Calage de la population synthétique sur des marges réelles
+Projet: Mobilité Côte d'Ivoire - ANStat
+
+Les attributs des profils (région, milieu, âge, sexe, occupation,
+téléphone, abonnement) sont tirés conjointement depuis un tableau de
+contingence complet. L'a priori est le modèle indépendant de la config ;
+il est ajusté par IPF aux tables de marges fournies (CSV de type
+recensement, ex: population par région et groupe d'âge), puis les
+utilisateurs sont tirés par cellule en un seul lot.
+
+Format des CSV: une colonne par dimension couverte (noms des colonnes du
+dataset users) et une colonne d'effectifs (défaut: population).
+"""
+
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+# Ajout du chemin src pour les imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.alias_sampler import AliasSampler
+from utils.ipf import Marginal, ipf
+
+
+def load_marginal(path: str, value_column: str = "population") -> pd.DataFrame:
+    """
+    Charge une table de marges (CSV)
+
+    Args:
+        path: Fichier CSV (colonnes de dimensions + colonne d'effectifs)
+        value_column: Colonne des effectifs
+
+    Returns:
+        DataFrame des marges (dimensions en texte)
+    """
+    table = pd.read_csv(path)
+    if value_column not in table.columns:
+        raise ValueError(f"Colonne d'effectifs '{value_column}' absente de {path}")
+    dims = [col for col in table.columns if col != value_column]
+    return table.astype({col: str for col in dims})
+
+
+class PopulationCalibrator:
+    """
+    Tableau de contingence des attributs, calé par IPF et échantillonnable
+
+    Chaque dimension a une liste ordonnée de modalités ; les tirages
+    renvoient les codes (index dans ces listes). Seules les cellules non
+    nulles sont conservées pour l'échantillonnage (tables d'alias).
+    """
+
+    def __init__(
+        self,
+        dimensions: Dict[str, Sequence],
+        seed: Optional[np.ndarray] = None,
+    ):
+        """
+        Initialise le tableau
+
+        Args:
+            dimensions: {nom: modalités} dans l'ordre des axes
+            seed: A priori de forme (len(modalités) par dimension)
+                (défaut: uniforme)
+        """
+        self.names = list(dimensions)
+        self.categories = {name: list(values) for name, values in dimensions.items()}
+        shape = tuple(len(values) for values in self.categories.values())
+        self.seed = np.ones(shape) if seed is None else np.asarray(seed, dtype=float)
+        if self.seed.shape != shape:
+            raise ValueError(f"A priori de forme {self.seed.shape}, attendu {shape}")
+
+        self.marginals: List[Marginal] = []
+        self.probabilities = self.seed / self.seed.sum()
+        self._sampler: Optional[AliasSampler] = None
+        self._cells: Optional[np.ndarray] = None
+
+    def add_marginal(
+        self, table: pd.DataFrame, value_column: str = "population"
+    ) -> None:
+        """
+        Ajoute une table de marges cible
+
+        Les modalités absentes de la table ont une cible nulle.
+
+        Args:
+            table: Colonnes de dimensions + colonne d'effectifs
+            value_column: Colonne des effectifs
+        """
+        dims = [col for col in table.columns if col != value_column]
+        unknown = [col for col in dims if col not in self.categories]
+        if unknown:
+            raise ValueError(
+                f"Dimensions inconnues: {unknown} (disponibles: {self.names})"
+            )
+
+        dims = sorted(dims, key=self.names.index)
+        axes = tuple(self.names.index(col) for col in dims)
+        codes = []
+        for col in dims:
+            index = pd.Index(self.categories[col]).get_indexer(table[col])
+            if (index < 0).any():
+                bad = table.loc[index < 0, col].unique()[:5]
+                raise ValueError(f"Modalités inconnues pour {col}: {list(bad)}")
+            codes.append(index)
+
+        target = np.zeros(tuple(len(self.categories[col]) for col in dims))
+        np.add.at(target, tuple(codes), table[value_column].to_numpy(dtype=float))
+        self.marginals.append((axes, target))
+
+    def fit(self, max_iter: int = 100, tol: float = 1e-6) -> np.ndarray:
+        """
+        Ajuste les probabilités jointes aux marges (IPF)
+
+        Args:
+            max_iter: Nombre maximal de cycles
+            tol: Écart absolu toléré sur les marges
+
+        Returns:
+            Tableau des probabilités jointes
+        """
+        self.probabilities, n_iter = ipf(self.seed, self.marginals, max_iter, tol)
+        self._sampler = self._cells = None
+        logger.info(
+            f"✓ Calage IPF: {self.probabilities.size} cellules, "
+            f"{len(self.marginals)} marges, {n_iter} cycles"
+        )
+        return self.probabilities
+
+    def sample(self, rng: np.random.Generator, n: int) -> Dict[str, np.ndarray]:
+        """
+        Tire n individus dans les cellules du tableau
+
+        Args:
+            rng: Générateur aléatoire
+            n: Nombre d'individus
+
+        Returns:
+            Dictionnaire {dimension: codes des modalités}
+        """
+        if self._sampler is None:
+            flat = self.probabilities.ravel()
+            self._cells = np.flatnonzero(flat)
+            self._sampler = AliasSampler(flat[self._cells])
+
+        cells = self._cells[self._sampler.sample(rng, n)]
+        codes = np.unravel_index(cells, self.probabilities.shape)
+        return dict(zip(self.names, codes))
+
+    def marginal(self, names: Sequence[str]) -> pd.Series:
+        """
+        Marge ajustée sur un sous-ensemble de dimensions
+
+        Args:
+            names: Dimensions conservées
+
+        Returns:
+            Series des probabilités indexée par les modalités
+        """
+        axes = [self.names.index(name) for name in names]
+        other = tuple(ax for ax in range(len(self.names)) if ax not in axes)
+        table = self.probabilities.sum(axis=other)
+        table = table.transpose(np.argsort(np.argsort(axes)))
+        index = pd.MultiIndex.from_product(
+            [self.categories[name] for name in names], names=list(names)
+        )
+        return pd.Series(table.ravel(), index=index)
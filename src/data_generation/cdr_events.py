@@ -0,0 +1,436 @@
+"""
+Générateur d'événements CDR bruts (appels, SMS, données)
+Projet: Mobilité Côte d'Ivoire - ANStat
+
+Ce module produit des traces positionnées par utilisateur (user_id,
+timestamp, latitude, longitude) au format attendu par
+MigrationDetector.detect_home_location. Chaque utilisateur a un domicile
+(positions nocturnes) et, s'il travaille, un lieu de travail (positions
+de journée en semaine) ; une migration déplace ces deux ancres à partir
+de sa date. Les événements sont générés par blocs utilisateurs × jours et
+écrits en Parquet au fil de l'eau : la mémoire dépend de la taille des
+blocs, pas du volume total.
+"""
+
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+# Ajout du chemin src pour les imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data_generation.schema import apply_schema
+from utils.alias_sampler import AliasSampler
+from utils.antenna_network import AntennaNetwork
+from utils.geodesy import destination_point
+from utils.parquet_sink import ParquetSink
+
+# Intensité relative des événements par heure (0h-23h): creux nocturne,
+# pics en fin de matinée et en début de soirée
+HOURLY_PROFILE = np.array(
+    [0.5, 0.3, 0.2, 0.2, 0.3, 0.8, 2.0, 3.5, 4.5, 5.0, 5.5, 5.5]
+    + [5.5, 5.0, 5.0, 5.0, 5.5, 6.0, 6.5, 6.5, 6.0, 5.0, 3.0, 1.5]
+)
+HOURLY_PROBS = HOURLY_PROFILE / HOURLY_PROFILE.sum()
+
+# Nuit: 20h-8h (fenêtre de détection du domicile)
+NIGHT_START, NIGHT_END = 20, 8
+
+WEEKEND_FACTOR = 0.85
+
+# Types d'événements et probabilités par type de téléphone
+EVENT_TYPES = ["call", "sms", "data"]
+EVENT_TYPE_PROBS = {
+    "basic": [0.60, 0.40, 0.00],
+    "feature": [0.45, 0.35, 0.20],
+    "smartphone": [0.30, 0.20, 0.50],
+}
+PHONE_TYPES = list(EVENT_TYPE_PROBS)
+
+# Tables d'alias (heure; type d'événement par type de téléphone)
+HOUR_SAMPLER = AliasSampler(HOURLY_PROBS)
+EVENT_TYPE_SAMPLER = AliasSampler([EVENT_TYPE_PROBS[p] for p in PHONE_TYPES])
+
+# Activité relative par type de téléphone
+PHONE_ACTIVITY = {"basic": 0.6, "feature": 0.9, "smartphone": 1.4}
+
+# Occupations avec un lieu de travail distinct du domicile
+WORKING_OCCUPATIONS = ["employee", "student", "trader", "informal_sector", "farmer"]
+
+# Lieu de l'événement selon le moment: (domicile, travail) ; le reste
+# est un point « ailleurs » autour du domicile
+PLACE_PROBS = {
+    "night": (0.90, 0.00),
+    "workday": (0.25, 0.60),
+    "free": (0.60, 0.00),
+}
+
+
+class CDREventGenerator:
+    """
+    Génère des événements CDR positionnés pour une population
+
+    Le nombre d'événements par utilisateur et par jour est tiré d'une loi
+    de Poisson (activité selon le téléphone et la richesse), l'heure selon
+    HOURLY_PROBS, et le lieu selon l'heure, le jour et l'occupation. Tous
+    les tirages d'un bloc sont vectorisés; chaque bloc a son propre flux
+    aléatoire dérivé du seed.
+    """
+
+    def __init__(
+        self,
+        users_df: pd.DataFrame,
+        migration_df: Optional[pd.DataFrame] = None,
+        start_date: str = "2024-01-01",
+        n_days: int = 30,
+        events_per_day: float = 20.0,
+        work_radius_km: float = 5.0,
+        position_noise_deg: float = 0.003,
+        seed: int = 42,
+        network: Optional[AntennaNetwork] = None,
+    ):
+        """
+        Initialise le générateur
+
+        Args:
+            users_df: Profils utilisateurs (user_id, home_lat, home_lon,
+                occupation, phone_type, initial_wealth_score)
+            migration_df: Événements de migration (user_id, timestamp,
+                current_lat, current_lon), optionnel
+            start_date: Premier jour simulé
+            n_days: Nombre de jours
+            events_per_day: Nombre moyen d'événements par utilisateur et par jour
+            work_radius_km: Distance moyenne domicile-travail
+            position_noise_deg: Bruit de positionnement (écart-type en degrés)
+            seed: Graine aléatoire
+            network: Réseau d'antennes; ajoute la colonne antenna_id
+                (antenne la plus proche de chaque événement), optionnel
+        """
+        self.users = users_df.reset_index(drop=True)
+        self.start_date = pd.Timestamp(start_date).normalize()
+        self.n_days = int(n_days)
+        self.events_per_day = float(events_per_day)
+        self.work_radius_km = float(work_radius_km)
+        self.position_noise_deg = float(position_noise_deg)
+        self.seed = seed
+        self.network = network
+
+        # Date et destination de migration par utilisateur (au plus une)
+        n = len(self.users)
+        self.migration_time = np.full(n, np.datetime64("NaT"), dtype="datetime64[s]")
+        self.migration_lat = np.full(n, np.nan)
+        self.migration_lon = np.full(n, np.nan)
+        if migration_df is not None and len(migration_df) > 0:
+            moves = migration_df.sort_values("timestamp").drop_duplicates("user_id")
+            pos = pd.Index(self.users["user_id"]).get_indexer(moves["user_id"])
+            found = pos >= 0
+            pos = pos[found]
+            self.migration_time[pos] = pd.to_datetime(
+                moves["timestamp"].to_numpy()[found]
+            ).to_numpy(dtype="datetime64[s]")
+            self.migration_lat[pos] = moves["current_lat"].to_numpy(dtype=float)[found]
+            self.migration_lon[pos] = moves["current_lon"].to_numpy(dtype=float)[found]
+
+    @classmethod
+    def from_config(
+        cls,
+        config: Dict,
+        users_df: pd.DataFrame,
+        migration_df: Optional[pd.DataFrame] = None,
+        network: Optional[AntennaNetwork] = None,
+    ) -> "CDREventGenerator":
+        """
+        Construit un générateur depuis la configuration du projet
+
+        Args:
+            config: Configuration complète (sections generation, mobility, cdr)
+            users_df: Profils utilisateurs
+            migration_df: Événements de migration (optionnel)
+            network: Réseau d'antennes (optionnel)
+
+        Returns:
+            CDREventGenerator configuré
+        """
+        cdr = config.get("cdr", {})
+        return cls(
+            users_df,
+            migration_df,
+            start_date=config["generation"]["start_date"],
+            n_days=cdr.get("n_days") or config["generation"]["days_to_generate"],
+            events_per_day=cdr.get("events_per_day", 20.0),
+            work_radius_km=config["mobility"].get("mobility_radius_mean", 5.0),
+            position_noise_deg=cdr.get("position_noise_deg", 0.003),
+            seed=config["generation"]["random_seed"],
+            network=network,
+        )
+
+    def _rng(self, *key: int) -> np.random.Generator:
+        """Flux aléatoire d'un bloc (clé: index du bloc utilisateurs, du bloc jours)"""
+        return np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key=key))
+
+    def _anchors(
+        self, lat: np.ndarray, lon: np.ndarray, works: np.ndarray, rng
+    ) -> Dict[str, np.ndarray]:
+        """Domicile et lieu de travail (domicile si pas de travail)"""
+        distance = np.maximum(0.3, rng.exponential(self.work_radius_km, len(lat)))
+        work_lat, work_lon = destination_point(
+            lat, lon, distance, rng.uniform(0, 360, len(lat))
+        )
+        return {
+            "home_lat": lat,
+            "home_lon": lon,
+            "work_lat": np.where(works, work_lat, lat),
+            "work_lon": np.where(works, work_lon, lon),
+        }
+
+    def generate_block(
+        self, user_start: int, user_stop: int, day_start: int, day_stop: int
+    ) -> pd.DataFrame:
+        """
+        Génère les événements d'un bloc utilisateurs × jours
+
+        Args:
+            user_start, user_stop: Plage d'utilisateurs (positions)
+            day_start, day_stop: Plage de jours (depuis start_date)
+
+        Returns:
+            DataFrame des événements, triés par utilisateur puis horodatage
+        """
+        users = self.users.iloc[user_start:user_stop]
+        n_users, n_days = len(users), day_stop - day_start
+        chunk = user_start
+
+        # Ancres (avant et après migration), identiques pour tous les blocs
+        # de jours d'un même bloc d'utilisateurs
+        anchor_rng = self._rng(chunk)
+        works = np.isin(
+            np.asarray(users["occupation"], dtype=object), WORKING_OCCUPATIONS
+        )
+        before = self._anchors(
+            users["home_lat"].to_numpy(dtype=float),
+            users["home_lon"].to_numpy(dtype=float),
+            works,
+            anchor_rng,
+        )
+        moved_lat = self.migration_lat[user_start:user_stop]
+        moved_lon = self.migration_lon[user_start:user_stop]
+        has_moved = ~np.isnan(moved_lat)
+        after = self._anchors(
+            np.where(has_moved, moved_lat, before["home_lat"]),
+            np.where(has_moved, moved_lon, before["home_lon"]),
+            works,
+            anchor_rng,
+        )
+
+        rng = self._rng(chunk, day_start)
+
+        # Nombre d'événements par utilisateur et par jour
+        phone_type = np.asarray(users["phone_type"], dtype=object)
+        activity = (
+            pd.Series(phone_type).map(PHONE_ACTIVITY).astype(float).fillna(1.0)
+        ).to_numpy() * (0.5 + users["initial_wealth_score"].to_numpy(dtype=float))
+        dates = self.start_date + pd.to_timedelta(
+            np.arange(day_start, day_stop), unit="D"
+        )
+        is_weekend = dates.weekday.to_numpy() >= 5
+        day_factor = np.where(is_weekend, WEEKEND_FACTOR, 1.0)
+        counts = rng.poisson(
+            self.events_per_day * activity[:, None] * day_factor[None, :]
+        )
+
+        # Une ligne par événement (ordre utilisateur puis jour)
+        flat = counts.ravel()
+        cell = np.repeat(np.arange(n_users * n_days), flat)
+        user = cell // n_days
+        day = cell % n_days
+        n = len(cell)
+
+        hour = HOUR_SAMPLER.sample(rng, n)
+        second = rng.integers(0, 3600, n)
+        timestamp = dates.to_numpy().astype("datetime64[s]")[day] + (
+            hour * 3600 + second
+        ).astype("timedelta64[s]")
+
+        # Ancres en vigueur à l'instant de l'événement
+        migrated = timestamp >= self.migration_time[user_start:user_stop][user]
+        anchor = {
+            key: np.where(migrated, after[key][user], before[key][user])
+            for key in before
+        }
+
+        # Lieu: domicile, travail ou ailleurs selon le moment
+        is_night = (hour >= NIGHT_START) | (hour < NIGHT_END)
+        is_workday = ~is_night & ~is_weekend[day] & works[user]
+        p_home = np.where(
+            is_night,
+            PLACE_PROBS["night"][0],
+            np.where(is_workday, PLACE_PROBS["workday"][0], PLACE_PROBS["free"][0]),
+        )
+        p_work = np.where(is_workday, PLACE_PROBS["workday"][1], 0.0)
+        u = rng.random(n)
+        at_home = u < p_home
+        at_work = ~at_home & (u < p_home + p_work)
+        elsewhere = ~at_home & ~at_work
+
+        lat = np.where(at_work, anchor["work_lat"], anchor["home_lat"])
+        lon = np.where(at_work, anchor["work_lon"], anchor["home_lon"])
+        n_else = int(elsewhere.sum())
+        lat[elsewhere], lon[elsewhere] = destination_point(
+            lat[elsewhere],
+            lon[elsewhere],
+            rng.exponential(self.work_radius_km, n_else),
+            rng.uniform(0, 360, n_else),
+        )
+        lat = lat + rng.normal(0, self.position_noise_deg, n)
+        lon = lon + rng.normal(0, self.position_noise_deg, n)
+
+        # Type d'événement selon le téléphone (groupe; inconnu => "feature")
+        phone_code = pd.Index(PHONE_TYPES).get_indexer(phone_type)
+        phone_code[phone_code < 0] = PHONE_TYPES.index("feature")
+        event_code = EVENT_TYPE_SAMPLER.sample(rng, groups=phone_code[user])
+        duration = np.where(
+            event_code == 0, rng.gamma(1.5, 60, n).astype(np.int64) + 1, 0
+        )
+
+        # Tri chronologique par utilisateur
+        order = np.lexsort((timestamp, user))
+        user_ids = np.asarray(users["user_id"], dtype=object)
+
+        df = pd.DataFrame(
+            {
+                "user_id": user_ids[user[order]],
+                "timestamp": timestamp[order],
+                "latitude": np.round(lat[order], 6),
+                "longitude": np.round(lon[order], 6),
+                "event_type": pd.Categorical.from_codes(event_code[order], EVENT_TYPES),
+                "duration_sec": duration[order],
+            }
+        )
+        if self.network is not None:
+            df["antenna_id"] = self.network.assign(df["latitude"], df["longitude"])
+        return apply_schema(df, "cdr")
+
+    def iter_blocks(
+        self, chunk_size: int = 20000, days_per_block: int = 7
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Parcourt les blocs d'événements (utilisateurs puis jours)
+
+        Args:
+            chunk_size: Utilisateurs par bloc
+            days_per_block: Jours par bloc
+
+        Yields:
+            DataFrame des événements de chaque bloc
+        """
+        for user_start in range(0, len(self.users), chunk_size):
+            user_stop = min(user_start + chunk_size, len(self.users))
+            for day_start in range(0, self.n_days, days_per_block):
+                day_stop = min(day_start + days_per_block, self.n_days)
+                yield self.generate_block(user_start, user_stop, day_start, day_stop)
+
+    def write_parquet(
+        self,
+        path: str,
+        chunk_size: int = 20000,
+        days_per_block: int = 7,
+        partition_cols: Optional[List[str]] = None,
+        compression: str = "zstd",
+    ) -> ParquetSink:
+        """
+        Écrit tous les événements en Parquet, bloc par bloc
+
+        Args:
+            path: Fichier Parquet (ou répertoire si partitionné)
+            chunk_size: Utilisateurs par bloc
+            days_per_block: Jours par bloc
+            partition_cols: Colonnes de partitionnement (optionnel)
+            compression: Codec Parquet
+
+        Returns:
+            ParquetSink fermé (chemin, lignes, nombre de blocs)
+        """
+        with ParquetSink(path, partition_cols, compression) as sink:
+            for block in self.iter_blocks(chunk_size, days_per_block):
+                sink.write(block)
+                logger.debug(f"  {sink.rows} événements écrits")
+
+        logger.info(f"✓ {sink.rows} événements CDR écrits dans {path}")
+        return sink
+
+
+def main():
+    """Point d'entrée: génère des profils et leurs événements CDR en Parquet"""
+    import argparse
+
+    import yaml
+
+    from data_generation.schema import load_dataset
+    from data_generation.synthetic_generator import SyntheticDataGenerator
+
+    parser = argparse.ArgumentParser(
+        description="Génération d'événements CDR bruts (Parquet par blocs)"
+    )
+    parser.add_argument(
+        "--config",
+        type=str,
+        default="config/data_params.yml",
+        help="Chemin vers le fichier de configuration",
+    )
+    parser.add_argument(
+        "--version",
+        type=str,
+        default=None,
+        help="Version existante (profils et migrations) à réutiliser",
+    )
+    parser.add_argument("--users", type=int, default=None, help="Nombre d'utilisateurs")
+    parser.add_argument("--days", type=int, default=None, help="Nombre de jours")
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="data/synthetic/cdr_events.parquet",
+        help="Fichier Parquet de sortie",
+    )
+
+    args = parser.parse_args()
+
+    with open(args.config, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    if args.days:
+        config.setdefault("cdr", {})["n_days"] = args.days
+
+    if args.version:
+        data_dir = Path(config["paths"]["output_dir"])
+        users_df = load_dataset(data_dir / f"users_{args.version}.parquet", "users")
+        migration_df = load_dataset(
+            data_dir / f"migration_{args.version}.parquet", "migration"
+        )
+        network = AntennaNetwork.from_table(
+            load_dataset(data_dir / f"antennas_{args.version}.parquet", "antennas")
+        )
+    else:
+        generator = SyntheticDataGenerator(config_path=args.config)
+        if args.users:
+            generator.n_users = args.users
+        users_df = generator.generate_user_profiles()
+        migration_df = generator.generate_migration_data(users_df)
+        network = generator.antenna_network
+
+    cdr_config = config.get("cdr", {})
+    sink = CDREventGenerator.from_config(
+        config, users_df, migration_df, network
+    ).write_parquet(
+        args.output,
+        chunk_size=cdr_config.get("chunk_size", 20000),
+        days_per_block=cdr_config.get("days_per_block", 7),
+        compression=config.get("export", {}).get("compression", "zstd"),
+    )
+    print(f"{sink.rows} événements écrits dans {args.output} ({sink.chunks} blocs)")
+
+
+if __name__ == "__main__":
+    main()
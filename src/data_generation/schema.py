@@ -0,0 +1,292 @@
+"""
+Schéma typé des datasets générés
+Projet: Mobilité Côte d'Ivoire - ANStat
+
+Ce module déclare le type de chaque colonne des datasets (users, poverty,
+migration, mobility, cdr, antennas) et l'applique au générateur, à la
+sauvegarde et aux chargeurs : catégories pour les libellés répétitifs,
+datetime64 pour les horodatages, entiers et flottants réduits pour les
+mesures.
+
+Deux backends sont disponibles:
+- "numpy" (défaut): pandas Categorical, datetime64, types NumPy
+- "pyarrow": colonnes Arrow (dictionary, timestamp, entiers Arrow)
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Types logiques (les autres valeurs sont des dtypes NumPy)
+CATEGORY = "category"
+STRING = "string"
+DATETIME = "datetime"
+
+DTYPE_BACKENDS = ("numpy", "pyarrow")
+
+# Colonnes H3 (identifiants int64), ex: home_h3_r7, origin_h3_r9
+H3_COLUMN = re.compile(r"_h3_r\d+$")
+
+SCHEMAS: Dict[str, Dict[str, str]] = {
+    "users": {
+        "user_id": STRING,
+        "age_group": CATEGORY,
+        "gender": CATEGORY,
+        "occupation": CATEGORY,
+        "phone_type": CATEGORY,
+        "subscription_type": CATEGORY,
+        "home_lat": "float64",
+        "home_lon": "float64",
+        "locality": CATEGORY,
+        "department": CATEGORY,
+        "region": CATEGORY,
+        "urban_rural": CATEGORY,
+        "home_antenna": CATEGORY,
+        "household_size": "int8",
+        "initial_wealth_score": "float32",
+        "creation_timestamp": DATETIME,
+    },
+    "poverty": {
+        "user_id": CATEGORY,
+        "timestamp": DATETIME,
+        "week_start": DATETIME,
+        "latitude": "float64",
+        "longitude": "float64",
+        "locality": CATEGORY,
+        "department": CATEGORY,
+        "region": CATEGORY,
+        "antenna_id": CATEGORY,
+        "call_duration_sec": "int32",
+        "data_mb": "float32",
+        "recharge_amount_fcfa": "int32",
+        "recharge_frequency_weekly": "int16",
+        "contact_diversity_score": "float32",
+        "mobility_radius_km": "float32",
+        "phone_type": CATEGORY,
+        "subscription_type": CATEGORY,
+    },
+    "migration": {
+        "user_id": STRING,
+        "timestamp": DATETIME,
+        "origin_locality": CATEGORY,
+        "origin_region": CATEGORY,
+        "current_locality": CATEGORY,
+        "current_region": CATEGORY,
+        "origin_lat": "float64",
+        "origin_lon": "float64",
+        "current_lat": "float64",
+        "current_lon": "float64",
+        "residence_duration_days": "int16",
+        "movement_type": CATEGORY,
+        "is_return_migration": "bool",
+        "previous_locations": STRING,
+        "distance_km": "float32",
+    },
+    "mobility": {
+        "user_id": CATEGORY,
+        "timestamp": DATETIME,
+        "trip_id": STRING,
+        "origin_lat": "float64",
+        "origin_lon": "float64",
+        "dest_lat": "float64",
+        "dest_lon": "float64",
+        "origin_antenna": CATEGORY,
+        "dest_antenna": CATEGORY,
+        "duration_min": "int32",
+        "distance_km": "float32",
+        "speed_kmh": "float32",
+        "transport_mode": CATEGORY,
+        "trip_purpose": CATEGORY,
+        "hour_of_day": "int8",
+        "locality": CATEGORY,
+    },
+    "cdr": {
+        "user_id": CATEGORY,
+        "timestamp": DATETIME,
+        "latitude": "float64",
+        "longitude": "float64",
+        "event_type": CATEGORY,
+        "duration_sec": "int32",
+        "antenna_id": CATEGORY,
+    },
+    "antennas": {
+        "antenna_id": STRING,
+        "latitude": "float64",
+        "longitude": "float64",
+        "locality": CATEGORY,
+    },
+}
+
+# Colonnes catégorielles comparées entre elles: catégories communes
+SHARED_CATEGORIES: Dict[str, List[Tuple[str, ...]]] = {
+    "migration": [
+        ("origin_locality", "current_locality"),
+        ("origin_region", "current_region"),
+    ],
+    "mobility": [("origin_antenna", "dest_antenna")],
+}
+
+
+def dataset_schema(dataset: str, columns: Iterable[str]) -> Dict[str, str]:
+    """
+    Types déclarés des colonnes présentes d'un dataset
+
+    Args:
+        dataset: Nom du dataset (users, poverty, migration, mobility)
+        columns: Colonnes du DataFrame
+
+    Returns:
+        Dictionnaire {colonne: type} (colonnes non déclarées ignorées)
+    """
+    declared = SCHEMAS[dataset]
+    schema = {}
+    for col in columns:
+        if col in declared:
+            schema[col] = declared[col]
+        elif H3_COLUMN.search(col):
+            schema[col] = "int64"
+    return schema
+
+
+def _arrow_type(dtype: str) -> pa.DataType:
+    """Type Arrow correspondant à un type du schéma"""
+    if dtype == CATEGORY:
+        return pa.dictionary(pa.int32(), pa.string())
+    if dtype == STRING:
+        return pa.string()
+    if dtype == DATETIME:
+        return pa.timestamp("us")
+    return pa.from_numpy_dtype(np.dtype(dtype))
+
+
+def _convert(series: pd.Series, dtype: str) -> pd.Series:
+    """Convertit une colonne vers son type déclaré (backend NumPy)"""
+    if isinstance(series.dtype, pd.ArrowDtype):
+        if dtype in (CATEGORY, STRING):
+            series = series.astype(object)
+        else:
+            series = series.astype("datetime64[us]" if dtype == DATETIME else dtype)
+
+    if dtype == CATEGORY:
+        if not isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype("category")
+    elif dtype == STRING:
+        series = series.astype("str")
+    elif dtype == DATETIME:
+        if not pd.api.types.is_datetime64_any_dtype(series):
+            series = pd.to_datetime(series, format="ISO8601")
+    elif series.dtype != dtype:
+        series = series.astype(dtype)
+    return series
+
+
+def _to_arrow_backed(series: pd.Series, dtype: str) -> pd.Series:
+    """Convertit une colonne typée en colonne Arrow"""
+    array = pa.array(series, from_pandas=True).cast(_arrow_type(dtype))
+    return pd.Series(
+        pd.arrays.ArrowExtensionArray(array), index=series.index, name=series.name
+    )
+
+
+def _share_categories(typed: pd.DataFrame, columns: Tuple[str, ...]) -> None:
+    """Donne les mêmes catégories (union triée) à un groupe de colonnes"""
+    columns = [col for col in columns if col in typed.columns]
+    if len(columns) < 2:
+        return
+    categories = sorted(
+        set().union(*(typed[col].cat.categories for col in columns)), key=str
+    )
+    for col in columns:
+        typed[col] = typed[col].cat.set_categories(categories)
+
+
+def apply_schema(
+    df: pd.DataFrame, dataset: str, dtype_backend: str = "numpy"
+) -> pd.DataFrame:
+    """
+    Applique le schéma déclaré d'un dataset
+
+    Args:
+        df: DataFrame à typer
+        dataset: Nom du dataset
+        dtype_backend: "numpy" ou "pyarrow"
+
+    Returns:
+        Nouveau DataFrame typé (colonnes non déclarées inchangées)
+    """
+    if dtype_backend not in DTYPE_BACKENDS:
+        raise ValueError(f"Backend de types inconnu: {dtype_backend}")
+
+    schema = dataset_schema(dataset, df.columns)
+    typed = df.copy(deep=False)
+    for col, dtype in schema.items():
+        typed[col] = _convert(df[col], dtype)
+    for columns in SHARED_CATEGORIES.get(dataset, []):
+        _share_categories(typed, columns)
+
+    if dtype_backend == "pyarrow":
+        for col, dtype in schema.items():
+            typed[col] = _to_arrow_backed(typed[col], dtype)
+    return typed
+
+
+def load_dataset(path: str, dataset: str, dtype_backend: str = "numpy") -> pd.DataFrame:
+    """
+    Charge un dataset (CSV ou Parquet) et applique son schéma
+
+    Args:
+        path: Fichier .csv ou .parquet (ou répertoire Parquet partitionné)
+        dataset: Nom du dataset
+        dtype_backend: "numpy" ou "pyarrow"
+
+    Returns:
+        DataFrame typé
+    """
+    path = Path(path)
+    if path.suffix == ".csv":
+        categories = {
+            col: "category"
+            for col, dtype in SCHEMAS[dataset].items()
+            if dtype == CATEGORY
+        }
+        header = pd.read_csv(path, nrows=0).columns
+        df = pd.read_csv(
+            path, dtype={col: t for col, t in categories.items() if col in header}
+        )
+    else:
+        df = pd.read_parquet(path)
+    return apply_schema(df, dataset, dtype_backend)
+
+
+def find_latest_dataset(data_dir: str, dataset: str) -> Optional[Path]:
+    """
+    Trouve la version la plus récente d'un dataset, Parquet de préférence
+
+    Les datasets Parquet peuvent être un fichier ou un répertoire
+    (dataset partitionné ou prolongé par ajout).
+
+    Args:
+        data_dir: Répertoire des datasets
+        dataset: Nom du dataset
+
+    Returns:
+        Chemin du fichier ou répertoire le plus récent, ou None
+    """
+    candidates = list(Path(data_dir).glob(f"{dataset}_*"))
+    for is_format in (
+        lambda p: p.suffix == ".parquet" or p.is_dir(),
+        lambda p: p.suffix == ".csv",
+    ):
+        files = [p for p in candidates if is_format(p)]
+        if files:
+            return max(files, key=lambda x: x.stat().st_mtime)
+    return None
+
+
+def memory_usage_mb(df: pd.DataFrame) -> float:
+    """Empreinte mémoire d'un DataFrame en Mo (contenu des chaînes inclus)"""
+    return float(df.memory_usage(deep=True).sum()) / 1e6
@@ -13,17 +13,35 @@ MISE À JOUR v1.1:
 - Intégration des limites GADM Côte d'Ivoire
 """
 
+import copy
 import hashlib
-from datetime import datetime, timedelta
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import geopandas as gpd
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import shapely
 import yaml
 from loguru import logger
-from shapely.geometry import Point
+
+# Ajout du chemin src pour les imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data_generation.calibration import PopulationCalibrator, load_marginal
+from data_generation.schema import apply_schema, load_dataset
+from utils.alias_sampler import AliasSampler
+from utils.antenna_network import AntennaNetwork
+from utils.export import DatasetExporter
+from utils.gadm_cache import load_gadm
+from utils.geodesy import destination_point, haversine
+from utils.h3_index import H3Indexer, h3_available
+from utils.parquet_sink import ParquetSink
 
 # Configuration du logging
 log_dir = Path("logs")
@@ -41,6 +59,77 @@ class SyntheticDataGenerator:
     le pipeline d'analyse de données de téléphonie mobile.
     """
 
+    # Localités considérées comme urbaines
+    URBAN_LOCALITIES = [
+        "Abidjan-Ville",
+        "Bouake",
+        "Yamoussoukro",
+        "Korhogo",
+        "San-Pedro",
+        "Daloa",
+        "Man",
+        "Gagnoa",
+        "Divo",
+        "Abengourou",
+        "Anyama",
+        "Bingerville",
+        "Grand-Bassam",
+        "Aboisso",
+    ]
+
+    # Part d'utilisateurs "urbains" hors des localités urbaines
+    URBAN_SHARE_ELSEWHERE = 0.3
+
+    # Colonnes démographiques du dataset users et leur section de config
+    DEMOGRAPHIC_COLUMNS = {
+        "age_group": "age_groups",
+        "gender": "gender",
+        "occupation": "occupation",
+        "phone_type": "phone_type",
+        "subscription_type": "subscription",
+    }
+    URBAN_RURAL = ["urban", "rural"]
+
+    # Distribution de la taille des ménages (1 à 8 personnes)
+    HOUSEHOLD_SIZES = list(range(1, 9))
+    HOUSEHOLD_SIZE_PROBS = [0.05, 0.15, 0.20, 0.25, 0.15, 0.10, 0.07, 0.03]
+
+    # Types de migration et leurs probabilités
+    MIGRATION_TYPES = [
+        "permanent_relocation",
+        "work_migration",
+        "education_migration",
+        "seasonal_agriculture",
+        "temporary_stay",
+        "circular_migration",
+    ]
+    MIGRATION_TYPE_PROBS = [0.15, 0.30, 0.10, 0.20, 0.15, 0.10]
+
+    # Durée de résidence (jours, bornes du tirage uniforme) par type
+    RESIDENCE_DAYS = {
+        "permanent_relocation": (90, 365),
+        "work_migration": (90, 365),
+        "education_migration": (120, 300),
+        "seasonal_agriculture": (30, 120),
+        "temporary_stay": (7, 60),
+        "circular_migration": (7, 60),
+    }
+
+    # Contributions au score de richesse initial
+    PHONE_SCORES = {"basic": -0.2, "feature": 0.0, "smartphone": 0.2}
+    OCCUPATION_SCORES = {
+        "employee": 0.15,
+        "trader": 0.1,
+        "student": 0.0,
+        "informal_sector": -0.1,
+        "farmer": -0.1,
+        "unemployed": -0.2,
+        "other": 0.0,
+    }
+
+    # Identifiants des flux aléatoires dérivés du seed (voir _period_rng)
+    RNG_STREAMS = {"poverty": 1, "mobility": 2, "antennas": 3}
+
     def __init__(self, config_path: str = "config/data_params.yml"):
         """
         Initialise le générateur avec la configuration
@@ -52,6 +141,9 @@ class SyntheticDataGenerator:
         self._load_config()
         self._setup_random_state()
         self._load_gadm_boundaries()
+        self._setup_samplers()
+        self._setup_antenna_network()
+        self._setup_h3_indexer()
 
         logger.info(f"Générateur initialisé avec {self.n_users} utilisateurs")
 
@@ -67,6 +159,10 @@ class SyntheticDataGenerator:
         self.days = self.config["generation"]["days_to_generate"]
         self.seed = self.config["generation"]["random_seed"]
 
+        # Génération par shards (nombre fixe => résultat indépendant des workers)
+        self.n_shards = self.config["generation"].get("n_shards", 1)
+        self.n_workers = self.config["generation"].get("n_workers")
+
         # Paramètres spatiaux
         self.spatial_bounds = self.config["spatial_bounds"]
         self.urban_centers = self.config["urban_centers"]
@@ -83,18 +179,28 @@ class SyntheticDataGenerator:
         # Paramètres de migration
         self.migration_config = self.config["migration"]
 
+        # Backend des types des datasets ("numpy" ou "pyarrow")
+        self.dtype_backend = self.config.get("schema", {}).get("dtype_backend", "numpy")
+
     def _setup_random_state(self) -> None:
         """Configure le générateur aléatoire pour reproductibilité"""
         np.random.seed(self.seed)
         self.rng = np.random.default_rng(self.seed)
+        self.seed_seq = np.random.SeedSequence(self.seed)
 
     def _load_gadm_boundaries(self) -> None:
-        """Charge les limites administratives GADM si disponibles"""
-        gadm_path = Path("data/raw/gadm41_CIV_4.json")
+        """
+        Charge les limites administratives GADM si disponibles
+
+        Les limites, leurs attributs et leur triangulation sont relus depuis
+        le cache GeoParquet de la source (reconstruit si elle a changé).
+        """
+        raw_dir = self.config.get("paths", {}).get("raw_dir", "data/raw")
+        gadm_path = Path(raw_dir) / "gadm41_CIV_4.json"
 
         if gadm_path.exists():
             logger.info(f"Chargement des limites GADM depuis {gadm_path}")
-            self.gadm = gpd.read_file(gadm_path)
+            self.gadm, self.locality_sampler = load_gadm(gadm_path)
             self.has_gadm = True
 
             # Créer un mapping des localités avec leurs centroïdes et poids
@@ -106,12 +212,12 @@ class SyntheticDataGenerator:
             self.gadm = None
 
     def _prepare_localities(self) -> None:
-        """Prépare les localités avec centroïdes et poids de population"""
-        # Calculer les centroïdes
-        self.gadm["centroid"] = self.gadm.geometry.centroid
-        self.gadm["centroid_lat"] = self.gadm["centroid"].y
-        self.gadm["centroid_lon"] = self.gadm["centroid"].x
+        """
+        Prépare les localités avec poids de population
 
+        Centroïdes, emprises et aires sont précalculés par le cache GADM
+        (voir utils.gadm_cache).
+        """
         # Définir les poids de population (approximatifs)
         # Les grandes villes ont plus de poids
         major_cities = {
@@ -143,356 +249,697 @@ class SyntheticDataGenerator:
         self.localities = self.gadm["NAME_4"].tolist()
         self.locality_weights = self.gadm["weight"].tolist()
 
-    def _generate_user_id(self, index: int) -> str:
+        # Table des localités indexée par code entier (0..n-1)
+        self.locality_table = pd.DataFrame(
+            {
+                "name": self.gadm["NAME_4"].to_numpy(),
+                "region": self.gadm["NAME_1"].to_numpy(),
+                "department": self.gadm["NAME_2"].to_numpy(),
+                **{
+                    col: self.gadm[col].to_numpy()
+                    for col in (
+                        "centroid_lat",
+                        "centroid_lon",
+                        "min_lon",
+                        "min_lat",
+                        "max_lon",
+                        "max_lat",
+                        "area_km2",
+                    )
+                },
+                "weight": self.gadm["weight"].to_numpy(),
+            }
+        )
+        self.locality_region = self.locality_table["region"].to_numpy()
+        self.locality_department = self.locality_table["department"].to_numpy()
+
+        # Index des noms: un nom présent plusieurs fois (NAME_4 n'est pas
+        # unique dans GADM) désigne sa première localité
+        names = pd.Index(self.localities)
+        first = ~names.duplicated(keep="first")
+        self.locality_index = names[first]
+        self.locality_name_codes = np.flatnonzero(first)
+
+    def _setup_samplers(self) -> None:
+        """
+        Construit une fois les tables d'alias des tirages pondérés
+
+        Localités GADM, centres urbains, modalités démographiques, taille
+        des ménages et types de migration ; prépare ensuite le calage des
+        attributs (voir _setup_calibration).
+        """
+        if self.has_gadm:
+            self.locality_alias = AliasSampler(self.locality_weights)
+        cities = list(self.urban_centers.keys())
+        self.city_alias = AliasSampler(
+            [self.urban_centers[c]["weight"] for c in cities]
+        )
+
+        self.demographic_samplers = {
+            name: AliasSampler(spec["probabilities"])
+            for name, spec in self.demographics.items()
+        }
+        self.household_size_sampler = AliasSampler(
+            self.HOUSEHOLD_SIZE_PROBS, self.HOUSEHOLD_SIZES
+        )
+        self.migration_type_sampler = AliasSampler(self.MIGRATION_TYPE_PROBS)
+        self._setup_calibration()
+
+    def _setup_calibration(self) -> None:
+        """
+        Cale la distribution jointe des attributs sur les marges configurées
+
+        Sans marges (section calibration absente ou vide), les attributs
+        restent tirés indépendamment. Sinon l'a priori est le modèle
+        indépendant actuel (région x milieu issus des poids des localités,
+        puis démographie de la config), ajusté par IPF aux CSV ; la
+        localité est ensuite tirée selon la région et le milieu.
+        """
+        calibration = self.config.get("calibration") or {}
+        paths = calibration.get("marginals") or []
+        self.calibrator = None
+        if not paths:
+            return
+
+        # Zones de résidence: localités GADM, sinon centres urbains
+        if self.has_gadm:
+            zone_names = np.asarray(self.localities, dtype=object)
+            zone_weights = np.asarray(self.locality_weights, dtype=float)
+            regions = sorted(set(self.locality_region))
+            zone_region = pd.Index(regions).get_indexer(self.locality_region)
+        else:
+            zone_names = np.asarray(list(self.urban_centers), dtype=object)
+            zone_weights = self.city_alias.probabilities[0]
+            regions = ["Unknown"]
+            zone_region = np.zeros(len(zone_names), dtype=np.int64)
+
+        # Poids (zone, milieu) du modèle indépendant
+        urban_share = np.where(
+            np.isin(zone_names, self.URBAN_LOCALITIES),
+            1.0,
+            self.URBAN_SHARE_ELSEWHERE,
+        )
+        zone_milieu = zone_weights[:, None] * np.column_stack(
+            [urban_share, 1 - urban_share]
+        )
+
+        # A priori: (région x milieu) puis produit des marges démographiques
+        region_milieu = np.zeros((len(regions), 2))
+        np.add.at(region_milieu, zone_region, zone_milieu)
+        dimensions = {"region": regions, "urban_rural": self.URBAN_RURAL}
+        seed = region_milieu
+        if not self.has_gadm:
+            dimensions.pop("region")
+            seed = region_milieu[0]
+        for column, key in self.DEMOGRAPHIC_COLUMNS.items():
+            dimensions[column] = self.demographics[key]["values"]
+            seed = np.multiply.outer(
+                seed, np.asarray(self.demographics[key]["probabilities"], dtype=float)
+            )
+
+        self.calibrator = PopulationCalibrator(dimensions, seed)
+        value_column = calibration.get("value_column", "population")
+        for path in paths:
+            self.calibrator.add_marginal(
+                load_marginal(path, value_column), value_column
+            )
+        self.calibrator.fit(
+            max_iter=calibration.get("max_iter", 100),
+            tol=calibration.get("tol", 1e-6),
+        )
+
+        # Localité selon (région, milieu): groupe = région * 2 + milieu
+        in_region = zone_region[None, :] == np.arange(len(regions))[:, None]
+        zone_weights_by_group = (
+            in_region[:, None, :] * zone_milieu.T[None, :, :]
+        ).reshape(len(regions) * 2, -1)
+        empty = zone_weights_by_group.sum(axis=1) == 0
+        zone_weights_by_group[empty] = np.repeat(in_region * zone_weights, 2, axis=0)[
+            empty
+        ]
+        self.calibrated_zone_alias = AliasSampler(zone_weights_by_group)
+
+    def _get_locality_codes(self, names: Sequence, strict: bool = True) -> np.ndarray:
+        """
+        Convertit des noms de localités (NAME_4) en codes entiers
+
+        Args:
+            names: Noms des localités
+            strict: Lever une erreur pour un nom inconnu (sinon code -1)
+
+        Returns:
+            Tableau des codes (index dans la table des localités; première
+            localité du nom si celui-ci est partagé)
+        """
+        positions = self.locality_index.get_indexer(np.asarray(names, dtype=object))
+        unknown = positions < 0
+        if strict and unknown.any():
+            names = pd.unique(np.asarray(names, dtype=object)[unknown])
+            raise ValueError(f"Localités inconnues: {list(names[:5])}")
+        return np.where(unknown, -1, self.locality_name_codes[positions])
+
+    def _generate_user_id(self, index: int, salt: Optional[str] = None) -> str:
         """
         Génère un identifiant anonymisé pour un utilisateur
 
         Args:
             index: Index de l'utilisateur
+            salt: Sel partagé par un lot d'identifiants (défaut: horodatage courant)
 
         Returns:
             Hash SHA-256 tronqué
         """
-        salt = datetime.now().isoformat()
+        if salt is None:
+            salt = datetime.now().isoformat()
         raw_id = f"user_{index}_{salt}"
         return hashlib.sha256(raw_id.encode()).hexdigest()[:12]
 
-    def _get_random_point_in_locality(self, locality_name: str) -> Tuple[float, float]:
+    def _generate_user_ids(
+        self, n: int, offset: int = 0, salt: Optional[str] = None
+    ) -> pd.api.extensions.ExtensionArray:
         """
-        Génère un point aléatoire dans une localité GADM
+        Génère les identifiants anonymisés d'un lot d'utilisateurs
+
+        Seul le hachage reste par identifiant : les 6 premiers octets de
+        chaque empreinte sont convertis en hexadécimal sur tout le lot,
+        sans chaîne Python intermédiaire.
 
         Args:
-            locality_name: Nom de la localité (NAME_4)
+            n: Nombre d'identifiants
+            offset: Index du premier utilisateur du lot
+            salt: Sel partagé par le lot (défaut: horodatage courant)
 
         Returns:
-            Tuple (latitude, longitude)
+            Tableau (dtype str) de hash SHA-256 tronqués (même format que
+            _generate_user_id)
+        """
+        if salt is None:
+            salt = datetime.now().isoformat()
+        sha256 = hashlib.sha256
+        digests = b"".join(
+            [
+                sha256(f"user_{i}_{salt}".encode()).digest()[:6]
+                for i in range(offset, offset + n)
+            ]
+        )
+        prefixes = np.frombuffer(digests, dtype=np.uint8).reshape(n, 6)
+        hex_chars = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+        text = np.stack([hex_chars[prefixes >> 4], hex_chars[prefixes & 15]], axis=-1)
+        ids = pa.array(text.reshape(n, 12).view("S12").ravel(), type=pa.string())
+        return pd.array(ids, dtype="str")
+
+    def _get_random_points_in_localities(
+        self, localities: Sequence
+    ) -> Tuple[np.ndarray, np.ndarray]:
         """
-        locality = self.gadm[self.gadm["NAME_4"] == locality_name].iloc[0]
-        geometry = locality.geometry
+        Génère un point aléatoire dans chaque localité GADM demandée
 
-        # Générer un point aléatoire dans le polygone
-        minx, miny, maxx, maxy = geometry.bounds
+        Les points sont tirés en un seul lot à partir de la triangulation
+        pondérée par l'aire de chaque polygone.
 
-        max_attempts = 100
-        for _ in range(max_attempts):
-            random_point = Point(
-                self.rng.uniform(minx, maxx), self.rng.uniform(miny, maxy)
-            )
-            if geometry.contains(random_point):
-                return random_point.y, random_point.x  # lat, lon
+        Args:
+            localities: Codes entiers ou noms (NAME_4) des localités,
+                un point par élément
 
-        # Fallback: utiliser le centroïde avec bruit
-        centroid = geometry.centroid
-        lat = centroid.y + self.rng.normal(0, 0.02)
-        lon = centroid.x + self.rng.normal(0, 0.02)
-        return lat, lon
+        Returns:
+            Tuple de tableaux (latitude, longitude)
+        """
+        localities = np.asarray(localities)
+        if np.issubdtype(localities.dtype, np.integer):
+            locality_codes = localities
+        else:
+            locality_codes = self._get_locality_codes(localities)
 
-    def _assign_home_location(self) -> Tuple[str, float, float, str, str]:
+        return self.locality_sampler.sample(locality_codes, self.rng)
+
+    def _assign_home_location(
+        self, n: int, codes: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
         """
         Attribue une localisation de résidence basée sur GADM ou config
+        pour n utilisateurs en une seule passe
+
+        Args:
+            n: Nombre d'utilisateurs
+            codes: Codes des localités (ou centres urbains) déjà tirés
+                (défaut: tirage selon les poids)
 
         Returns:
-            Tuple (locality_name, latitude, longitude, region, department)
+            Tuple (locality, latitude, longitude, region, department), les
+            libellés sous forme de Categorical
         """
         if self.has_gadm:
-            # Sélectionner une localité selon les poids
-            locality_name = self.rng.choice(self.localities, p=self.locality_weights)
-            lat, lon = self._get_random_point_in_locality(locality_name)
+            # Sélectionner les localités (codes entiers) selon les poids
+            if codes is None:
+                codes = self.locality_alias.sample(self.rng, n)
+            lat, lon = self._get_random_points_in_localities(codes)
+
+            # Récupérer les infos administratives depuis la table des localités
+            localities = _categorical(codes, self.locality_table["name"].to_numpy())
+            region = _categorical(codes, self.locality_region)
+            department = _categorical(codes, self.locality_department)
+
+            return localities, lat, lon, region, department
+
+        # Fallback sur la config originale
+        cities = list(self.urban_centers.keys())
+        city_idx = self.city_alias.sample(self.rng, n) if codes is None else codes
+        localities = _categorical(city_idx, cities)
+        lat, lon = self._sample_city_points(city_idx, self.rng)
+
+        unknown = _categorical(np.zeros(n, dtype=np.intp), ["Unknown"])
+        return localities, lat, lon, unknown, unknown.copy()
+
+    def _sample_city_points(
+        self, city_idx: np.ndarray, rng: np.random.Generator
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Tire un point autour de chaque centre urbain de la config (sans GADM)
+
+        Args:
+            city_idx: Index des centres (ordre de urban_centers)
+            rng: Générateur aléatoire
+
+        Returns:
+            Tuple de tableaux (latitude, longitude)
+        """
+        cities = list(self.urban_centers.keys())
+        n = len(city_idx)
+        base_lat = np.array([self.urban_centers[c]["lat"] for c in cities])[city_idx]
+        base_lon = np.array([self.urban_centers[c]["lon"] for c in cities])[city_idx]
+        lat = base_lat + rng.normal(0, 0.05, n)
+        lon = base_lon + rng.normal(0, 0.05, n)
+
+        # "Others": position uniforme sur le territoire
+        is_other = np.asarray(cities, dtype=object)[city_idx] == "Others"
+        n_other = int(is_other.sum())
+        lat[is_other] = rng.uniform(4.5, 10.0, n_other)
+        lon[is_other] = rng.uniform(-8.0, -3.0, n_other)
+        return lat, lon
 
-            # Récupérer les infos administratives
-            locality_data = self.gadm[self.gadm["NAME_4"] == locality_name].iloc[0]
-            region = locality_data["NAME_1"]
-            department = locality_data["NAME_2"]
+    def _setup_antenna_network(self) -> None:
+        """
+        Construit le réseau d'antennes synthétique
 
-            return locality_name, lat, lon, region, department
+        La densité d'antennes suit les poids des localités GADM (ou des
+        centres urbains de la config). Le réseau ne dépend que du seed :
+        il est identique pour tous les shards et en mode ajout.
+        """
+        n_antennas = self.config.get("antennas", {}).get("n_antennas", 1500)
+        rng = np.random.default_rng(
+            np.random.SeedSequence(
+                self.seed, spawn_key=(self.RNG_STREAMS["antennas"], 0)
+            )
+        )
+
+        if self.has_gadm:
+            self.antenna_network = AntennaNetwork.generate(
+                n_antennas,
+                self.locality_weights,
+                self.locality_sampler.sample,
+                rng,
+                names=self.localities,
+            )
         else:
-            # Fallback sur la config originale
             cities = list(self.urban_centers.keys())
-            weights = [self.urban_centers[c]["weight"] for c in cities]
+            self.antenna_network = AntennaNetwork.generate(
+                n_antennas,
+                [self.urban_centers[c]["weight"] for c in cities],
+                self._sample_city_points,
+                rng,
+                names=cities,
+            )
+        logger.info(f"✓ Réseau de {len(self.antenna_network)} antennes généré")
 
-            city = self.rng.choice(cities, p=weights)
+    def antenna_coverage(self) -> gpd.GeoDataFrame:
+        """
+        Zones de couverture (Voronoï) des antennes, découpées par le territoire
 
-            if city != "Others":
-                base_lat = self.urban_centers[city]["lat"]
-                base_lon = self.urban_centers[city]["lon"]
-                lat = base_lat + self.rng.normal(0, 0.05)
-                lon = base_lon + self.rng.normal(0, 0.05)
-            else:
-                lat = self.rng.uniform(4.5, 10.0)
-                lon = self.rng.uniform(-8.0, -3.0)
+        Returns:
+            GeoDataFrame des antennes et de leur cellule
+        """
+        boundary = (
+            shapely.union_all(self.gadm.geometry.values) if self.has_gadm else None
+        )
+        return self.antenna_network.voronoi_cells(boundary)
 
-            return city, lat, lon, "Unknown", "Unknown"
+    def _setup_h3_indexer(self) -> None:
+        """Prépare l'indexeur H3 multi-résolution (identifiants int64)"""
+        resolutions = self.mobility_config.get(
+            "h3_resolutions", [self.mobility_config.get("h3_resolution", 7)]
+        )
+        if h3_available():
+            self.h3_indexer = H3Indexer(resolutions)
+        else:
+            logger.warning("Librairie h3 non disponible, colonnes H3 non générées")
+            self.h3_indexer = None
 
-    def _get_h3_cell(self, lat: float, lon: float, resolution: int = 7) -> str:
+    def _get_h3_cells(
+        self, lats: np.ndarray, lons: np.ndarray, prefix: str
+    ) -> Dict[str, np.ndarray]:
         """
-        Calcule la cellule H3 pour une position
-        Compatible avec h3 v4.x
+        Calcule les cellules H3 d'un lot de positions à toutes les résolutions
 
         Args:
-            lat: Latitude
-            lon: Longitude
-            resolution: Résolution H3 (défaut: 7, ~1.41km)
+            lats: Latitudes
+            lons: Longitudes
+            prefix: Préfixe des colonnes (ex: 'home_h3')
 
         Returns:
-            Index H3 de la cellule
+            Dictionnaire {nom de colonne: identifiants H3 int64},
+            vide si h3 n'est pas disponible
         """
-        try:
-            import h3
-
-            # h3 v4.x utilise latlng_to_cell au lieu de geo_to_h3
-            if hasattr(h3, "latlng_to_cell"):
-                # h3 v4.x
-                return h3.latlng_to_cell(lat, lon, resolution)
-            elif hasattr(h3, "geo_to_h3"):
-                # h3 v3.x (ancienne API)
-                return h3.geo_to_h3(lat, lon, resolution)
-            else:
-                raise AttributeError("API h3 non reconnue")
-        except Exception as e:
-            # Fallback si h3 pose problème
-            logger.warning(f"Erreur h3: {e}, utilisation du fallback")
-            return f"h3_{int(lat*1000)}_{int(abs(lon)*1000)}_{resolution}"
+        if self.h3_indexer is None:
+            return {}
+        cells = self.h3_indexer.index(lats, lons)
+        return {H3Indexer.column(prefix, res): ids for res, ids in cells.items()}
 
-    def generate_user_profiles(self) -> pd.DataFrame:
+    def _draw_categorical(self, name: str, size: int) -> pd.Categorical:
         """
-        Génère les profils utilisateurs avec caractéristiques socio-démographiques
+        Tire un vecteur de modalités selon une distribution de la config
+
+        Args:
+            name: Clé de la section demographics (ex: 'gender')
+            size: Nombre de tirages
 
         Returns:
-            DataFrame avec les profils utilisateurs
+            Categorical des modalités tirées
         """
-        logger.info(f"Génération de {self.n_users} profils utilisateurs...")
+        codes = self.demographic_samplers[name].sample(self.rng, size)
+        return _categorical(codes, self.demographics[name]["values"])
 
-        users = []
+    def generate_user_profiles(
+        self,
+        offset: int = 0,
+        salt: Optional[str] = None,
+        created_at: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        Génère les profils utilisateurs avec caractéristiques socio-démographiques
 
-        for i in range(self.n_users):
-            # Localisation de base (avec GADM si disponible)
-            locality, home_lat, home_lon, region, department = (
-                self._assign_home_location()
-            )
+        Tous les attributs sont tirés colonne par colonne sous forme de
+        tableaux NumPy, sans boucle par utilisateur.
 
-            # Cellule H3 de résidence
-            home_h3 = self._get_h3_cell(home_lat, home_lon)
+        Args:
+            offset: Index global du premier utilisateur (génération par shards)
+            salt: Sel des identifiants (défaut: horodatage courant)
+            created_at: Horodatage de création (défaut: maintenant)
 
-            # Caractéristiques démographiques
-            demo = self.demographics
+        Returns:
+            DataFrame avec les profils utilisateurs
+        """
+        logger.info(f"Génération de {self.n_users} profils utilisateurs...")
 
-            age_group = self.rng.choice(
-                demo["age_groups"]["values"], p=demo["age_groups"]["probabilities"]
-            )
+        n = self.n_users
 
-            gender = self.rng.choice(
-                demo["gender"]["values"], p=demo["gender"]["probabilities"]
+        # Attributs calés (région, milieu, démographie) tirés conjointement
+        if self.calibrator is not None:
+            cells = self.calibrator.sample(self.rng, n)
+            zone_codes = self.calibrated_zone_alias.sample(
+                self.rng, groups=cells.get("region", 0) * 2 + cells["urban_rural"]
             )
+        else:
+            cells, zone_codes = None, None
 
-            occupation = self.rng.choice(
-                demo["occupation"]["values"], p=demo["occupation"]["probabilities"]
-            )
+        # Localisation de base (avec GADM si disponible)
+        locality, home_lat, home_lon, region, department = self._assign_home_location(
+            n, zone_codes
+        )
 
-            phone_type = self.rng.choice(
-                demo["phone_type"]["values"], p=demo["phone_type"]["probabilities"]
-            )
+        # Cellules H3 de résidence (arrondi identique aux coordonnées publiées)
+        home_lat = np.round(home_lat, 6)
+        home_lon = np.round(home_lon, 6)
+        home_h3 = self._get_h3_cells(home_lat, home_lon, "home_h3")
+        home_antenna = self.antenna_network.assign(home_lat, home_lon)
 
-            subscription = self.rng.choice(
-                demo["subscription"]["values"], p=demo["subscription"]["probabilities"]
-            )
+        if cells is None:
+            # Caractéristiques démographiques
+            demographics = {
+                column: self._draw_categorical(key, n)
+                for column, key in self.DEMOGRAPHIC_COLUMNS.items()
+            }
 
             # Zone urbaine/rurale basée sur la localité
-            urban_localities = [
-                "Abidjan-Ville",
-                "Bouake",
-                "Yamoussoukro",
-                "Korhogo",
-                "San-Pedro",
-                "Daloa",
-                "Man",
-                "Gagnoa",
-                "Divo",
-                "Abengourou",
-                "Anyama",
-                "Bingerville",
-                "Grand-Bassam",
-                "Aboisso",
-            ]
-
-            if locality in urban_localities:
-                urban_rural = "urban"
-            else:
-                urban_rural = self.rng.choice(["urban", "rural"], p=[0.3, 0.7])
-
-            # Taille du ménage
-            household_size = self.rng.choice(
-                range(1, 9), p=[0.05, 0.15, 0.20, 0.25, 0.15, 0.10, 0.07, 0.03]
-            )
-
-            # Score de richesse initial
-            wealth_score = self._estimate_initial_wealth(
-                phone_type, subscription, occupation, urban_rural
+            is_urban = locality.isin(self.URBAN_LOCALITIES) | (
+                self.rng.random(n) < self.URBAN_SHARE_ELSEWHERE
             )
+            urban_rural = _categorical(np.where(is_urban, 0, 1), self.URBAN_RURAL)
+        else:
+            demographics = {
+                column: _categorical(cells[column], self.calibrator.categories[column])
+                for column in self.DEMOGRAPHIC_COLUMNS
+            }
+            urban_rural = _categorical(cells["urban_rural"], self.URBAN_RURAL)
+        phone_type = demographics["phone_type"]
+        subscription = demographics["subscription_type"]
+        occupation = demographics["occupation"]
+
+        # Taille du ménage
+        household_size = self.household_size_sampler.sample(self.rng, n)
+
+        # Score de richesse initial
+        wealth_score = self._estimate_initial_wealth(
+            phone_type, subscription, occupation, urban_rural
+        )
 
-            users.append(
-                {
-                    "user_id": self._generate_user_id(i),
-                    "age_group": age_group,
-                    "gender": gender,
-                    "occupation": occupation,
-                    "phone_type": phone_type,
-                    "subscription_type": subscription,
-                    "home_lat": round(home_lat, 6),
-                    "home_lon": round(home_lon, 6),
-                    "home_h3": home_h3,
-                    "locality": locality,
-                    "department": department,
-                    "region": region,
-                    "urban_rural": urban_rural,
-                    "household_size": household_size,
-                    "initial_wealth_score": round(wealth_score, 3),
-                    "creation_timestamp": datetime.now().isoformat(),
-                }
-            )
-
-            # Log de progression
-            if (i + 1) % 1000 == 0:
-                logger.info(f"  {i + 1}/{self.n_users} profils générés...")
-
-        df = pd.DataFrame(users)
+        df = pd.DataFrame(
+            {
+                "user_id": self._generate_user_ids(n, offset=offset, salt=salt),
+                **demographics,
+                "home_lat": home_lat,
+                "home_lon": home_lon,
+                **home_h3,
+                "home_antenna": home_antenna,
+                "locality": locality,
+                "department": department,
+                "region": region,
+                "urban_rural": urban_rural,
+                "household_size": household_size,
+                "initial_wealth_score": np.round(wealth_score, 3),
+                "creation_timestamp": pd.Timestamp(created_at or datetime.now()),
+            }
+        )
         logger.info(f"✓ {len(df)} profils utilisateurs générés")
 
-        return df
+        return apply_schema(df, "users", self.dtype_backend)
 
     def _estimate_initial_wealth(
-        self, phone_type: str, subscription: str, occupation: str, urban_rural: str
-    ) -> float:
+        self,
+        phone_type: pd.Categorical,
+        subscription: pd.Categorical,
+        occupation: pd.Categorical,
+        urban_rural: pd.Categorical,
+    ) -> np.ndarray:
         """
         Estime un score de richesse initial basé sur les caractéristiques
 
         Returns:
-            Score entre 0 et 1
+            Tableau de scores entre 0 et 1
         """
-        score = 0.5  # Base
+        score = np.full(len(phone_type), 0.5)  # Base
 
         # Type de téléphone
-        phone_scores = {"basic": -0.2, "feature": 0.0, "smartphone": 0.2}
-        score += phone_scores.get(phone_type, 0)
+        score += _label_scores(phone_type, self.PHONE_SCORES)
 
         # Type d'abonnement
-        if subscription == "postpaid":
-            score += 0.15
+        score += np.where(subscription == "postpaid", 0.15, 0.0)
 
         # Occupation
-        occupation_scores = {
-            "employee": 0.15,
-            "trader": 0.1,
-            "student": 0.0,
-            "informal_sector": -0.1,
-            "farmer": -0.1,
-            "unemployed": -0.2,
-            "other": 0.0,
-        }
-        score += occupation_scores.get(occupation, 0)
+        score += _label_scores(occupation, self.OCCUPATION_SCORES)
 
         # Zone
-        if urban_rural == "urban":
-            score += 0.05
-        else:
-            score -= 0.05
+        score += np.where(urban_rural == "urban", 0.05, -0.05)
 
         # Normalisation et bruit
-        score = max(0, min(1, score + self.rng.normal(0, 0.1)))
-
-        return score
+        return np.clip(score + self.rng.normal(0, 0.1, len(score)), 0, 1)
 
-    def generate_poverty_data(self, users_df: pd.DataFrame) -> pd.DataFrame:
+    def _period_rng(self, dataset: str, period: int) -> np.random.Generator:
         """
-        Génère les données spécifiques à l'analyse de la pauvreté
+        Flux aléatoire propre à une période d'un dataset
+
+        Le flux est dérivé de la SeedSequence du générateur (ou du shard),
+        du dataset et de l'index absolu de la période : une semaine ou une
+        journée tire les mêmes valeurs qu'elle soit générée seule (mode
+        ajout) ou avec toute la période (régénération complète).
 
         Args:
-            users_df: DataFrame des profils utilisateurs
+            dataset: 'poverty' ou 'mobility'
+            period: Premier jour de la période, compté depuis start_date
 
         Returns:
-            DataFrame avec les indicateurs de pauvreté
+            Générateur aléatoire de la période
         """
-        logger.info("Génération des données de pauvreté...")
+        spawn_key = self.seed_seq.spawn_key + (
+            self.RNG_STREAMS[dataset],
+            int(period),
+        )
+        return np.random.default_rng(
+            np.random.SeedSequence(self.seed_seq.entropy, spawn_key=spawn_key)
+        )
 
-        poverty_records = []
+    def _period_offsets(
+        self, step: int, start_day: int = 0, end_day: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Premiers jours des périodes (semaines: step=7, jours: step=1) d'une plage
 
-        for idx, user in users_df.iterrows():
-            wealth = user["initial_wealth_score"]
+        Args:
+            step: Durée d'une période en jours
+            start_day: Premier jour de la plage
+            end_day: Fin (exclue) de la plage (défaut: days_to_generate)
 
-            # Sélection des probabilités de recharge selon le niveau de richesse
-            if wealth < 0.4:
-                recharge_probs = self.economic_config["recharge_probs_poor"]
-            else:
-                recharge_probs = self.economic_config["recharge_probs_rich"]
+        Returns:
+            Décalages en jours depuis start_date
+        """
+        end_day = self.days if end_day is None else min(end_day, self.days)
+        offsets = np.arange(0, end_day, step)
+        return offsets[offsets >= start_day]
 
-            # Génération des patterns de recharge sur la période
-            for day_offset in range(0, self.days, 7):  # Données hebdomadaires
-                current_date = self.start_date + timedelta(days=day_offset)
+    def _poverty_week(
+        self, wealth: np.ndarray, phone_type: np.ndarray, rng: np.random.Generator
+    ) -> Dict[str, np.ndarray]:
+        """
+        Tire les indicateurs d'une semaine pour tous les utilisateurs
 
-                # Nombre de recharges dans la semaine
-                n_recharges = self.rng.poisson(max(1, wealth * 5 + 2))
+        Args:
+            wealth: Score de richesse initial par utilisateur
+            phone_type: Type de téléphone par utilisateur
+            rng: Flux aléatoire de la semaine
 
-                # Montant total des recharges
-                amounts = self.rng.choice(
-                    self.economic_config["recharge_amounts"],
-                    size=n_recharges,
-                    p=recharge_probs,
-                )
-                total_recharge = int(amounts.sum())
-
-                # Durée d'appel (corrélée à la richesse)
-                call_duration = int(self.rng.gamma(shape=2 + wealth * 3, scale=60))
-
-                # Volume de données (corrélé au type de téléphone et richesse)
-                if user["phone_type"] == "smartphone":
-                    data_mb = round(self.rng.gamma(20 + wealth * 50, 10), 1)
-                elif user["phone_type"] == "feature":
-                    data_mb = round(self.rng.gamma(5 + wealth * 20, 5), 1)
-                else:
-                    data_mb = round(self.rng.exponential(2), 1)
-
-                # Score de diversité des contacts
-                contact_diversity = round(
-                    min(1, max(0, 0.3 + wealth * 0.4 + self.rng.normal(0, 0.15))), 2
+        Returns:
+            Dictionnaire {indicateur: tableau (un élément par utilisateur)}
+        """
+        n_users = len(wealth)
+
+        # Nombre de recharges dans la semaine
+        n_recharges = rng.poisson(np.maximum(1, wealth * 5 + 2))
+
+        # Montant total des recharges: comptes multinomiaux par montant,
+        # avec les probabilités de la classe de richesse
+        amounts = np.asarray(self.economic_config["recharge_amounts"], dtype=np.int64)
+        total_recharge = np.zeros(n_users, dtype=np.int64)
+        is_poor = wealth < 0.4
+        for mask, probs_key in (
+            (is_poor, "recharge_probs_poor"),
+            (~is_poor, "recharge_probs_rich"),
+        ):
+            if mask.any():
+                counts = rng.multinomial(
+                    n_recharges[mask], self.economic_config[probs_key]
                 )
+                total_recharge[mask] = counts @ amounts
 
-                # Rayon de mobilité (corrélé à la richesse)
-                mobility_radius = round(max(0.1, self.rng.gamma(1 + wealth * 5, 2)), 1)
-
-                poverty_records.append(
-                    {
-                        "user_id": user["user_id"],
-                        "timestamp": current_date.isoformat(),
-                        "week_start": current_date.strftime("%Y-%m-%d"),
-                        "latitude": user["home_lat"],
-                        "longitude": user["home_lon"],
-                        "locality": user["locality"],
-                        "department": user.get("department", "Unknown"),
-                        "region": user.get("region", "Unknown"),
-                        "antenna_id": f"ANT_{self.rng.integers(100, 999)}",
-                        "call_duration_sec": call_duration,
-                        "data_mb": data_mb,
-                        "recharge_amount_fcfa": total_recharge,
-                        "recharge_frequency_weekly": n_recharges,
-                        "contact_diversity_score": contact_diversity,
-                        "mobility_radius_km": mobility_radius,
-                        "phone_type": user["phone_type"],
-                        "subscription_type": user["subscription_type"],
-                    }
-                )
+        # Durée d'appel (corrélée à la richesse)
+        call_duration = rng.gamma(shape=2 + wealth * 3, scale=60).astype(np.int64)
+
+        # Volume de données (corrélé au type de téléphone et richesse)
+        data_mb = rng.exponential(2, n_users)
+        smartphone = phone_type == "smartphone"
+        feature = phone_type == "feature"
+        data_mb[smartphone] = rng.gamma(20 + wealth[smartphone] * 50, 10)
+        data_mb[feature] = rng.gamma(5 + wealth[feature] * 20, 5)
+
+        # Score de diversité des contacts
+        contact_diversity = np.clip(
+            0.3 + wealth * 0.4 + rng.normal(0, 0.15, n_users), 0, 1
+        )
+
+        # Rayon de mobilité (corrélé à la richesse)
+        mobility_radius = np.maximum(0.1, rng.gamma(1 + wealth * 5, 2))
+
+        return {
+            "call_duration_sec": call_duration,
+            "data_mb": np.round(data_mb, 1),
+            "recharge_amount_fcfa": total_recharge,
+            "recharge_frequency_weekly": n_recharges,
+            "contact_diversity_score": np.round(contact_diversity, 2),
+            "mobility_radius_km": np.round(mobility_radius, 1),
+        }
+
+    def generate_poverty_data(
+        self, users_df: pd.DataFrame, start_day: int = 0, end_day: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Génère les données spécifiques à l'analyse de la pauvreté
+
+        Le panel est produit semaine par semaine, chaque semaine avec son
+        propre flux aléatoire (voir _period_rng) ; dans une semaine, chaque
+        indicateur est un tableau sur tous les utilisateurs. Les lignes
+        sont ordonnées par semaine puis par utilisateur.
+
+        Args:
+            users_df: DataFrame des profils utilisateurs
+            start_day: Premier jour de la plage générée (mode ajout)
+            end_day: Fin (exclue) de la plage (défaut: days_to_generate)
+
+        Returns:
+            DataFrame avec les indicateurs de pauvreté
+        """
+        logger.info("Génération des données de pauvreté...")
 
-            # Log de progression
-            if (idx + 1) % 2000 == 0:
-                logger.info(f"  {idx + 1}/{len(users_df)} utilisateurs traités...")
+        # Données hebdomadaires
+        week_offsets = self._period_offsets(7, start_day, end_day)
+        week_dates = self.start_date + pd.to_timedelta(week_offsets, unit="D")
+        n_users, n_weeks = len(users_df), len(week_offsets)
+        rows = np.tile(np.arange(n_users), n_weeks)
+
+        def per_row(column: str, default: str = "Unknown") -> np.ndarray:
+            """Répète une colonne utilisateur sur toutes ses semaines"""
+            if column not in users_df.columns:
+                return np.full(n_users * n_weeks, default, dtype=object)
+            return _take(users_df[column], rows)
+
+        # Antenne de rattachement: la plus proche du domicile
+        if "home_antenna" in users_df.columns:
+            home_antenna = users_df["home_antenna"]
+        else:
+            home_antenna = pd.Series(
+                self.antenna_network.assign(users_df["home_lat"], users_df["home_lon"])
+            )
+
+        wealth = users_df["initial_wealth_score"].to_numpy(dtype=float)
+        phone_type = np.asarray(users_df["phone_type"], dtype=object)
+        weeks = [
+            self._poverty_week(wealth, phone_type, self._period_rng("poverty", offset))
+            for offset in week_offsets
+        ] or [
+            self._poverty_week(
+                wealth[:0], phone_type[:0], self._period_rng("poverty", 0)
+            )
+        ]
 
-        df = pd.DataFrame(poverty_records)
+        df = pd.DataFrame(
+            {
+                "user_id": per_row("user_id"),
+                "timestamp": np.repeat(week_dates.to_numpy(), n_users),
+                "week_start": np.repeat(week_dates.normalize().to_numpy(), n_users),
+                "latitude": per_row("home_lat"),
+                "longitude": per_row("home_lon"),
+                "locality": per_row("locality"),
+                "department": per_row("department"),
+                "region": per_row("region"),
+                "antenna_id": _take(home_antenna, rows),
+                **{
+                    name: np.concatenate([week[name] for week in weeks])
+                    for name in weeks[0]
+                },
+                "phone_type": per_row("phone_type"),
+                "subscription_type": per_row("subscription_type"),
+            }
+        )
         logger.info(f"✓ {len(df)} enregistrements de pauvreté générés")
 
-        return df
+        return apply_schema(df, "poverty", self.dtype_backend)
 
     def generate_migration_data(self, users_df: pd.DataFrame) -> pd.DataFrame:
         """
         Génère les données de migration interne
 
+        Tous les migrants sont traités en un seul lot : destinations tirées
+        par arithmétique d'index (origine exclue), coordonnées par
+        l'échantillonneur de polygones, durées par type de migration et
+        distances haversine sous forme de tableaux.
+
         Args:
             users_df: DataFrame des profils utilisateurs
 
@@ -501,19 +948,6 @@ class SyntheticDataGenerator:
         """
         logger.info("Génération des données de migration...")
 
-        migration_types = [
-            "permanent_relocation",
-            "work_migration",
-            "education_migration",
-            "seasonal_agriculture",
-            "temporary_stay",
-            "circular_migration",
-        ]
-
-        migration_probs = [0.15, 0.30, 0.10, 0.20, 0.15, 0.10]
-
-        migration_records = []
-
         # Utiliser les localités GADM si disponibles
         if self.has_gadm:
             available_localities = self.localities
@@ -521,280 +955,370 @@ class SyntheticDataGenerator:
             available_localities = [
                 c for c in self.urban_centers.keys() if c != "Others"
             ]
+        available = np.asarray(available_localities, dtype=object)
+        n_available = len(available)
 
         # Sélectionner un sous-ensemble d'utilisateurs qui migrent
         n_migrants = int(self.n_users * self.migration_config["migration_probability"])
         migrant_indices = self.rng.choice(len(users_df), size=n_migrants, replace=False)
 
-        for idx in migrant_indices:
-            user = users_df.iloc[idx]
-
-            # Origine
-            origin_locality = user["locality"]
-            origin_lat = user["home_lat"]
-            origin_lon = user["home_lon"]
-
-            # Destination (différente de l'origine)
-            available_dests = [c for c in available_localities if c != origin_locality]
-            if not available_dests:
-                available_dests = available_localities
-
-            dest_locality = self.rng.choice(available_dests)
+        # Origine: localité, coordonnées et région du domicile
+        origin_locality = _take(users_df["locality"], migrant_indices)
+        origin_lat = users_df["home_lat"].to_numpy(dtype=float)[migrant_indices]
+        origin_lon = users_df["home_lon"].to_numpy(dtype=float)[migrant_indices]
+        if "region" in users_df.columns:
+            origin_region = _take(users_df["region"], migrant_indices)
+        else:
+            origin_region = np.full(n_migrants, "Unknown", dtype=object)
 
-            # Obtenir les coordonnées de destination
-            if self.has_gadm:
-                dest_lat, dest_lon = self._get_random_point_in_locality(dest_locality)
-                dest_data = self.gadm[self.gadm["NAME_4"] == dest_locality].iloc[0]
-                dest_region = dest_data["NAME_1"]
-                dest_department = dest_data["NAME_2"]
-            else:
-                if dest_locality in self.urban_centers:
-                    dest_lat = self.urban_centers[dest_locality][
-                        "lat"
-                    ] + self.rng.normal(0, 0.05)
-                    dest_lon = self.urban_centers[dest_locality][
-                        "lon"
-                    ] + self.rng.normal(0, 0.05)
-                else:
-                    dest_lat = self.rng.uniform(5, 10)
-                    dest_lon = self.rng.uniform(-8, -4)
-                dest_region = "Unknown"
-                dest_department = "Unknown"
-
-            # Calcul de la distance
-            distance_km = self._haversine_distance(
-                origin_lat, origin_lon, dest_lat, dest_lon
+        # Codes entiers des localités d'origine (-1 si hors de la liste)
+        if self.has_gadm:
+            origin_codes = self._get_locality_codes(origin_locality, strict=False)
+        else:
+            origin_codes = pd.Index(available_localities).get_indexer(
+                np.asarray(origin_locality, dtype=object)
             )
 
-            # Type de migration
-            migration_type = self.rng.choice(migration_types, p=migration_probs)
+        # Destinations (différentes de l'origine): on tire parmi n-1 codes
+        # puis on saute le code d'origine
+        excludes_origin = (origin_codes >= 0) & (n_available >= 2)
+        dest_codes = self.rng.integers(0, n_available - excludes_origin)
+        dest_codes += excludes_origin & (dest_codes >= origin_codes)
 
-            # Durée de résidence
-            if migration_type in ["permanent_relocation", "work_migration"]:
-                residence_days = int(self.rng.uniform(90, 365))
-            elif migration_type == "education_migration":
-                residence_days = int(self.rng.uniform(120, 300))
-            elif migration_type == "seasonal_agriculture":
-                residence_days = int(self.rng.uniform(30, 120))
-            else:
-                residence_days = int(self.rng.uniform(7, 60))
+        # Coordonnées et région de destination tirées en un seul lot
+        if self.has_gadm:
+            dest_lat, dest_lon = self._get_random_points_in_localities(dest_codes)
+            dest_region = self.locality_region[dest_codes]
+        else:
+            center_lat = np.array([self.urban_centers[c]["lat"] for c in available])
+            center_lon = np.array([self.urban_centers[c]["lon"] for c in available])
+            dest_lat = center_lat[dest_codes] + self.rng.normal(0, 0.05, n_migrants)
+            dest_lon = center_lon[dest_codes] + self.rng.normal(0, 0.05, n_migrants)
+            dest_region = np.full(n_migrants, "Unknown", dtype=object)
+
+        # Types de migration et durée de résidence selon le type
+        type_codes = self.migration_type_sampler.sample(self.rng, n_migrants)
+        low, high = np.array(
+            [self.RESIDENCE_DAYS[t] for t in self.MIGRATION_TYPES], dtype=float
+        ).T
+        residence_days = self.rng.uniform(low[type_codes], high[type_codes]).astype(
+            np.int64
+        )
+
+        # Migration de retour? Date de détection
+        is_return = self.rng.random(n_migrants) < 0.3
+        detection_date = self.start_date + pd.to_timedelta(
+            self.rng.integers(0, self.days, n_migrants), unit="D"
+        )
 
-            # Migration de retour?
-            is_return = self.rng.random() < 0.3
+        # Historique des localisations: origine, puis pour les retours une
+        # localité intermédiaire parmi les 3 premières hors origine et
+        # destination (index tiré puis décalé au-delà des codes exclus)
+        has_origin = origin_codes >= 0
+        n_candidates = np.minimum(3, n_available - 1 - has_origin)
+        has_intermediate = is_return & (n_available > 2)
+        intermediate = (self.rng.random(n_migrants) * n_candidates).astype(np.int64)
+        first_excluded = np.where(
+            has_origin, np.minimum(origin_codes, dest_codes), dest_codes
+        )
+        second_excluded = np.where(
+            has_origin, np.maximum(origin_codes, dest_codes), n_available
+        )
+        intermediate += intermediate >= first_excluded
+        intermediate += intermediate >= second_excluded
 
-            # Date de détection
-            detection_date = self.start_date + timedelta(
-                days=int(self.rng.integers(0, self.days))
-            )
+        origin_repr = _repr_labels(origin_locality)
+        intermediate_repr = _repr_labels(
+            available[np.where(has_intermediate, intermediate, 0)]
+        )
+        previous_locations = np.where(
+            has_intermediate,
+            "[" + origin_repr + ", " + intermediate_repr + "]",
+            "[" + origin_repr + "]",
+        )
 
-            # Historique des localisations
-            previous_locations = [origin_locality]
-            if is_return and len(available_localities) > 2:
-                intermediate = self.rng.choice(
-                    [
-                        c
-                        for c in available_localities
-                        if c not in [origin_locality, dest_locality]
-                    ][:3]
-                )
-                previous_locations.append(intermediate)
-
-            migration_records.append(
-                {
-                    "user_id": user["user_id"],
-                    "timestamp": detection_date.isoformat(),
-                    "origin_locality": origin_locality,
-                    "origin_region": user.get("region", "Unknown"),
-                    "current_locality": dest_locality,
-                    "current_region": dest_region,
-                    "origin_lat": round(origin_lat, 6),
-                    "origin_lon": round(origin_lon, 6),
-                    "current_lat": round(dest_lat, 6),
-                    "current_lon": round(dest_lon, 6),
-                    "residence_duration_days": residence_days,
-                    "movement_type": migration_type,
-                    "is_return_migration": is_return,
-                    "previous_locations": str(previous_locations),
-                    "distance_km": round(distance_km, 1),
-                }
-            )
+        origin_lat = np.round(origin_lat, 6)
+        origin_lon = np.round(origin_lon, 6)
+        dest_lat = np.round(dest_lat, 6)
+        dest_lon = np.round(dest_lon, 6)
+
+        df = pd.DataFrame(
+            {
+                "user_id": np.asarray(users_df["user_id"], dtype=object)[
+                    migrant_indices
+                ],
+                "timestamp": detection_date.to_numpy(),
+                "origin_locality": origin_locality,
+                "origin_region": origin_region,
+                "current_locality": available[dest_codes],
+                "current_region": dest_region,
+                "origin_lat": origin_lat,
+                "origin_lon": origin_lon,
+                "current_lat": dest_lat,
+                "current_lon": dest_lon,
+                "residence_duration_days": residence_days,
+                "movement_type": pd.Categorical.from_codes(
+                    type_codes, self.MIGRATION_TYPES
+                ),
+                "is_return_migration": is_return,
+                "previous_locations": previous_locations,
+                # Distances origine-destination (vectorisé)
+                "distance_km": np.round(
+                    haversine(origin_lat, origin_lon, dest_lat, dest_lon), 1
+                ),
+                # Cellules H3 des extrémités de migration
+                **self._get_h3_cells(origin_lat, origin_lon, "origin_h3"),
+                **self._get_h3_cells(dest_lat, dest_lon, "current_h3"),
+            }
+        )
 
-        df = pd.DataFrame(migration_records)
         logger.info(f"✓ {len(df)} événements de migration générés")
 
-        return df
+        return apply_schema(df, "migration", self.dtype_backend)
 
-    def generate_mobility_data(self, users_df: pd.DataFrame) -> pd.DataFrame:
+    def _mobility_day(
+        self,
+        trips_lambda: np.ndarray,
+        wealth: np.ndarray,
+        home_lat: np.ndarray,
+        home_lon: np.ndarray,
+        is_sunday: bool,
+        rng: np.random.Generator,
+    ) -> Dict[str, np.ndarray]:
         """
-        Génère les données de mobilité quotidienne (trajets)
+        Tire les trajets d'une journée pour tous les utilisateurs
 
         Args:
-            users_df: DataFrame des profils utilisateurs
+            trips_lambda: Nombre moyen de trajets par utilisateur
+            wealth: Score de richesse par utilisateur
+            home_lat: Latitude du domicile par utilisateur
+            home_lon: Longitude du domicile par utilisateur
+            is_sunday: La journée est un dimanche
+            rng: Flux aléatoire de la journée
 
         Returns:
-            DataFrame avec les trajets
+            Dictionnaire {attribut: tableau (un élément par trajet)}
         """
-        logger.info("Génération des données de mobilité...")
+        n_users = len(trips_lambda)
 
-        transport_modes = [
-            "walking",
-            "bicycle",
-            "bus",
-            "taxi",
-            "motorbike",
-            "personal_car",
-        ]
-        trip_purposes = [
-            "home_to_work",
-            "work_to_home",
-            "work_internal",
-            "shopping",
-            "leisure",
-            "health",
-            "education",
-            "other",
-        ]
+        # Pas de déplacements le dimanche pour certains
+        skip_day = is_sunday & (rng.random(n_users) < 0.4)
 
-        mobility_records = []
-
-        # Générer pour un échantillon d'utilisateurs (pour limiter la taille)
-        sample_size = min(1000, self.n_users)
-        sample_users = users_df.sample(n=sample_size, random_state=self.seed)
-
-        logger.info(f"  Génération pour {sample_size} utilisateurs...")
-
-        for idx, (_, user) in enumerate(sample_users.iterrows()):
-            wealth = user["initial_wealth_score"]
-
-            # Nombre de jours à générer pour cet utilisateur
-            n_days = min(7, self.days)
-
-            for day_offset in range(n_days):
-                current_date = self.start_date + timedelta(days=day_offset)
-
-                # Pas de déplacements le dimanche pour certains
-                if current_date.weekday() == 6 and self.rng.random() < 0.4:
-                    continue
-
-                # Nombre de trajets dans la journée
-                if user["occupation"] == "employee":
-                    n_trips = self.rng.poisson(4)
-                elif user["occupation"] == "student":
-                    n_trips = self.rng.poisson(3)
-                else:
-                    n_trips = self.rng.poisson(2)
-
-                for trip_num in range(max(1, n_trips)):
-                    trip_id = f"TRIP_{user['user_id'][:6]}_{day_offset}_{trip_num}"
-
-                    # Heure du trajet
-                    if trip_num == 0:
-                        hour = int(max(5, min(10, self.rng.normal(7, 1))))
-                    elif trip_num == n_trips - 1:
-                        hour = int(max(16, min(22, self.rng.normal(18, 2))))
-                    else:
-                        hour = int(self.rng.uniform(9, 17))
-
-                    minute = self.rng.integers(0, 60)
-
-                    # Origine (domicile ou position précédente)
-                    origin_lat = user["home_lat"] + self.rng.normal(0, 0.02)
-                    origin_lon = user["home_lon"] + self.rng.normal(0, 0.02)
-
-                    # Distance et destination
-                    mobility_radius = self.mobility_config["mobility_radius_mean"]
-                    if wealth > 0.5:
-                        mobility_radius *= 1.5
-
-                    angle = self.rng.uniform(0, 2 * np.pi)
-                    distance = abs(self.rng.exponential(mobility_radius / 3))
-
-                    dest_lat = origin_lat + (distance / 111) * np.cos(angle)
-                    dest_lon = origin_lon + (distance / 111) * np.sin(angle)
-
-                    # Mode de transport basé sur la distance et la richesse
-                    if distance < 1:
-                        mode = "walking"
-                        speed = self.rng.uniform(4, 6)
-                    elif distance < 3:
-                        if wealth > 0.6:
-                            mode = self.rng.choice(
-                                ["taxi", "motorbike", "personal_car"]
-                            )
-                        else:
-                            mode = self.rng.choice(["walking", "bus", "motorbike"])
-                        speed = self.rng.uniform(8, 20)
-                    else:
-                        if wealth > 0.7:
-                            mode = self.rng.choice(["taxi", "personal_car"])
-                            speed = self.rng.uniform(25, 50)
-                        else:
-                            mode = self.rng.choice(["bus", "taxi", "motorbike"])
-                            speed = self.rng.uniform(15, 35)
-
-                    # Durée du trajet
-                    duration_min = int(max(1, (distance / speed) * 60))
-
-                    # Motif du trajet
-                    if trip_num == 0:
-                        purpose = "home_to_work"
-                    elif trip_num == n_trips - 1:
-                        purpose = "work_to_home"
-                    else:
-                        purpose = self.rng.choice(
-                            ["work_internal", "shopping", "leisure", "health", "other"]
-                        )
-
-                    mobility_records.append(
-                        {
-                            "user_id": user["user_id"],
-                            "timestamp": f"{current_date.strftime('%Y-%m-%d')} {hour:02d}:{minute:02d}:00",
-                            "trip_id": trip_id,
-                            "origin_lat": round(origin_lat, 6),
-                            "origin_lon": round(origin_lon, 6),
-                            "dest_lat": round(dest_lat, 6),
-                            "dest_lon": round(dest_lon, 6),
-                            "origin_antenna": f"ANT_{self.rng.integers(100, 999)}",
-                            "dest_antenna": f"ANT_{self.rng.integers(100, 999)}",
-                            "duration_min": duration_min,
-                            "distance_km": round(distance, 2),
-                            "speed_kmh": round(speed, 1),
-                            "transport_mode": mode,
-                            "trip_purpose": purpose,
-                            "hour_of_day": hour,
-                            "locality": user["locality"],
-                        }
-                    )
+        # Nombre de trajets dans la journée selon l'occupation
+        n_trips = rng.poisson(trips_lambda)
+        n_emitted = np.where(skip_day, 0, np.maximum(1, n_trips))
 
-            # Log de progression
-            if (idx + 1) % 200 == 0:
-                logger.info(f"  {idx + 1}/{sample_size} utilisateurs traités...")
+        # Expansion en une ligne par trajet
+        user_row = np.repeat(np.arange(n_users), n_emitted)
+        n_rows = len(user_row)
+        trip_num = np.arange(n_rows) - np.repeat(
+            np.cumsum(n_emitted) - n_emitted, n_emitted
+        )
+        day_trips = n_trips[user_row]
+        is_first = trip_num == 0
+        is_last = ~is_first & (trip_num == day_trips - 1)
+        is_middle = ~is_first & ~is_last
+
+        # Heure du trajet
+        hour = np.empty(n_rows, dtype=np.int64)
+        hour[is_first] = np.clip(rng.normal(7, 1, is_first.sum()), 5, 10)
+        hour[is_last] = np.clip(rng.normal(18, 2, is_last.sum()), 16, 22)
+        hour[is_middle] = rng.uniform(9, 17, is_middle.sum())
+        minute = rng.integers(0, 60, n_rows)
+
+        # Origine (domicile bruité)
+        wealth = wealth[user_row]
+        origin_lat = home_lat[user_row] + rng.normal(0, 0.02, n_rows)
+        origin_lon = home_lon[user_row] + rng.normal(0, 0.02, n_rows)
+
+        # Distance et destination
+        mobility_radius = self.mobility_config["mobility_radius_mean"] * np.where(
+            wealth > 0.5, 1.5, 1.0
+        )
+        bearing = rng.uniform(0, 360, n_rows)
+        distance = np.abs(rng.exponential(mobility_radius / 3))
 
-        df = pd.DataFrame(mobility_records)
-        logger.info(f"✓ {len(df)} trajets de mobilité générés")
+        dest_lat, dest_lon = destination_point(
+            origin_lat, origin_lon, distance, bearing
+        )
 
-        return df
+        # Mode de transport basé sur la distance et la richesse:
+        # (masque, modes possibles, plage de vitesse en km/h)
+        short, long_ = distance < 1, distance >= 3
+        medium = ~short & ~long_
+        mode_groups = [
+            (short, ["walking"], (4, 6)),
+            (medium & (wealth > 0.6), ["taxi", "motorbike", "personal_car"], (8, 20)),
+            (medium & (wealth <= 0.6), ["walking", "bus", "motorbike"], (8, 20)),
+            (long_ & (wealth > 0.7), ["taxi", "personal_car"], (25, 50)),
+            (long_ & (wealth <= 0.7), ["bus", "taxi", "motorbike"], (15, 35)),
+        ]
+        mode = np.empty(n_rows, dtype=object)
+        speed = np.empty(n_rows)
+        for mask, modes, (low, high) in mode_groups:
+            m = int(mask.sum())
+            mode[mask] = np.asarray(modes, dtype=object)[rng.integers(0, len(modes), m)]
+            speed[mask] = rng.uniform(low, high, m)
+
+        # Motif du trajet
+        purpose = np.empty(n_rows, dtype=object)
+        purpose[is_first] = "home_to_work"
+        purpose[is_last] = "work_to_home"
+        other_purposes = np.array(
+            ["work_internal", "shopping", "leisure", "health", "other"], dtype=object
+        )
+        purpose[is_middle] = other_purposes[
+            rng.integers(0, len(other_purposes), is_middle.sum())
+        ]
+
+        return {
+            "user_row": user_row,
+            "trip_num": trip_num,
+            "minute_of_day": hour * 60 + minute,
+            "hour": hour,
+            "origin_lat": origin_lat,
+            "origin_lon": origin_lon,
+            "dest_lat": dest_lat,
+            "dest_lon": dest_lon,
+            "distance": distance,
+            "speed": speed,
+            "mode": mode,
+            "purpose": purpose,
+        }
 
-    def _haversine_distance(
-        self, lat1: float, lon1: float, lat2: float, lon2: float
-    ) -> float:
+    def generate_mobility_data(
+        self, users_df: pd.DataFrame, start_day: int = 0, end_day: Optional[int] = None
+    ) -> pd.DataFrame:
         """
-        Calcule la distance en km entre deux points GPS
+        Génère les données de mobilité quotidienne (trajets)
+
+        Les trajets sont générés pour tous les utilisateurs sur toute la
+        période, sauf plafonds explicites dans la config
+        (mobility.max_users, mobility.max_days). Chaque journée a son
+        propre flux aléatoire (voir _period_rng) et chaque attribut y est
+        tiré sous forme de tableau sur tous les utilisateurs. Les lignes
+        sont ordonnées par jour, utilisateur puis trajet.
+
+        Args:
+            users_df: DataFrame des profils utilisateurs
+            start_day: Premier jour de la plage générée (mode ajout)
+            end_day: Fin (exclue) de la plage (défaut: days_to_generate)
 
         Returns:
-            Distance en kilomètres
+            DataFrame avec les trajets
         """
-        R = 6371  # Rayon de la Terre en km
+        logger.info("Génération des données de mobilité...")
+
+        # Plafonds optionnels (None = population et période complètes)
+        max_users = self.mobility_config.get("max_users")
+        max_days = self.mobility_config.get("max_days")
+
+        if max_users is not None and max_users < len(users_df):
+            users = users_df.sample(n=max_users, random_state=self.seed)
+        else:
+            users = users_df
+        if max_days is not None:
+            end_day = max_days if end_day is None else min(end_day, max_days)
+        day_offsets = self._period_offsets(1, start_day, end_day)
+        n_users = len(users)
+
+        logger.info(
+            f"  Génération pour {n_users} utilisateurs sur {len(day_offsets)} jours..."
+        )
+
+        # Attributs utilisateur constants sur la période
+        trips_lambda = (
+            users["occupation"]
+            .map({"employee": 4, "student": 3})
+            .astype(float)
+            .fillna(2)
+            .to_numpy()
+        )
+        wealth = users["initial_wealth_score"].to_numpy(dtype=float)
+        home_lat = users["home_lat"].to_numpy(dtype=float)
+        home_lon = users["home_lon"].to_numpy(dtype=float)
+        dates = self.start_date + pd.to_timedelta(day_offsets, unit="D")
+
+        days = [
+            self._mobility_day(
+                trips_lambda,
+                wealth,
+                home_lat,
+                home_lon,
+                date.weekday() == 6,
+                self._period_rng("mobility", offset),
+            )
+            for offset, date in zip(day_offsets, dates)
+        ] or [
+            self._mobility_day(
+                trips_lambda[:0],
+                wealth[:0],
+                home_lat[:0],
+                home_lon[:0],
+                False,
+                self._period_rng("mobility", 0),
+            )
+        ]
+        trips = {name: np.concatenate([day[name] for day in days]) for name in days[0]}
+        day_of_row = np.repeat(
+            np.arange(len(day_offsets)), [len(day["user_row"]) for day in days]
+        )
+        user_row = trips["user_row"]
+        n_rows = len(user_row)
+
+        # Identifiants et horodatages
+        user_ids = np.asarray(users["user_id"], dtype=object)[user_row]
+        trip_id = (
+            "TRIP_"
+            + pd.Series(user_ids).str[:6]
+            + "_"
+            + pd.Series(day_offsets[day_of_row]).astype(str)
+            + "_"
+            + pd.Series(trips["trip_num"]).astype(str)
+        )
+        timestamp = dates[day_of_row] + pd.to_timedelta(
+            trips["minute_of_day"], unit="min"
+        )
 
-        lat1, lon1, lat2, lon2 = map(np.radians, [lat1, lon1, lat2, lon2])
+        distance, speed = trips["distance"], trips["speed"]
+        duration_min = np.maximum(1, (distance / speed) * 60).astype(np.int64)
 
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
+        origin_lat = np.round(trips["origin_lat"], 6)
+        origin_lon = np.round(trips["origin_lon"], 6)
+        dest_lat = np.round(trips["dest_lat"], 6)
+        dest_lon = np.round(trips["dest_lon"], 6)
 
-        a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
-        c = 2 * np.arcsin(np.sqrt(a))
+        # Antennes d'origine et de destination: une seule requête au réseau
+        antennas = self.antenna_network.assign(
+            np.concatenate([origin_lat, dest_lat]),
+            np.concatenate([origin_lon, dest_lon]),
+        )
 
-        return R * c
+        df = pd.DataFrame(
+            {
+                "user_id": user_ids,
+                "timestamp": timestamp.to_numpy(),
+                "trip_id": trip_id.to_numpy(),
+                "origin_lat": origin_lat,
+                "origin_lon": origin_lon,
+                "dest_lat": dest_lat,
+                "dest_lon": dest_lon,
+                **self._get_h3_cells(origin_lat, origin_lon, "origin_h3"),
+                **self._get_h3_cells(dest_lat, dest_lon, "dest_h3"),
+                "origin_antenna": antennas[:n_rows],
+                "dest_antenna": antennas[n_rows:],
+                "duration_min": duration_min,
+                "distance_km": np.round(distance, 2),
+                "speed_kmh": np.round(speed, 1),
+                "transport_mode": trips["mode"],
+                "trip_purpose": trips["purpose"],
+                "hour_of_day": trips["hour"],
+                "locality": _take(users["locality"], user_row),
+            }
+        )
+        logger.info(f"✓ {n_rows} trajets de mobilité générés")
+
+        return apply_schema(df, "mobility", self.dtype_backend)
 
     def save_datasets(
         self,
@@ -803,9 +1327,19 @@ class SyntheticDataGenerator:
         migration_df: pd.DataFrame,
         mobility_df: pd.DataFrame,
         output_dir: Optional[str] = None,
+        n_shards: Optional[int] = None,
     ) -> Dict[str, str]:
         """
         Sauvegarde tous les datasets générés
+
+        Args:
+            users_df, poverty_df, migration_df, mobility_df: Datasets générés
+            output_dir: Répertoire de sortie (défaut: paths.output_dir)
+            n_shards: Nombre de shards utilisés (None = génération sans shards),
+                enregistré pour le mode ajout
+
+        Returns:
+            Dictionnaire des chemins écrits
         """
         if output_dir is None:
             output_dir = self.config["paths"]["output_dir"]
@@ -816,30 +1350,180 @@ class SyntheticDataGenerator:
         # Timestamp pour versionning
         version = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-        saved_files = {}
-
-        # Sauvegarde en CSV et Parquet
+        # Sauvegarde dans les formats configurés (section export)
         datasets = {
+            name: apply_schema(df, name, self.dtype_backend)
+            for name, df in (
+                ("users", users_df),
+                ("poverty", poverty_df),
+                ("migration", migration_df),
+                ("mobility", mobility_df),
+                ("antennas", self.antenna_network.table),
+            )
+        }
+        exporter = DatasetExporter.from_config(self.config.get("export"))
+        saved_files = exporter.export(datasets, output_path, version)
+
+        # Métadonnées
+        saved_files["metadata"] = self._write_metadata(
+            output_path,
+            version,
+            {
+                name: {"rows": len(df), "columns": list(df.columns)}
+                for name, df in datasets.items()
+            },
+            n_shards=n_shards,
+        )
+
+        logger.info(f"✓ Datasets sauvegardés dans {output_path}")
+
+        return saved_files
+
+    def _shard_plan(self, n_shards: int) -> List[Dict]:
+        """
+        Découpe la population en shards avec leurs flux aléatoires
+
+        Chaque shard reçoit un flux enfant via SeedSequence.spawn : le
+        découpage ne dépend que du seed et de n_shards, pas du nombre de
+        workers.
+
+        Args:
+            n_shards: Nombre de shards
+
+        Returns:
+            Liste de descripteurs de shard (index, offset, taille, seed)
+        """
+        n_shards = max(1, min(int(n_shards), self.n_users))
+        seed_seq = np.random.SeedSequence(self.seed)
+        child_seeds = seed_seq.spawn(n_shards)
+
+        sizes = np.full(n_shards, self.n_users // n_shards)
+        sizes[: self.n_users % n_shards] += 1
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+        # Plafond de trajets réparti entre les shards au prorata
+        max_users = self.mobility_config.get("max_users")
+        if max_users is not None:
+            max_users = min(max_users, self.n_users)
+            shard_caps = np.full(n_shards, max_users // n_shards)
+            shard_caps[: max_users % n_shards] += 1
+        else:
+            shard_caps = [None] * n_shards
+
+        # Sel des identifiants et horodatage dérivés du seed (reproductibles)
+        salt = "".join(f"{w:08x}" for w in seed_seq.generate_state(2))
+
+        return [
+            {
+                "index": i,
+                "offset": int(offsets[i]),
+                "n_users": int(sizes[i]),
+                "seed_seq": child_seeds[i],
+                "max_users": None if shard_caps[i] is None else int(shard_caps[i]),
+                "salt": salt,
+                "created_at": self.start_date.isoformat(),
+            }
+            for i in range(n_shards)
+        ]
+
+    def _shard_generator(self, shard: Dict) -> "SyntheticDataGenerator":
+        """Copie légère du générateur restreinte à un shard"""
+        shard_gen = copy.copy(self)
+        shard_gen.n_users = shard["n_users"]
+        shard_gen.rng = np.random.default_rng(shard["seed_seq"])
+        shard_gen.seed_seq = shard["seed_seq"]
+        shard_gen.mobility_config = dict(
+            self.mobility_config, max_users=shard["max_users"]
+        )
+        return shard_gen
+
+    def generate_shard(self, shard: Dict) -> Dict[str, pd.DataFrame]:
+        """
+        Génère les quatre datasets d'un shard d'utilisateurs
+
+        Args:
+            shard: Descripteur produit par _shard_plan
+
+        Returns:
+            Dictionnaire des DataFrames du shard
+        """
+        gen = self._shard_generator(shard)
+        users_df = gen.generate_user_profiles(
+            offset=shard["offset"], salt=shard["salt"], created_at=shard["created_at"]
+        )
+        return {
             "users": users_df,
-            "poverty": poverty_df,
-            "migration": migration_df,
-            "mobility": mobility_df,
+            "poverty": gen.generate_poverty_data(users_df),
+            "migration": gen.generate_migration_data(users_df),
+            "mobility": gen.generate_mobility_data(users_df),
         }
 
-        for name, df in datasets.items():
-            # CSV
-            csv_path = output_path / f"{name}_{version}.csv"
-            df.to_csv(csv_path, index=False)
-            saved_files[f"{name}_csv"] = str(csv_path)
+    def generate_sharded(
+        self, n_shards: Optional[int] = None, n_workers: Optional[int] = None
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Génère tous les datasets par shards, en parallèle sur plusieurs processus
 
-            # Parquet
-            parquet_path = output_path / f"{name}_{version}.parquet"
-            df.to_parquet(parquet_path, index=False, compression="snappy")
-            saved_files[f"{name}_parquet"] = str(parquet_path)
+        Le résultat concaténé est identique bit à bit pour un seed et un
+        nombre de shards donnés, quel que soit le nombre de workers.
 
-            logger.info(f"  ✓ {name}: {len(df)} enregistrements sauvegardés")
+        Args:
+            n_shards: Nombre de shards (défaut: generation.n_shards)
+            n_workers: Nombre de processus (défaut: generation.n_workers,
+                sinon nombre de cœurs)
 
-        # Métadonnées
+        Returns:
+            Dictionnaire des DataFrames concaténés
+        """
+        plan = self._shard_plan(n_shards or self.n_shards)
+        n_workers = n_workers or self.n_workers or os.cpu_count() or 1
+        n_workers = max(1, min(int(n_workers), len(plan)))
+
+        logger.info(f"Génération par shards: {len(plan)} shards, {n_workers} workers")
+
+        if n_workers == 1:
+            results = [self.generate_shard(shard) for shard in plan]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=n_workers,
+                initializer=_init_shard_worker,
+                initargs=(self,),
+            ) as executor:
+                results = list(executor.map(_run_shard, plan))
+
+        # Les catégories diffèrent d'un shard à l'autre: schéma réappliqué
+        return {
+            name: apply_schema(
+                pd.concat([r[name] for r in results], ignore_index=True),
+                name,
+                self.dtype_backend,
+            )
+            for name in ("users", "poverty", "migration", "mobility")
+        }
+
+    def _write_metadata(
+        self,
+        output_path: Path,
+        version: str,
+        datasets_info: Dict[str, Dict],
+        n_shards: Optional[int] = None,
+    ) -> str:
+        """
+        Écrit le fichier de métadonnées YAML d'une génération
+
+        La graine, le nombre de jours et le découpage en shards y sont
+        enregistrés : ils suffisent à reconstruire les flux aléatoires par
+        période pour prolonger la version (append_period).
+
+        Args:
+            output_path: Répertoire de sortie
+            version: Version (horodatage) des fichiers
+            datasets_info: Nombre de lignes et colonnes par dataset
+            n_shards: Nombre de shards (None = génération sans shards)
+
+        Returns:
+            Chemin du fichier de métadonnées
+        """
         metadata = {
             "version": version,
             "generation_timestamp": datetime.now().isoformat(),
@@ -850,53 +1534,276 @@ class SyntheticDataGenerator:
                 "start": self.start_date.isoformat(),
                 "end": self.end_date.isoformat(),
             },
-            "datasets": {
-                "users": {"rows": len(users_df), "columns": list(users_df.columns)},
-                "poverty": {
-                    "rows": len(poverty_df),
-                    "columns": list(poverty_df.columns),
-                },
-                "migration": {
-                    "rows": len(migration_df),
-                    "columns": list(migration_df.columns),
-                },
-                "mobility": {
-                    "rows": len(mobility_df),
-                    "columns": list(mobility_df.columns),
-                },
+            "generation": {
+                "random_seed": self.seed,
+                "days": self.days,
+                "n_shards": n_shards,
             },
+            "datasets": datasets_info,
         }
 
         metadata_path = output_path / f"metadata_{version}.yml"
+        with open(metadata_path, "w", encoding="utf-8") as f:
+            yaml.dump(metadata, f, default_flow_style=False, allow_unicode=True)
+
+        return str(metadata_path)
+
+    def generate_streaming(
+        self,
+        output_dir: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+        n_workers: int = 1,
+    ) -> Dict[str, str]:
+        """
+        Génère tous les datasets par blocs d'utilisateurs écrits directement en Parquet
+
+        Chaque bloc est un shard (voir generate_sharded) : il est généré,
+        écrit comme row group (ou partitions Hive si streaming.partition_cols
+        est configuré) puis libéré. La mémoire dépend de chunk_size et
+        non de n_users ; le résultat est identique à generate_sharded avec
+        autant de shards que de blocs.
+
+        Args:
+            output_dir: Répertoire de sortie (défaut: paths.output_dir)
+            chunk_size: Utilisateurs par bloc (défaut: streaming.chunk_size)
+            n_workers: Processus générant les blocs en avance (1 = séquentiel)
+
+        Returns:
+            Dictionnaire des chemins écrits
+        """
+        streaming_config = self.config.get("streaming", {})
+        chunk_size = chunk_size or streaming_config.get("chunk_size", 50000)
+        partition_cols = streaming_config.get("partition_cols") or {}
+
+        if output_dir is None:
+            output_dir = self.config["paths"]["output_dir"]
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+        version = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        plan = self._shard_plan(-(-self.n_users // chunk_size))
+        logger.info(
+            f"Génération en flux: {self.n_users} utilisateurs, "
+            f"{len(plan)} blocs de {chunk_size} max"
+        )
+
+        names = ("users", "poverty", "migration", "mobility")
+        sinks = {
+            name: ParquetSink(
+                output_path
+                / (
+                    f"{name}_{version}"
+                    if partition_cols.get(name)
+                    else f"{name}_{version}.parquet"
+                ),
+                partition_cols=partition_cols.get(name),
+                compression=self.config.get("export", {}).get("compression", "zstd"),
+            )
+            for name in names + ("antennas",)
+        }
+
+        def flush(chunk: Dict[str, pd.DataFrame]) -> None:
+            for name in names:
+                sinks[name].write(chunk[name])
+
+        try:
+            # Table des antennes (commune à tous les blocs), référencée par
+            # home_antenna, antenna_id et origin/dest_antenna
+            sinks["antennas"].write(
+                apply_schema(self.antenna_network.table, "antennas", self.dtype_backend)
+            )
+            if n_workers <= 1:
+                for shard in plan:
+                    flush(self.generate_shard(shard))
+            else:
+                # Au plus n_workers blocs en vol, consommés dans l'ordre
+                with ProcessPoolExecutor(
+                    max_workers=n_workers,
+                    initializer=_init_shard_worker,
+                    initargs=(self,),
+                ) as executor:
+                    pending = []
+                    for shard in plan:
+                        pending.append(executor.submit(_run_shard, shard))
+                        if len(pending) >= n_workers:
+                            flush(pending.pop(0).result())
+                    for future in pending:
+                        flush(future.result())
+        finally:
+            for sink in sinks.values():
+                sink.close()
+
+        saved_files = {
+            f"{name}_parquet": str(sink.path) for name, sink in sinks.items()
+        }
+        for name, sink in sinks.items():
+            logger.info(f"  ✓ {name}: {sink.rows} enregistrements écrits")
+
+        saved_files["metadata"] = self._write_metadata(
+            output_path,
+            version,
+            {
+                name: {"rows": sink.rows, "columns": sink.columns}
+                for name, sink in sinks.items()
+            },
+            n_shards=len(plan),
+        )
+        logger.info(f"✓ Datasets écrits en flux dans {output_path}")
+
+        return saved_files
+
+    def append_period(
+        self, version: str, n_days: int, output_dir: Optional[str] = None
+    ) -> Dict[str, str]:
+        """
+        Prolonge une version existante de n_days jours
+
+        Les profils utilisateurs sont relus depuis la version, et la graine,
+        le nombre de jours et le découpage en shards depuis ses métadonnées.
+        Seules les nouvelles semaines (pauvreté) et journées (mobilité) sont
+        générées, chacune avec son flux aléatoire (voir _period_rng), puis
+        ajoutées comme nouvelles parties Parquet et en fin des CSV. Les
+        lignes obtenues sont celles qu'une régénération complète sur la
+        période prolongée produirait ; le coût ne dépend que des jours
+        ajoutés. Les événements de migration ne sont pas prolongés.
+
+        Args:
+            version: Version à prolonger (suffixe des fichiers)
+            n_days: Nombre de jours ajoutés
+            output_dir: Répertoire des datasets (défaut: paths.output_dir)
+
+        Returns:
+            Dictionnaire des chemins mis à jour
+        """
+        output_path = Path(output_dir or self.config["paths"]["output_dir"])
+        metadata_path = output_path / f"metadata_{version}.yml"
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            metadata = yaml.safe_load(f)
+
+        # État de la version: graine, période et shards
+        generation = metadata["generation"]
+        self.seed = generation["random_seed"]
+        self.seed_seq = np.random.SeedSequence(self.seed)
+        self.start_date = pd.Timestamp(metadata["period"]["start"])
+        start_day = generation["days"]
+        self.days = start_day + int(n_days)
+        self.end_date = pd.Timestamp(metadata["period"]["end"]) + pd.Timedelta(
+            days=int(n_days)
+        )
+
+        users_path = next(
+            path
+            for path in (
+                output_path / f"users_{version}.parquet",
+                output_path / f"users_{version}.csv",
+            )
+            if path.exists()
+        )
+        users_df = load_dataset(users_path, "users", self.dtype_backend)
+        self.n_users = len(users_df)
+
+        logger.info(
+            f"Ajout des jours {start_day} à {self.days - 1} à la version {version}"
+        )
+
+        if generation["n_shards"] is None:
+            parts = [(self, users_df)]
+        else:
+            parts = [
+                (
+                    self._shard_generator(shard),
+                    users_df.iloc[shard["offset"] : shard["offset"] + shard["n_users"]],
+                )
+                for shard in self._shard_plan(generation["n_shards"])
+            ]
+
+        datasets = {
+            name: apply_schema(
+                pd.concat(
+                    [generate(gen, users, start_day=start_day) for gen, users in parts],
+                    ignore_index=True,
+                ),
+                name,
+                self.dtype_backend,
+            )
+            for name, generate in (
+                ("poverty", SyntheticDataGenerator.generate_poverty_data),
+                ("mobility", SyntheticDataGenerator.generate_mobility_data),
+            )
+        }
+
+        exporter = DatasetExporter.from_config(self.config.get("export"))
+        saved_files = exporter.append(
+            datasets, output_path, version, part=f"{start_day:05d}-{self.days - 1:05d}"
+        )
+
+        # Métadonnées mises à jour (période, lignes, historique des ajouts)
+        for name, df in datasets.items():
+            metadata["datasets"][name]["rows"] += len(df)
+        metadata["period"]["end"] = self.end_date.isoformat()
+        generation["days"] = self.days
+        metadata.setdefault("appends", []).append(
+            {
+                "timestamp": datetime.now().isoformat(),
+                "start_day": start_day,
+                "end_day": self.days,
+                "rows": {name: len(df) for name, df in datasets.items()},
+            }
+        )
         with open(metadata_path, "w", encoding="utf-8") as f:
             yaml.dump(metadata, f, default_flow_style=False, allow_unicode=True)
         saved_files["metadata"] = str(metadata_path)
 
-        logger.info(f"✓ Datasets sauvegardés dans {output_path}")
+        logger.info(f"✓ Version {version} prolongée jusqu'au jour {self.days - 1}")
 
         return saved_files
 
-    def generate_all(self, save: bool = True) -> Dict[str, pd.DataFrame]:
+    def generate_all(
+        self,
+        save: bool = True,
+        n_shards: Optional[int] = None,
+        n_workers: Optional[int] = None,
+    ) -> Dict[str, pd.DataFrame]:
         """
         Génère tous les datasets en une seule commande
+
+        Args:
+            save: Sauvegarder les datasets
+            n_shards: Nombre de shards (> 1 active la génération par shards)
+            n_workers: Nombre de processus pour la génération par shards
+
+        Returns:
+            Dictionnaire des DataFrames générés
         """
         logger.info("=== Démarrage de la génération complète ===")
 
-        # 1. Profils utilisateurs
-        users_df = self.generate_user_profiles()
+        n_shards = n_shards or self.n_shards
+        if n_shards > 1:
+            datasets = self.generate_sharded(n_shards, n_workers)
+            users_df = datasets["users"]
+            poverty_df = datasets["poverty"]
+            migration_df = datasets["migration"]
+            mobility_df = datasets["mobility"]
+        else:
+            n_shards = None
+
+            # 1. Profils utilisateurs
+            users_df = self.generate_user_profiles()
 
-        # 2. Données de pauvreté
-        poverty_df = self.generate_poverty_data(users_df)
+            # 2. Données de pauvreté
+            poverty_df = self.generate_poverty_data(users_df)
 
-        # 3. Données de migration
-        migration_df = self.generate_migration_data(users_df)
+            # 3. Données de migration
+            migration_df = self.generate_migration_data(users_df)
 
-        # 4. Données de mobilité
-        mobility_df = self.generate_mobility_data(users_df)
+            # 4. Données de mobilité
+            mobility_df = self.generate_mobility_data(users_df)
 
         # Sauvegarde si demandé
         if save:
-            self.save_datasets(users_df, poverty_df, migration_df, mobility_df)
+            self.save_datasets(
+                users_df, poverty_df, migration_df, mobility_df, n_shards=n_shards
+            )
 
         logger.info("=== Génération complète terminée ===")
 
@@ -908,6 +1815,94 @@ class SyntheticDataGenerator:
         }
 
 
+def _take(column: pd.Series, positions: np.ndarray) -> np.ndarray:
+    """
+    Sélectionne des valeurs d'une colonne par position
+
+    Les colonnes catégorielles restent catégorielles (sélection sur les
+    codes), sans passer par un tableau d'objets.
+
+    Args:
+        column: Colonne source
+        positions: Positions à extraire (répétitions autorisées)
+
+    Returns:
+        Tableau ou Categorical des valeurs sélectionnées
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        codes = column.cat.codes.to_numpy()[positions]
+        return pd.Categorical.from_codes(codes, dtype=column.dtype)
+    return np.asarray(column)[positions]
+
+
+def _categorical(codes: np.ndarray, labels: Sequence) -> pd.Categorical:
+    """
+    Categorical des libellés désignés par des codes tirés
+
+    Équivaut à pd.Categorical(np.asarray(labels)[codes]) (modalités
+    observées, triées ; libellés répétés fusionnés, manquants conservés)
+    sans tableau d'objets par ligne.
+
+    Args:
+        codes: Position de chaque valeur dans labels
+        labels: Libellé de chaque code
+
+    Returns:
+        Categorical des libellés
+    """
+    label_codes, categories = pd.factorize(np.asarray(labels, dtype=object), sort=True)
+    codes = label_codes[codes]
+    observed = np.bincount(codes + 1, minlength=len(categories) + 1)[1:] > 0
+    remap = np.append(np.cumsum(observed) - 1, -1)
+    return pd.Categorical.from_codes(remap[codes], categories=categories[observed])
+
+
+def _label_scores(labels, scores: Dict[str, float]) -> np.ndarray:
+    """
+    Score de chaque libellé, calculé par modalité (0 si absent du barème)
+
+    Args:
+        labels: Tableau ou Categorical de libellés
+        scores: Barème {libellé: score}
+
+    Returns:
+        Tableau de scores
+    """
+    categorical = pd.Categorical(labels)
+    table = np.array([scores.get(c, 0.0) for c in categorical.categories] + [0.0])
+    return table[categorical.codes]
+
+
+def _repr_labels(labels) -> np.ndarray:
+    """
+    Représentation Python (repr) de chaque libellé, calculée par modalité
+
+    Args:
+        labels: Tableau ou Categorical de libellés
+
+    Returns:
+        Tableau de chaînes (ex: "'Abidjan'")
+    """
+    categorical = pd.Categorical(labels)
+    reprs = np.array([repr(str(c)) for c in categorical.categories] + ["''"])
+    return reprs[categorical.codes].astype(object)
+
+
+# Générateur partagé par les processus workers (initialisé une fois par worker)
+_SHARD_GENERATOR: Optional[SyntheticDataGenerator] = None
+
+
+def _init_shard_worker(generator: SyntheticDataGenerator) -> None:
+    """Initialise le générateur du processus worker"""
+    global _SHARD_GENERATOR
+    _SHARD_GENERATOR = generator
+
+
+def _run_shard(shard: Dict) -> Dict[str, pd.DataFrame]:
+    """Génère un shard dans un processus worker"""
+    return _SHARD_GENERATOR.generate_shard(shard)
+
+
 def main():
     """Point d'entrée principal"""
     import argparse
@@ -927,12 +1922,54 @@ def main():
     parser.add_argument(
         "--no-save", action="store_true", help="Ne pas sauvegarder les fichiers"
     )
+    parser.add_argument(
+        "--shards", type=int, default=None, help="Nombre de shards (optionnel)"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Nombre de processus (optionnel)"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Écrire directement en Parquet par blocs (mémoire bornée)",
+    )
+    parser.add_argument(
+        "--append",
+        type=str,
+        default=None,
+        metavar="VERSION",
+        help="Prolonger une version existante (avec --days)",
+    )
+    parser.add_argument(
+        "--days", type=int, default=1, help="Nombre de jours ajoutés (--append)"
+    )
 
     args = parser.parse_args()
 
     # Génération
     generator = SyntheticDataGenerator(config_path=args.config)
-    datasets = generator.generate_all(save=not args.no_save)
+
+    if args.append:
+        saved_files = generator.append_period(
+            args.append, args.days, output_dir=args.output
+        )
+        print("\n=== Fichiers mis à jour ===")
+        for name, path in saved_files.items():
+            print(f"  {name}: {path}")
+        return
+
+    if args.stream:
+        saved_files = generator.generate_streaming(
+            output_dir=args.output, n_workers=args.workers or 1
+        )
+        print("\n=== Fichiers écrits ===")
+        for name, path in saved_files.items():
+            print(f"  {name}: {path}")
+        return
+
+    datasets = generator.generate_all(
+        save=not args.no_save, n_shards=args.shards, n_workers=args.workers
+    )
 
     # Affichage du résumé
     print("\n=== Résumé de la génération ===")
@@ -0,0 +1,298 @@
+"""
+Générateur vectorisé de flux de mobilité temporels
+Projet: Mobilité Côte d'Ivoire - ANStat
+
+Ce module simule les flux origine-destination quotidiens entre les
+principales localités sur une ou plusieurs années. Tous les mouvements
+de toutes les journées sont tirés en une seule passe, et le résultat est
+mis en cache dans un fichier Parquet relu par le dashboard. En
+production, ces données viendraient des CDR réels.
+"""
+
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from loguru import logger
+
+# Ajout du chemin src pour les imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.alias_sampler import AliasSampler
+
+# Localités principales avec coordonnées et poids démographique
+LOCALITIES = {
+    "Abidjan": {"lat": 5.36, "lon": -4.01, "weight": 0.35},
+    "Bouaké": {"lat": 7.69, "lon": -5.03, "weight": 0.12},
+    "Yamoussoukro": {"lat": 6.82, "lon": -5.28, "weight": 0.08},
+    "Korhogo": {"lat": 9.46, "lon": -5.63, "weight": 0.07},
+    "San-Pédro": {"lat": 4.75, "lon": -6.64, "weight": 0.06},
+    "Daloa": {"lat": 6.88, "lon": -6.45, "weight": 0.05},
+    "Man": {"lat": 7.41, "lon": -7.55, "weight": 0.05},
+    "Gagnoa": {"lat": 6.13, "lon": -5.95, "weight": 0.04},
+    "Abengourou": {"lat": 6.73, "lon": -3.50, "weight": 0.04},
+    "Divo": {"lat": 5.84, "lon": -5.36, "weight": 0.04},
+    "Bondoukou": {"lat": 8.04, "lon": -2.80, "weight": 0.03},
+    "Odienné": {"lat": 9.51, "lon": -7.57, "weight": 0.03},
+    "Séguéla": {"lat": 7.96, "lon": -6.67, "weight": 0.02},
+    "Ferkessédougou": {"lat": 9.59, "lon": -5.19, "weight": 0.02},
+}
+
+# Motifs de déplacement
+MIGRATION_TYPES = ["Travail", "Études", "Famille", "Commerce", "Autre"]
+MIGRATION_TYPE_PROBS = [0.35, 0.20, 0.25, 0.12, 0.08]
+
+# Facteur saisonnier par mois (index 0 = janvier):
+# rentrée (sept-oct), fêtes (déc), vacances (juil-août), pluies (avr-juin)
+MONTHLY_FACTORS = np.array([1.0, 1.0, 1.0, 0.8, 0.8, 0.8, 1.2, 1.2, 1.3, 1.3, 1.0, 1.5])
+
+# Moins de mobilité le weekend
+WEEKEND_FACTOR = 0.7
+
+
+class TemporalFlowGenerator:
+    """
+    Génère les flux origine-destination quotidiens sur une période
+
+    Les facteurs saisonniers sont calculés comme un tableau sur les dates,
+    le nombre de mouvements par jour est tiré en un seul appel Poisson,
+    puis origines, destinations, volumes et motifs sont tirés pour tous
+    les mouvements à la fois.
+    """
+
+    def __init__(
+        self,
+        start_date: str = "2025-01-01",
+        n_days: int = 365,
+        daily_movements: float = 50,
+        destination_boost: Optional[Dict[str, float]] = None,
+        seed: int = 42,
+    ):
+        """
+        Initialise le générateur
+
+        Args:
+            start_date: Premier jour simulé
+            n_days: Nombre de jours (plusieurs années possibles)
+            daily_movements: Nombre moyen de mouvements par jour (hors saison)
+            destination_boost: Multiplicateur d'attractivité par destination
+                (défaut: Abidjan x2)
+            seed: Graine aléatoire
+        """
+        self.start_date = pd.Timestamp(start_date)
+        self.n_days = int(n_days)
+        self.daily_movements = float(daily_movements)
+        self.destination_boost = (
+            {"Abidjan": 2.0} if destination_boost is None else destination_boost
+        )
+        self.seed = seed
+
+        self.names = list(LOCALITIES)
+        self.lats = np.array([LOCALITIES[n]["lat"] for n in self.names])
+        self.lons = np.array([LOCALITIES[n]["lon"] for n in self.names])
+        self.origin_probs = np.array([LOCALITIES[n]["weight"] for n in self.names])
+        self.origin_probs = self.origin_probs / self.origin_probs.sum()
+
+        dest_weights = self.origin_probs * np.array(
+            [self.destination_boost.get(n, 1.0) for n in self.names]
+        )
+        self.dest_probs = dest_weights / dest_weights.sum()
+
+        # Tables d'alias construites une fois par distribution
+        self.origin_sampler = AliasSampler(self.origin_probs)
+        self.dest_sampler = AliasSampler(self.dest_probs)
+        self.motive_sampler = AliasSampler(MIGRATION_TYPE_PROBS)
+
+    @property
+    def params(self) -> Dict:
+        """Paramètres identifiant un jeu de données (clé du cache)"""
+        return {
+            "start_date": self.start_date.strftime("%Y-%m-%d"),
+            "n_days": self.n_days,
+            "daily_movements": self.daily_movements,
+            "destination_boost": self.destination_boost,
+            "seed": self.seed,
+        }
+
+    @staticmethod
+    def seasonal_factors(dates: pd.DatetimeIndex) -> np.ndarray:
+        """
+        Facteur d'intensité de mobilité pour chaque date
+
+        Args:
+            dates: Dates simulées
+
+        Returns:
+            Tableau des facteurs (mois x weekend)
+        """
+        factors = MONTHLY_FACTORS[dates.month.to_numpy() - 1]
+        return np.where(
+            dates.weekday.to_numpy() >= 5, factors * WEEKEND_FACTOR, factors
+        )
+
+    def generate(self) -> pd.DataFrame:
+        """
+        Génère les flux de toute la période
+
+        Returns:
+            DataFrame des flux (un mouvement inter-localités par ligne)
+        """
+        rng = np.random.default_rng(self.seed)
+        dates = pd.date_range(self.start_date, periods=self.n_days, freq="D")
+
+        # Nombre de mouvements par jour, puis jour de chaque mouvement
+        counts = rng.poisson(self.daily_movements * self.seasonal_factors(dates))
+        day = np.repeat(np.arange(self.n_days), counts)
+        n = len(day)
+
+        origin = self.origin_sampler.sample(rng, n)
+        destination = self.dest_sampler.sample(rng, n)
+        flow_count = rng.integers(1, 20, n)
+        motive = self.motive_sampler.sample(rng, n)
+
+        # Les mouvements intra-localité ne sont pas des flux
+        keep = origin != destination
+        day, origin, destination = day[keep], origin[keep], destination[keep]
+        flow_count, motive = flow_count[keep], motive[keep]
+
+        flow_dates = dates[day]
+        df = pd.DataFrame(
+            {
+                "date": flow_dates,
+                "month": flow_dates.month.astype(np.int8),
+                "week": flow_dates.isocalendar().week.to_numpy().astype(np.int8),
+                "day_of_week": flow_dates.weekday.astype(np.int8),
+                "origin": pd.Categorical.from_codes(origin, self.names),
+                "origin_lat": self.lats[origin],
+                "origin_lon": self.lons[origin],
+                "destination": pd.Categorical.from_codes(destination, self.names),
+                "dest_lat": self.lats[destination],
+                "dest_lon": self.lons[destination],
+                "flow_count": flow_count.astype(np.int32),
+                "migration_type": pd.Categorical.from_codes(motive, MIGRATION_TYPES),
+            }
+        )
+
+        logger.info(f"✓ {len(df)} flux temporels générés sur {self.n_days} jours")
+        return df
+
+    def write_parquet(self, df: pd.DataFrame, path: str) -> Path:
+        """
+        Écrit les flux en Parquet avec leurs paramètres de génération
+
+        Args:
+            df: Flux générés
+            path: Fichier de sortie
+
+        Returns:
+            Chemin du fichier écrit
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[b"temporal_flows_params"] = json.dumps(self.params).encode()
+        pq.write_table(
+            table.replace_schema_metadata(metadata), path, compression="zstd"
+        )
+
+        return path
+
+
+def _artifact_params(path: Path) -> Optional[Dict]:
+    """Lit les paramètres de génération stockés dans un artefact Parquet"""
+    metadata = pq.read_schema(path).metadata or {}
+    raw = metadata.get(b"temporal_flows_params")
+    return json.loads(raw) if raw else None
+
+
+def load_temporal_flows(
+    path: str = "data/processed/temporal_flows.parquet",
+    rebuild: bool = False,
+    **params,
+) -> pd.DataFrame:
+    """
+    Charge les flux temporels depuis l'artefact Parquet, le (re)génère si besoin
+
+    L'artefact est régénéré s'il est absent, si rebuild est demandé
+    ou si ses paramètres diffèrent.
+
+    Args:
+        path: Fichier Parquet de cache
+        rebuild: Forcer la régénération
+        **params: Paramètres de TemporalFlowGenerator
+
+    Returns:
+        DataFrame des flux
+    """
+    path = Path(path)
+    generator = TemporalFlowGenerator(**params)
+
+    if rebuild or not path.exists() or _artifact_params(path) != generator.params:
+        logger.info(f"Génération de l'artefact de flux temporels: {path}")
+        generator.write_parquet(generator.generate(), path)
+
+    return pq.read_table(path).to_pandas()
+
+
+def generate_temporal_mobility_data(
+    n_days: int = 365, n_users: int = 1000
+) -> pd.DataFrame:
+    """
+    Génère des données de mobilité temporelles simulées pour toute l'année.
+    En production, ces données viendraient des CDR réels.
+
+    Args:
+        n_days: Nombre de jours simulés
+        n_users: Conservé pour compatibilité (non utilisé)
+
+    Returns:
+        DataFrame des flux
+    """
+    return TemporalFlowGenerator(n_days=n_days).generate()
+
+
+def main():
+    """Point d'entrée: construit l'artefact Parquet des flux temporels"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Génération des flux de mobilité temporels (artefact Parquet)"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="data/processed/temporal_flows.parquet",
+        help="Fichier Parquet de sortie",
+    )
+    parser.add_argument("--start-date", type=str, default="2025-01-01")
+    parser.add_argument("--days", type=int, default=365, help="Nombre de jours")
+    parser.add_argument(
+        "--daily-movements",
+        type=float,
+        default=50,
+        help="Nombre moyen de mouvements par jour",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+
+    args = parser.parse_args()
+
+    df = load_temporal_flows(
+        args.output,
+        rebuild=True,
+        start_date=args.start_date,
+        n_days=args.days,
+        daily_movements=args.daily_movements,
+        seed=args.seed,
+    )
+    print(f"{len(df)} flux écrits dans {args.output}")
+
+
+if __name__ == "__main__":
+    main()
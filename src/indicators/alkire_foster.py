@@ -0,0 +1,198 @@
+"""
+Pauvreté multidimensionnelle: méthode Alkire-Foster matricielle
+Projet: Mobilité Côte d'Ivoire - ANStat
+
+La matrice des privations (utilisateurs x indicateurs) est construite une
+fois. Le score pondéré de chaque utilisateur est situé parmi les seuils k
+(un searchsorted) : un utilisateur de rang b est pauvre pour les b
+premiers seuils. Une seule réduction groupée par (zone, rang), suivie
+d'une somme cumulée sur les rangs, donne pour tous les seuils et toutes
+les zones H (incidence), A (intensité), M0 (IPM ajusté) et les taux de
+privation censurés, sans boucle sur les zones ni sur les seuils.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Seuils k évalués par défaut (part pondérée des privations)
+DEFAULT_K_CUTOFFS = np.round(np.arange(1, 11) / 10, 2)
+
+# Tolérance de comparaison score >= k (sommes de poids flottants)
+K_TOLERANCE = 1e-9
+
+
+def deprivation_matrix(
+    df: pd.DataFrame,
+    dimensions: Dict[str, Dict]
+) -> Tuple[pd.DataFrame, pd.Series]:
+    """
+    Matrice des privations et poids des indicateurs
+
+    Le poids d'une dimension est partagé également entre ses indicateurs
+    présents; les poids sont normalisés (somme 1). Un indicateur est une
+    privation s'il est sous son seuil (valeur ou 'percentile_XX').
+
+    Args:
+        df: Données par utilisateur
+        dimensions: {dimension: {'indicators': [...], 'threshold': ..., 'weight': ...}}
+
+    Returns:
+        Tuple (privations booléennes utilisateurs x indicateurs, poids par indicateur)
+    """
+    columns, weights = {}, {}
+    for dim_config in dimensions.values():
+        indicators = [col for col in dim_config['indicators'] if col in df.columns]
+        threshold = dim_config['threshold']
+        for indicator in indicators:
+            if isinstance(threshold, str) and 'percentile' in threshold:
+                pct = int(threshold.split('_')[1])
+                threshold_value = df[indicator].quantile(pct / 100)
+            else:
+                threshold_value = threshold
+
+            # Privation si en dessous du seuil
+            columns[indicator] = (df[indicator] < threshold_value).to_numpy()
+            weights[indicator] = dim_config['weight'] / len(indicators)
+
+    deprivations = pd.DataFrame(columns, index=df.index, dtype=bool)
+    weights = pd.Series(weights, dtype=float)
+    if len(weights):
+        weights = weights / weights.sum()
+    return deprivations, weights
+
+
+def _cutoff_ranks(scores: np.ndarray, cutoffs: np.ndarray) -> np.ndarray:
+    """Nombre de seuils k (triés) tels que score >= k"""
+    return np.searchsorted(cutoffs, scores + K_TOLERANCE, side='right')
+
+
+def _measures(tail: np.ndarray, weights: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Mesures AF depuis les sommes cumulées (..., seuils + 1, 2 + indicateurs)
+
+    tail[..., i, :] somme (effectif, score, privations) des utilisateurs de
+    rang > i - 1; la population est tail[..., 0, 0].
+    """
+    population = tail[..., 0, 0]
+    poor = tail[..., 1:, :]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pop = population[..., None]
+        headcount = poor[..., 0] / pop
+        adjusted = poor[..., 1] / pop
+        intensity = poor[..., 1] / poor[..., 0]
+        censored = poor[..., 2:] / pop[..., None]
+        contributions = censored * weights / adjusted[..., None]
+
+    return {
+        'population': population,
+        'n_poor': poor[..., 0],
+        'H': headcount,
+        'A': intensity,
+        'M0': adjusted,
+        'censored': censored,
+        'contributions': contributions,
+    }
+
+
+def alkire_foster(
+    deprivations: pd.DataFrame,
+    weights: pd.Series,
+    cutoffs: Sequence[float] = DEFAULT_K_CUTOFFS,
+    groups: Optional[pd.DataFrame] = None
+) -> Dict[str, pd.DataFrame]:
+    """
+    Mesures Alkire-Foster pour un vecteur de seuils k, globales et par zone
+
+    Args:
+        deprivations: Privations booléennes (utilisateurs x indicateurs)
+        weights: Poids des indicateurs (somme 1), alignés sur les colonnes
+        cutoffs: Seuils k de pauvreté (part pondérée des privations)
+        groups: Colonnes de zones emboîtées (ex: region, department, locality)
+
+    Returns:
+        Dictionnaire de DataFrames:
+        - 'measures': par k, population, n_poor, H, A, M0
+        - 'censored_headcounts': par k, taux de privation censuré par indicateur
+        - 'contributions': par k, contribution de chaque indicateur à M0
+        - 'by_<zone>': par (zone, k), mesures, part de population,
+          contribution à M0 national et taux censurés (censored_<indicateur>)
+    """
+    indicators = list(deprivations.columns)
+    w = weights.reindex(indicators).to_numpy(dtype=np.float64)
+    cutoffs = np.unique(np.asarray(cutoffs, dtype=np.float64))
+    n_ranks = len(cutoffs) + 1
+
+    matrix = deprivations.to_numpy(dtype=np.float64)
+    scores = matrix @ w
+    ranks = _cutoff_ranks(scores, cutoffs)
+
+    # Réduction groupée unique: sommes par (combinaison de zones, rang)
+    levels: List[str] = [] if groups is None else list(groups.columns)
+    if levels:
+        grouped = groups.groupby(levels, observed=True, sort=True, dropna=False)
+        combo = grouped.ngroup().to_numpy()
+        combos = grouped.size().index
+        n_combos = len(combos)
+    else:
+        combo = np.zeros(len(scores), dtype=np.int64)
+        n_combos = 1
+    key = combo * n_ranks + ranks
+    values = np.column_stack([np.ones(len(scores)), scores, matrix])
+    sums = np.stack(
+        [np.bincount(key, weights=col, minlength=n_combos * n_ranks) for col in values.T],
+        axis=-1
+    ).reshape(n_combos, n_ranks, -1)
+
+    # Somme cumulée décroissante sur les rangs: utilisateurs avec score >= k
+    tail = np.flip(np.cumsum(np.flip(sums, axis=1), axis=1), axis=1)
+
+    k_index = pd.Index(cutoffs, name='k')
+    national = _measures(tail.sum(axis=0), w)
+    results = {
+        'measures': pd.DataFrame(
+            {
+                'population': national['population'],
+                'n_poor': national['n_poor'],
+                'H': national['H'],
+                'A': national['A'],
+                'M0': national['M0'],
+            },
+            index=k_index
+        ),
+        'censored_headcounts': pd.DataFrame(national['censored'], index=k_index, columns=indicators),
+        'contributions': pd.DataFrame(national['contributions'], index=k_index, columns=indicators),
+    }
+
+    # Niveaux de zones: agrégation des combinaisons (quelques centaines de lignes)
+    total_m0 = national['M0'] * national['population']
+    for depth, level in enumerate(levels):
+        level_codes, level_values = pd.factorize(
+            combos.get_level_values(depth), sort=True, use_na_sentinel=False
+        )
+        level_tail = np.zeros((len(level_values), n_ranks, tail.shape[2]))
+        np.add.at(level_tail, level_codes, tail)
+        measures = _measures(level_tail, w)
+
+        n_levels = len(level_values)
+        index = pd.MultiIndex.from_product([level_values, cutoffs], names=[level, 'k'])
+        frame = pd.DataFrame(
+            {
+                'population': np.repeat(measures['population'], len(cutoffs)),
+                'population_share': np.repeat(measures['population'] / national['population'], len(cutoffs)),
+                'n_poor': measures['n_poor'].ravel(),
+                'H': measures['H'].ravel(),
+                'A': measures['A'].ravel(),
+                'M0': measures['M0'].ravel(),
+            },
+            index=index
+        )
+        with np.errstate(divide='ignore', invalid='ignore'):
+            frame['contribution'] = (measures['M0'] * measures['population'][:, None] / total_m0).ravel()
+        censored = measures['censored'].reshape(n_levels * len(cutoffs), -1)
+        for j, indicator in enumerate(indicators):
+            frame[f'censored_{indicator}'] = censored[:, j]
+        results[f'by_{level}'] = frame
+
+    return results
@@ -0,0 +1,338 @@
+"""
+Agrégation incrémentale des features de pauvreté par utilisateur
+Projet: Mobilité Côte d'Ivoire - ANStat
+
+Au lieu de regrouper tout l'historique hebdomadaire à chaque calcul, on
+conserve par utilisateur et par feature l'effectif, la somme et la somme
+des carrés. Une nouvelle semaine met à jour ces compteurs en O(lignes
+nouvelles) ; moyennes et variances se lisent directement. L'état est
+stocké en tableaux NumPy (une ligne par utilisateur) et persisté en
+Parquet entre les exécutions.
+
+Une semaine peut arriver en plusieurs lots (un fichier par shard) : le
+dédoublonnage porte sur le couple (user_id, week_start), mémorisé dans un
+masque de bits par utilisateur.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from loguru import logger
+
+# Version du format persisté (à incrémenter si son contenu change)
+AGGREGATOR_FORMAT_VERSION = 2
+
+# Attributs conservés tels qu'observés à la première apparition
+DEFAULT_FIRST_COLUMNS = [
+    'phone_type',
+    'subscription_type',
+    'district',
+    'locality',
+    'department',
+    'region',
+]
+
+
+class UserFeatureAggregator:
+    """
+    Compteurs (effectif, somme, somme des carrés) par utilisateur et feature
+
+    Les utilisateurs reçoivent un code entier à leur première apparition ;
+    les tableaux sont agrandis par doublement de capacité. Chaque semaine
+    (week_start) reçoit un bit ; une ligne dont le couple (utilisateur,
+    semaine) est déjà intégré est ignorée, ce qui permet de soumettre une
+    semaine en plusieurs lots.
+    """
+
+    def __init__(
+        self,
+        feature_columns: Sequence[str],
+        first_columns: Optional[Sequence[str]] = None
+    ):
+        """
+        Initialise un agrégateur vide
+
+        Args:
+            feature_columns: Features numériques agrégées
+                (ex: PovertyIndexCalculator.feature_columns)
+            first_columns: Attributs conservés à la première apparition
+        """
+        self.feature_columns = list(feature_columns)
+        self.first_columns = list(DEFAULT_FIRST_COLUMNS if first_columns is None else first_columns)
+        self.weeks: List[str] = []
+
+        self.n_users = 0
+        self._codes: Dict[str, int] = {}
+        self._user_ids = np.empty(0, dtype=object)
+        k = len(self.feature_columns)
+        self._count = np.zeros((0, k), dtype=np.int64)
+        self._sum = np.zeros((0, k))
+        self._sumsq = np.zeros((0, k))
+        self._first = {col: np.empty(0, dtype=object) for col in self.first_columns}
+        self._seen = np.zeros((0, 1), dtype=np.uint8)
+
+    def _reserve(self, n_new: int) -> None:
+        """Agrandit les tableaux (capacité doublée) pour n_new utilisateurs"""
+        needed = self.n_users + n_new
+        capacity = len(self._user_ids)
+        if needed <= capacity:
+            return
+
+        capacity = max(needed, 2 * capacity, 1024)
+        k = len(self.feature_columns)
+
+        def grown(array: np.ndarray, shape: tuple) -> np.ndarray:
+            out = np.zeros(shape, dtype=array.dtype) if array.dtype != object else np.full(shape, None, dtype=object)
+            out[:self.n_users] = array[:self.n_users]
+            return out
+
+        self._user_ids = grown(self._user_ids, (capacity,))
+        self._count = grown(self._count, (capacity, k))
+        self._sum = grown(self._sum, (capacity, k))
+        self._sumsq = grown(self._sumsq, (capacity, k))
+        self._first = {col: grown(values, (capacity,)) for col, values in self._first.items()}
+        self._seen = grown(self._seen, (capacity, self._seen.shape[1]))
+
+    def _week_codes(self, week_start: pd.Series) -> np.ndarray:
+        """Index des semaines (nouvelles semaines ajoutées, masque élargi)"""
+        local, uniques = pd.factorize(pd.to_datetime(week_start))
+        labels = uniques.strftime('%Y-%m-%d')
+        known = set(self.weeks)
+        self.weeks.extend(sorted(week for week in labels if week not in known))
+
+        width = -(-len(self.weeks) // 8)
+        if width > self._seen.shape[1]:
+            seen = np.zeros((len(self._seen), max(width, 2 * self._seen.shape[1])), dtype=np.uint8)
+            seen[:, :self._seen.shape[1]] = self._seen
+            self._seen = seen
+
+        return pd.Index(self.weeks).get_indexer(labels)[local]
+
+    def update(self, df: pd.DataFrame) -> int:
+        """
+        Intègre de nouvelles lignes hebdomadaires
+
+        Une semaine peut être soumise en plusieurs lots ; les lignes dont
+        le couple (user_id, week_start) est déjà intégré (ou répété dans
+        le lot) sont ignorées.
+
+        Args:
+            df: Lignes (user_id, features, attributs, week_start optionnel)
+
+        Returns:
+            Nombre de lignes intégrées (hors couples utilisateur-semaine déjà vus)
+        """
+        if len(df) == 0:
+            return 0
+
+        # Codes locaux (ordre de première apparition), puis codes globaux
+        local, uniques = pd.factorize(np.asarray(df['user_id'], dtype=object))
+        codes = np.fromiter((self._codes.get(user, -1) for user in uniques), np.int64, len(uniques))
+
+        new = np.flatnonzero(codes < 0)
+        if len(new):
+            self._reserve(len(new))
+            codes[new] = np.arange(self.n_users, self.n_users + len(new))
+            self._codes.update(zip(uniques[new], codes[new].tolist()))
+            self._user_ids[codes[new]] = uniques[new]
+
+            first_rows = np.unique(local, return_index=True)[1][new]
+            for col in self.first_columns:
+                if col in df.columns:
+                    self._first[col][codes[new]] = np.asarray(df[col], dtype=object)[first_rows]
+            self.n_users += len(new)
+
+        # Couples (utilisateur, semaine) déjà intégrés ou répétés dans le lot
+        keep = np.ones(len(df), dtype=bool)
+        if 'week_start' in df.columns:
+            users, weeks = codes[local], self._week_codes(df['week_start'])
+            byte, bit = weeks >> 3, (1 << (weeks & 7)).astype(np.uint8)
+            keep = (self._seen[users, byte] & bit) == 0
+            keep &= ~pd.Series(users * len(self.weeks) + weeks).duplicated().to_numpy()
+            np.bitwise_or.at(self._seen, (users[keep], byte[keep]), bit[keep])
+            if not keep.all():
+                logger.warning(f"{int((~keep).sum())} lignes utilisateur-semaine déjà agrégées ignorées")
+
+        # Réduction du lot par utilisateur, puis ajout aux compteurs
+        n_local = len(uniques)
+        for j, col in enumerate(self.feature_columns):
+            if col not in df.columns:
+                continue
+            values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            valid = ~np.isnan(values) & keep
+            values = np.where(valid, values, 0.0)
+            self._count[codes, j] += np.bincount(local, weights=valid.astype(np.float64), minlength=n_local).astype(np.int64)
+            self._sum[codes, j] += np.bincount(local, weights=values, minlength=n_local)
+            self._sumsq[codes, j] += np.bincount(local, weights=values * values, minlength=n_local)
+
+        return int(keep.sum())
+
+    @property
+    def user_ids(self) -> np.ndarray:
+        """Identifiants des utilisateurs (ordre des codes)"""
+        return self._user_ids[:self.n_users]
+
+    def counts(self) -> pd.DataFrame:
+        """Nombre d'observations non manquantes par utilisateur et feature"""
+        return pd.DataFrame(
+            self._count[:self.n_users], columns=self.feature_columns,
+            index=pd.Index(self.user_ids, name='user_id')
+        )
+
+    def means(self) -> pd.DataFrame:
+        """
+        Moyennes courantes par utilisateur (entrée de prepare_features)
+
+        Returns:
+            DataFrame user_id, moyennes des features, attributs
+        """
+        count = self._count[:self.n_users]
+        total = self._sum[:self.n_users]
+        means = np.divide(total, count, out=np.full(total.shape, np.nan), where=count > 0)
+
+        df = pd.DataFrame(means, columns=self.feature_columns)
+        df.insert(0, 'user_id', self.user_ids)
+        for col in self.first_columns:
+            values = self._first[col][:self.n_users]
+            if pd.notna(values).any():
+                df[col] = values
+        return df
+
+    def variances(self, ddof: int = 1) -> pd.DataFrame:
+        """
+        Variances courantes par utilisateur
+
+        Args:
+            ddof: Degrés de liberté retirés (1 = variance d'échantillon)
+
+        Returns:
+            DataFrame user_id, variance de chaque feature (NaN si effectif <= ddof)
+        """
+        count = self._count[:self.n_users]
+        total = self._sum[:self.n_users]
+        squares = self._sumsq[:self.n_users]
+
+        safe = np.maximum(count, 1)
+        scatter = np.maximum(squares - total * total / safe, 0.0)
+        variances = np.divide(
+            scatter, count - ddof, out=np.full(scatter.shape, np.nan), where=count > ddof
+        )
+
+        df = pd.DataFrame(variances, columns=self.feature_columns)
+        df.insert(0, 'user_id', self.user_ids)
+        return df
+
+    def save(self, path: str) -> Path:
+        """
+        Persiste l'état (Parquet, écriture puis renommage)
+
+        Args:
+            path: Fichier Parquet de destination
+
+        Returns:
+            Chemin du fichier écrit
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        n = self.n_users
+
+        columns = {'user_id': pa.array(self.user_ids.astype(str))}
+        for j, col in enumerate(self.feature_columns):
+            columns[f'{col}__count'] = pa.array(self._count[:n, j])
+            columns[f'{col}__sum'] = pa.array(self._sum[:n, j])
+            columns[f'{col}__sumsq'] = pa.array(self._sumsq[:n, j])
+        for col in self.first_columns:
+            columns[f'{col}__first'] = pa.array(self._first[col][:n], type=pa.string(), from_pandas=True)
+        width = self._seen.shape[1]
+        columns['weeks__seen'] = pa.FixedSizeBinaryArray.from_buffers(
+            pa.binary(width), n, [None, pa.py_buffer(np.ascontiguousarray(self._seen[:n]).tobytes())]
+        )
+
+        table = pa.table(columns)
+        state = {
+            'format_version': AGGREGATOR_FORMAT_VERSION,
+            'feature_columns': self.feature_columns,
+            'first_columns': self.first_columns,
+            'weeks': self.weeks,
+        }
+        metadata = {b'feature_aggregator': json.dumps(state).encode()}
+        tmp_path = path.with_name(path.name + '.tmp')
+        pq.write_table(table.replace_schema_metadata(metadata), tmp_path, compression='zstd')
+        tmp_path.replace(path)
+
+        logger.info(f"✓ Agrégats de {n} utilisateurs ({len(self.weeks)} semaines) sauvegardés: {path}")
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> 'UserFeatureAggregator':
+        """
+        Recharge un état persisté
+
+        Args:
+            path: Fichier Parquet écrit par save
+
+        Returns:
+            UserFeatureAggregator
+        """
+        table = pq.read_table(path)
+        raw = (table.schema.metadata or {}).get(b'feature_aggregator')
+        state = json.loads(raw) if raw else {}
+        version = state.get('format_version')
+        if version != AGGREGATOR_FORMAT_VERSION:
+            raise ValueError(
+                f"Agrégats {path}: format v{version}, v{AGGREGATOR_FORMAT_VERSION} attendu"
+            )
+
+        aggregator = cls(state['feature_columns'], state['first_columns'])
+        aggregator.weeks = list(state['weeks'])
+        n = table.num_rows
+        aggregator._reserve(n)
+        aggregator.n_users = n
+
+        user_ids = table.column('user_id').to_numpy(zero_copy_only=False).astype(object)
+        aggregator._user_ids[:n] = user_ids
+        aggregator._codes = dict(zip(user_ids, range(n)))
+        for j, col in enumerate(aggregator.feature_columns):
+            aggregator._count[:n, j] = table.column(f'{col}__count').to_numpy()
+            aggregator._sum[:n, j] = table.column(f'{col}__sum').to_numpy()
+            aggregator._sumsq[:n, j] = table.column(f'{col}__sumsq').to_numpy()
+        for col in aggregator.first_columns:
+            aggregator._first[col][:n] = table.column(f'{col}__first').to_numpy(zero_copy_only=False)
+        seen = table.column('weeks__seen').combine_chunks()
+        width = seen.type.byte_width
+        buffer = np.frombuffer(seen.buffers()[1], dtype=np.uint8)
+        aggregator._seen = np.zeros((len(aggregator._user_ids), width), dtype=np.uint8)
+        aggregator._seen[:n] = buffer[seen.offset * width:(seen.offset + n) * width].reshape(n, width)
+
+        return aggregator
+
+    @classmethod
+    def load_or_create(
+        cls,
+        path: str,
+        feature_columns: Sequence[str]
+    ) -> 'UserFeatureAggregator':
+        """
+        Recharge l'état s'il existe, sinon crée un agrégateur vide
+
+        Args:
+            path: Fichier Parquet de l'état
+            feature_columns: Features attendues
+
+        Returns:
+            UserFeatureAggregator
+        """
+        if Path(path).exists():
+            aggregator = cls.load(path)
+            if aggregator.feature_columns != list(feature_columns):
+                raise ValueError(
+                    f"Agrégats {path}: features {aggregator.feature_columns}, "
+                    f"attendu {list(feature_columns)}"
+                )
+            return aggregator
+        return cls(feature_columns)
@@ -0,0 +1,182 @@
+"""
+Indicateurs d'inégalité pondérés et décompositions par zone
+Projet: Mobilité Côte d'Ivoire - ANStat
+
+Pour un niveau de zones, les utilisateurs sont triés une fois par (zone,
+valeur) ; les sommes cumulées des poids (ménages) et des valeurs
+pondérées donnent, pour toutes les zones à la fois, la courbe de Lorenz,
+le Gini, les parts de la distribution (Palma, S80/S20) et les indices de
+Theil avec leur décomposition intra/inter-zones.
+
+Les indices de Theil ne sont définis que pour des valeurs strictement
+positives: les valeurs nulles ou négatives en sont exclues.
+"""
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+# Quantiles de population des parts de Lorenz utilisées
+LORENZ_POINTS = {'p20': 0.2, 'p40': 0.4, 'p80': 0.8, 'p90': 0.9}
+
+# Mesures renvoyées (par distribution ou par zone)
+PUBLIC_MEASURES = [
+    'population', 'mean', 'gini', 'theil_t', 'theil_l',
+    'palma_ratio', 's80_s20_ratio', 'share_bottom_40', 'share_top_10',
+]
+
+
+def _group_measures(
+    values: np.ndarray,
+    weights: np.ndarray,
+    codes: np.ndarray,
+    n_groups: int
+) -> Dict[str, np.ndarray]:
+    """
+    Mesures d'inégalité de chaque groupe (un tri, des sommes cumulées)
+
+    Args:
+        values: Valeurs (ex: indice de richesse)
+        weights: Poids strictement positifs (ex: taille des ménages)
+        codes: Code de groupe de chaque valeur (0..n_groups-1)
+        n_groups: Nombre de groupes
+
+    Returns:
+        Dictionnaire de tableaux par groupe (poids, moyenne, gini, theil_t,
+        theil_l, palma_ratio, s80_s20_ratio, parts de Lorenz)
+    """
+    # Tri par (groupe, valeur): tri des valeurs, puis tri stable des codes
+    order = np.argsort(values)
+    if n_groups > 1:
+        order = order[np.argsort(codes[order], kind='stable')]
+    y, w, g = values[order], weights[order], codes[order]
+    wy = w * y
+
+    total_w = np.bincount(g, weights=w, minlength=n_groups)
+    total_y = np.bincount(g, weights=wy, minlength=n_groups)
+
+    # Sommes cumulées intra-groupe: cumul global moins le cumul avant le groupe
+    start = np.searchsorted(g, np.arange(n_groups))
+    cum_w = np.cumsum(w)
+    cum_y = np.cumsum(wy)
+    before_w = np.where(start > 0, cum_w[start - 1], 0.0)
+    before_y = np.where(start > 0, cum_y[start - 1], 0.0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        P = (cum_w - before_w[g]) / total_w[g]
+        L = (cum_y - before_y[g]) / total_y[g]
+        P_prev = P - w / total_w[g]
+        L_prev = L - wy / total_y[g]
+
+        # Gini: 1 - somme des trapèzes sous la courbe de Lorenz
+        gini = 1.0 - np.bincount(g, weights=(P - P_prev) * (L + L_prev), minlength=n_groups)
+
+        # Parts de Lorenz aux quantiles de population (interpolation linéaire)
+        key = g + P
+        end = np.append(start[1:], len(g)) - 1
+        lorenz = {}
+        for name, p in LORENZ_POINTS.items():
+            idx = np.minimum(np.searchsorted(key, np.arange(n_groups) + p), np.maximum(end, 0))
+            frac = (p - P_prev[idx]) / (P[idx] - P_prev[idx])
+            lorenz[name] = L_prev[idx] + (L[idx] - L_prev[idx]) * frac
+
+        # Theil (valeurs strictement positives)
+        positive = y > 0
+        log_y = np.log(np.where(positive, y, 1.0))
+        pos_w = np.bincount(g, weights=w * positive, minlength=n_groups)
+        pos_y = np.bincount(g, weights=wy * positive, minlength=n_groups)
+        pos_mean = pos_y / pos_w
+        theil_t = np.bincount(g, weights=wy * log_y * positive, minlength=n_groups) / pos_y - np.log(pos_mean)
+        theil_l = np.log(pos_mean) - np.bincount(g, weights=w * log_y * positive, minlength=n_groups) / pos_w
+
+        return {
+            'population': total_w,
+            'mean': total_y / total_w,
+            'gini': gini,
+            'theil_t': theil_t,
+            'theil_l': theil_l,
+            'palma_ratio': (1.0 - lorenz['p90']) / lorenz['p40'],
+            's80_s20_ratio': (1.0 - lorenz['p80']) / lorenz['p20'],
+            'share_bottom_40': lorenz['p40'],
+            'share_top_10': 1.0 - lorenz['p90'],
+            'positive_population': pos_w,
+            'positive_total': pos_y,
+        }
+
+
+def _check(values, weights) -> tuple:
+    """Convertit valeurs et poids (poids unitaires par défaut)"""
+    values = np.asarray(values, dtype=np.float64)
+    weights = np.ones(len(values)) if weights is None else np.asarray(weights, dtype=np.float64)
+    if len(weights) != len(values):
+        raise ValueError(f"{len(weights)} poids pour {len(values)} valeurs")
+    if not np.isfinite(values).all():
+        raise ValueError("Les valeurs doivent être finies")
+    if (weights <= 0).any() or not np.isfinite(weights).all():
+        raise ValueError("Les poids doivent être finis et strictement positifs")
+    return values, weights
+
+
+def inequality_measures(values, weights=None) -> Dict[str, float]:
+    """
+    Indicateurs d'inégalité d'une distribution
+
+    Args:
+        values: Valeurs (ex: indice de richesse par utilisateur)
+        weights: Poids (ex: household_size; défaut: unitaires)
+
+    Returns:
+        Dictionnaire population (somme des poids), mean, gini, theil_t,
+        theil_l, palma_ratio, s80_s20_ratio, share_bottom_40, share_top_10
+    """
+    values, weights = _check(values, weights)
+    measures = _group_measures(values, weights, np.zeros(len(values), dtype=np.int64), 1)
+    return {name: float(measures[name][0]) for name in PUBLIC_MEASURES}
+
+
+def decompose_by_group(values, groups, weights=None) -> Dict:
+    """
+    Indicateurs par zone et décomposition intra/inter-zones des Theil
+
+    Theil T = somme_z s_z T_z + somme_z s_z ln(mu_z / mu) (s_z: part du total)
+    Theil L = somme_z p_z L_z + somme_z p_z ln(mu / mu_z) (p_z: part de population)
+
+    Args:
+        values: Valeurs
+        groups: Zone de chaque valeur
+        weights: Poids (défaut: unitaires)
+
+    Returns:
+        Dictionnaire 'groups' (DataFrame par zone) et 'decomposition'
+        (within/between/total et part inter-zones pour theil_t et theil_l)
+    """
+    values, weights = _check(values, weights)
+    codes, labels = pd.factorize(pd.Series(groups).to_numpy(), sort=True, use_na_sentinel=False)
+    measures = _group_measures(values, weights, codes, len(labels))
+
+    frame = pd.DataFrame({name: measures[name] for name in PUBLIC_MEASURES}, index=pd.Index(labels, name='group'))
+    frame['population_share'] = measures['population'] / measures['population'].sum()
+
+    # Décomposition sur la population à valeurs positives (celle des Theil)
+    pos_w, pos_y = measures['positive_population'], measures['positive_total']
+    keep = pos_w > 0
+    pop_share = pos_w[keep] / pos_w.sum()
+    value_share = pos_y[keep] / pos_y.sum()
+    ratio = (pos_y[keep] / pos_w[keep]) / (pos_y.sum() / pos_w.sum())
+
+    decomposition = {}
+    for name, within, between in [
+        ('theil_t', value_share @ measures['theil_t'][keep], value_share @ np.log(ratio)),
+        ('theil_l', pop_share @ measures['theil_l'][keep], -(pop_share @ np.log(ratio))),
+    ]:
+        between = max(0.0, between)  # nul aux arrondis près si les moyennes sont égales
+        total = within + between
+        decomposition[name] = {
+            'total': float(total),
+            'within': float(within),
+            'between': float(between),
+            'between_share': float(between / total) if total > 0 else 0.0,
+        }
+
+    return {'groups': frame, 'decomposition': decomposition}
@@ -6,12 +6,19 @@ Ce module détecte et caractérise les migrations à partir
 des changements de localisation résidentielle.
 """
 
+import sys
+from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 from loguru import logger
 
+# Ajout du chemin src pour les imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.geodesy import haversine, pairwise_distance_matrix
+
 
 class MigrationDetector:
     """
@@ -153,7 +160,7 @@ class MigrationDetector:
         Returns:
             DataFrame enrichi avec les classifications
         """
-        result = df.copy()
+        result = self.add_distances(df.copy())
 
         # Classification par distance
         result["migration_class"] = pd.cut(
@@ -198,6 +205,71 @@ class MigrationDetector:
         )
         return pd.DataFrame()
 
+    # Paires de colonnes (origine, destination) utilisables pour les distances
+    COORDINATE_COLUMNS = [
+        ("origin_lat", "origin_lon", "current_lat", "current_lon"),
+        ("origin_lat", "origin_lon", "destination_lat", "destination_lon"),
+    ]
+
+    def add_distances(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Calcule distance_km à partir des coordonnées si elle est absente
+
+        Les distances manquantes sont calculées en une seule opération
+        vectorisée (haversine) sur toutes les lignes.
+
+        Args:
+            df: DataFrame des migrations (modifié en place)
+
+        Returns:
+            DataFrame avec la colonne distance_km complétée si possible
+        """
+        for cols in self.COORDINATE_COLUMNS:
+            if not all(col in df.columns for col in cols):
+                continue
+
+            missing = (
+                df["distance_km"].isna()
+                if "distance_km" in df.columns
+                else pd.Series(True, index=df.index)
+            )
+            if missing.any():
+                distances = haversine(*(df.loc[missing, col] for col in cols))
+                if "distance_km" not in df.columns:
+                    df["distance_km"] = np.nan
+                df.loc[missing, "distance_km"] = np.round(distances, 1)
+            break
+
+        return df
+
+    def calculate_zone_distance_matrix(
+        self,
+        df: pd.DataFrame,
+        zone_col: str = "current_region",
+        lat_col: str = "current_lat",
+        lon_col: str = "current_lon",
+    ) -> pd.DataFrame:
+        """
+        Calcule la matrice des distances entre les centres des zones
+
+        Le centre d'une zone est la position moyenne des migrants qui s'y
+        trouvent; les distances sont calculées par blocs en float32.
+
+        Args:
+            df: DataFrame avec les migrations
+            zone_col: Colonne de zone
+            lat_col: Colonne de latitude
+            lon_col: Colonne de longitude
+
+        Returns:
+            DataFrame carré (zones × zones) des distances en km
+        """
+        centers = df.groupby(zone_col, observed=True)[[lat_col, lon_col]].mean()
+        matrix = pairwise_distance_matrix(
+            centers[lat_col].to_numpy(), centers[lon_col].to_numpy()
+        )
+        return pd.DataFrame(matrix, index=centers.index, columns=centers.index)
+
     def calculate_migration_flows(
         self,
         df: pd.DataFrame,
@@ -404,6 +476,7 @@ class MigrationDetector:
                 df_migrations["migration_type"] = df_migrations["movement_type"]
 
             # Ensure required columns exist
+            df_migrations = self.add_distances(df_migrations)
             if "distance_km" not in df_migrations.columns:
                 df_migrations["distance_km"] = 0.0
             if "confidence" not in df_migrations.columns:
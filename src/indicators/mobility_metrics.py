@@ -6,12 +6,20 @@ Ce module calcule les indicateurs de mobilité urbaine et interurbaine
 à partir des données de déplacements.
 """
 
+import sys
+from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 from loguru import logger
 
+# Ajout du chemin src pour les imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.geodesy import haversine, initial_bearing
+from utils.h3_index import H3Indexer, h3_available
+
 
 class MobilityMetrics:
     """
@@ -43,6 +51,7 @@ class MobilityMetrics:
             h3_resolution: Résolution H3 pour l'agrégation spatiale
         """
         self.h3_resolution = h3_resolution
+        self._h3_indexer = None
     
     def calculate_od_matrix(
         self,
@@ -98,6 +107,73 @@ class MobilityMetrics:
         
         return od_agg
     
+    def calculate_h3_od_matrix(
+        self,
+        df: pd.DataFrame,
+        resolution: Optional[int] = None,
+        time_filter: Optional[Tuple[int, int]] = None
+    ) -> pd.DataFrame:
+        """
+        Calcule la matrice Origine-Destination entre cellules H3
+        
+        Utilise les colonnes int64 'origin_h3_r{res}' / 'dest_h3_r{res}'
+        produites par le générateur; à défaut, elles sont calculées en lot
+        à partir des coordonnées d'origine et de destination.
+        
+        Args:
+            df: DataFrame avec les trajets
+            resolution: Résolution H3 (défaut: self.h3_resolution)
+            time_filter: Tuple (heure_début, heure_fin) pour filtrer
+            
+        Returns:
+            DataFrame avec la matrice O-D agrégée par cellule H3
+        """
+        resolution = resolution or self.h3_resolution
+        origin_col = H3Indexer.column('origin_h3', resolution)
+        dest_col = H3Indexer.column('dest_h3', resolution)
+        
+        data = df
+        if origin_col not in df.columns or dest_col not in df.columns:
+            coord_cols = {'origin_lat', 'origin_lon', 'dest_lat', 'dest_lon'}
+            if not h3_available() or not coord_cols.issubset(df.columns):
+                logger.warning("Colonnes H3 ou coordonnées absentes, matrice H3 ignorée")
+                return pd.DataFrame()
+            
+            if self._h3_indexer is None or resolution not in self._h3_indexer.resolutions:
+                self._h3_indexer = H3Indexer([resolution])
+            
+            data = df.copy()
+            self._h3_indexer.add_columns(data, 'origin_lat', 'origin_lon', 'origin_h3')
+            self._h3_indexer.add_columns(data, 'dest_lat', 'dest_lon', 'dest_h3')
+        
+        return self.calculate_od_matrix(data, origin_col, dest_col, time_filter)
+    
+    def add_trip_geometry(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Complète la distance et l'azimut des trajets à partir des coordonnées
+        
+        Calcul vectorisé (haversine, azimut initial) sur l'ensemble des
+        trajets; une colonne distance_km existante est conservée.
+        
+        Args:
+            df: DataFrame avec les trajets
+            
+        Returns:
+            DataFrame avec 'distance_km' et 'bearing_deg'
+        """
+        coord_cols = ['origin_lat', 'origin_lon', 'dest_lat', 'dest_lon']
+        if not set(coord_cols).issubset(df.columns):
+            return df
+        
+        coords = [df[col].to_numpy() for col in coord_cols]
+        data = df.copy()
+        if 'distance_km' not in data.columns:
+            data['distance_km'] = np.round(haversine(*coords), 2)
+        if 'bearing_deg' not in data.columns:
+            data['bearing_deg'] = np.round(initial_bearing(*coords), 1)
+        
+        return data
+    
     def calculate_modal_split(self, df: pd.DataFrame) -> Dict:
         """
         Calcule la répartition modale des déplacements
@@ -363,7 +439,7 @@ class MobilityMetrics:
         # Ajout du facteur CO2 par mode
         data['co2_factor'] = data['transport_mode'].map(
             {mode: info['co2_factor'] for mode, info in self.TRANSPORT_MODES.items()}
-        ).fillna(100)  # Valeur par défaut
+        ).astype(float).fillna(100)  # Valeur par défaut
         
         # Calcul des émissions (g CO2)
         data['co2_emissions_g'] = data['distance_km'] * data['co2_factor']
@@ -396,9 +472,15 @@ class MobilityMetrics:
         """
         logger.info("=== Analyse complète de la mobilité ===")
         
+        # 0. Distances et azimuts (si seules les coordonnées sont fournies)
+        df = self.add_trip_geometry(df)
+        
         # 1. Matrice O-D
         od_matrix = self.calculate_od_matrix(df)
         
+        # 1b. Matrice O-D par cellules H3
+        h3_od_matrix = self.calculate_h3_od_matrix(df)
+        
         # 2. Répartition modale
         modal_split = self.calculate_modal_split(df)
         
@@ -420,6 +502,7 @@ class MobilityMetrics:
         # Résultats détaillés
         detailed = {
             'od_matrix': od_matrix,
+            'h3_od_matrix': h3_od_matrix,
             'congestion_data': congestion,
             'daily_patterns': daily_patterns
         }
@@ -6,14 +6,58 @@ Ce module calcule un indice de richesse multidimensionnel
 à partir des données de téléphonie mobile.
 """
 
+import math
+import sys
+import tempfile
+from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
+import pyarrow.dataset as ds
 from loguru import logger
-from sklearn.decomposition import PCA
+from sklearn.decomposition import PCA, IncrementalPCA
 from sklearn.preprocessing import StandardScaler
 
+# Ajout du chemin src pour les imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from indicators.alkire_foster import DEFAULT_K_CUTOFFS, alkire_foster, deprivation_matrix
+from indicators.inequality import decompose_by_group, inequality_measures
+from indicators.wealth_model import WealthModel
+from utils.parquet_sink import ParquetSink
+
+# Nombre maximal de fichiers de répartition (agrégation hors mémoire)
+MAX_BUCKETS = 512
+
+# Attributs par utilisateur (première valeur observée)
+ATTRIBUTE_COLUMNS = ['phone_type', 'subscription_type', 'district', 'region', 'department', 'locality']
+
+# Niveaux administratifs des décompositions (du plus large au plus fin)
+ADMIN_LEVELS = ['region', 'department', 'locality']
+
+# Pondération des indicateurs d'inégalité (taille du ménage, jointe depuis users)
+WEIGHT_COLUMN = 'household_size'
+
+# Dimensions IPM par défaut basées sur les données télécom
+DEFAULT_MPI_DIMENSIONS = {
+    'economic': {
+        'indicators': ['recharge_amount_fcfa'],
+        'threshold': 'percentile_20',
+        'weight': 0.4
+    },
+    'connectivity': {
+        'indicators': ['contact_diversity_score'],
+        'threshold': 0.3,
+        'weight': 0.3
+    },
+    'mobility': {
+        'indicators': ['mobility_radius_km'],
+        'threshold': 2.0,
+        'weight': 0.3
+    }
+}
+
 
 class PovertyIndexCalculator:
     """
@@ -25,11 +69,18 @@ class PovertyIndexCalculator:
     - DHS Wealth Index methodology
     """
     
-    def __init__(self):
-        """Initialise le calculateur"""
+    def __init__(self, model: Optional[WealthModel] = None):
+        """
+        Initialise le calculateur
+        
+        Args:
+            model: Modèle de richesse figé (notation sans réapprentissage)
+        """
         self.scaler = StandardScaler()
         self.pca = PCA(n_components=1)
-        self.is_fitted = False
+        self.model = model
+        self.is_fitted = model is not None
+        self.mpi_results: Dict[str, pd.DataFrame] = {}
         
         # Variables utilisées pour le calcul
         self.feature_columns = [
@@ -65,12 +116,9 @@ class PovertyIndexCalculator:
             }
             
             # Ajouter les colonnes catégorielles si présentes
-            if 'phone_type' in df.columns:
-                agg_dict['phone_type'] = 'first'
-            if 'subscription_type' in df.columns:
-                agg_dict['subscription_type'] = 'first'
-            if 'district' in df.columns:
-                agg_dict['district'] = 'first'
+            for col in [*ATTRIBUTE_COLUMNS, WEIGHT_COLUMN]:
+                if col in df.columns:
+                    agg_dict[col] = 'first'
             
             df_agg = df.groupby('user_id').agg(agg_dict).reset_index()
         else:
@@ -84,11 +132,11 @@ class PovertyIndexCalculator:
         # Encodage des variables catégorielles
         if 'phone_type' in df_agg.columns:
             phone_map = {'basic': 0, 'feature': 1, 'smartphone': 2}
-            df_agg['phone_type_encoded'] = df_agg['phone_type'].map(phone_map).fillna(1)
+            df_agg['phone_type_encoded'] = df_agg['phone_type'].map(phone_map).astype(float).fillna(1)
         
         if 'subscription_type' in df_agg.columns:
             sub_map = {'prepaid': 0, 'postpaid': 1}
-            df_agg['subscription_encoded'] = df_agg['subscription_type'].map(sub_map).fillna(0)
+            df_agg['subscription_encoded'] = df_agg['subscription_type'].map(sub_map).astype(float).fillna(0)
         
         return df_agg
     
@@ -110,19 +158,7 @@ class PovertyIndexCalculator:
         logger.info(f"Calcul de l'indice de richesse (méthode: {method})...")
         
         # Sélection des features numériques
-        feature_cols = []
-        for col in self.feature_columns:
-            if col in df.columns:
-                feature_cols.append(col)
-            # Aussi les versions log
-            log_col = f'{col}_log'
-            if log_col in df.columns:
-                feature_cols.append(log_col)
-        
-        # Ajouter les encodages
-        for col in ['phone_type_encoded', 'subscription_encoded']:
-            if col in df.columns:
-                feature_cols.append(col)
+        feature_cols = self._feature_matrix_columns(df)
         
         # Création de la matrice de features
         X = df[feature_cols].fillna(df[feature_cols].median())
@@ -132,7 +168,7 @@ class PovertyIndexCalculator:
             X_scaled = self.scaler.fit_transform(X)
             
             # PCA pour extraire la première composante
-            wealth_scores = self.pca.fit_transform(X_scaled)
+            wealth_scores = self.pca.fit_transform(X_scaled) * self._component_sign()
             
             # Normalisation 0-1
             wealth_scores_norm = (wealth_scores - wealth_scores.min()) / \
@@ -140,6 +176,12 @@ class PovertyIndexCalculator:
             
             df['wealth_index'] = wealth_scores_norm.flatten()
             
+            # Modèle figé (imputation par la médiane, bornes d'apprentissage)
+            self.model = WealthModel.from_fitted(
+                feature_cols, X.median().to_numpy(), self.scaler, self.pca,
+                self._component_sign(), (wealth_scores.min(), wealth_scores.max()), len(df)
+            )
+            
             # Variance expliquée
             var_explained = self.pca.explained_variance_ratio_[0]
             logger.info(f"Variance expliquée par PC1: {var_explained:.2%}")
@@ -153,11 +195,277 @@ class PovertyIndexCalculator:
             
             # Score moyen pondéré
             df['wealth_index'] = X_norm.mean(axis=1)
+            self.model = None
         
         self.is_fitted = True
         
         return df
     
+    def _feature_matrix_columns(self, df: pd.DataFrame) -> List[str]:
+        """
+        Colonnes de la matrice de features présentes dans un DataFrame préparé
+        
+        Args:
+            df: DataFrame préparé (prepare_features)
+            
+        Returns:
+            Liste ordonnée des colonnes (features, versions log, encodages)
+        """
+        feature_cols = []
+        for col in self.feature_columns:
+            if col in df.columns:
+                feature_cols.append(col)
+            # Aussi les versions log
+            log_col = f'{col}_log'
+            if log_col in df.columns:
+                feature_cols.append(log_col)
+        
+        # Ajouter les encodages
+        for col in ['phone_type_encoded', 'subscription_encoded']:
+            if col in df.columns:
+                feature_cols.append(col)
+        
+        return feature_cols
+    
+    def _component_sign(self) -> float:
+        """
+        Orientation de PC1: l'indice croît avec la somme des contributions
+        
+        Le signe d'une composante principale est arbitraire; il est fixé
+        pour que les modes en mémoire et hors mémoire donnent le même indice.
+        """
+        return -1.0 if self.pca.components_[0].sum() < 0 else 1.0
+    
+    def _partial_sums(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """
+        Sommes et effectifs partiels par utilisateur d'un bloc du panel
+        
+        Args:
+            chunk: Bloc de lignes hebdomadaires
+            
+        Returns:
+            DataFrame (user_id, <feature>_sum, <feature>_count, catégories)
+        """
+        features = [col for col in self.feature_columns if col in chunk.columns]
+        chunk = chunk.assign(user_id=chunk['user_id'].astype(str))
+        grouped = chunk.groupby('user_id', sort=False)
+        
+        partial = pd.concat(
+            [
+                grouped[features].sum().add_suffix('_sum'),
+                grouped[features].count().add_suffix('_count'),
+            ],
+            axis=1
+        )
+        for col in ATTRIBUTE_COLUMNS:
+            if col in chunk.columns:
+                partial[col] = grouped[col].first().astype(str)
+        
+        return partial.reset_index()
+    
+    def _combine_partials(self, partial: pd.DataFrame) -> pd.DataFrame:
+        """
+        Moyennes par utilisateur à partir de ses sommes partielles
+        
+        Args:
+            partial: Sommes partielles (plusieurs lignes par utilisateur possibles)
+            
+        Returns:
+            DataFrame agrégé (une ligne par utilisateur, comme prepare_features)
+        """
+        grouped = partial.groupby('user_id', sort=False)
+        features = [col for col in self.feature_columns if f'{col}_sum' in partial.columns]
+        sums = grouped[[f'{col}_sum' for col in features]].sum().to_numpy()
+        counts = grouped[[f'{col}_count' for col in features]].sum().to_numpy()
+        
+        df_agg = pd.DataFrame(
+            np.divide(sums, counts, out=np.full(sums.shape, np.nan), where=counts > 0),
+            columns=features,
+            index=grouped.size().index
+        )
+        for col in ATTRIBUTE_COLUMNS:
+            if col in partial.columns:
+                df_agg[col] = grouped[col].first()
+        
+        return df_agg.reset_index()
+    
+    def calculate_wealth_index_out_of_core(
+        self,
+        path: str,
+        output_path: str,
+        batch_size: int = 500_000,
+        bucket_rows: int = 2_000_000,
+        tmp_dir: Optional[str] = None
+    ) -> Dict:
+        """
+        Calcule l'indice de richesse (PCA) sans charger le panel en mémoire
+        
+        1. Le panel Parquet est lu par blocs; les sommes partielles par
+           utilisateur sont réparties par hachage de user_id dans des
+           fichiers temporaires (un utilisateur = un seul fichier).
+        2. Chaque fichier donne les features de ses utilisateurs; le
+           StandardScaler est ajusté par moments cumulés (partial_fit).
+        3. Les composantes sont ajustées par IncrementalPCA.partial_fit
+           (toutes conservées: peu de features, PC1 identique à la PCA).
+        4. Les utilisateurs sont notés en deux passes (bornes, puis écriture
+           de l'indice normalisé 0-1).
+        
+        La mémoire dépend de batch_size et bucket_rows, pas de la population.
+        Les valeurs manquantes sont imputées par la moyenne (et non la
+        médiane comme en mémoire).
+        
+        Args:
+            path: Panel hebdomadaire Parquet (fichier ou répertoire)
+            output_path: Fichier Parquet des utilisateurs notés
+            batch_size: Lignes lues par bloc
+            bucket_rows: Lignes du panel par fichier de répartition (cible)
+            tmp_dir: Répertoire des fichiers temporaires
+            
+        Returns:
+            Dictionnaire (utilisateurs, variance expliquée, fichiers de répartition)
+        """
+        logger.info(f"Calcul de l'indice de richesse hors mémoire: {path}")
+        
+        dataset = ds.dataset(str(path), format='parquet', partitioning='hive')
+        columns = [
+            col for col in ['user_id', *self.feature_columns, *ATTRIBUTE_COLUMNS]
+            if col in dataset.schema.names
+        ]
+        n_buckets = max(1, min(MAX_BUCKETS, math.ceil(dataset.count_rows() / bucket_rows)))
+        
+        with tempfile.TemporaryDirectory(dir=tmp_dir) as tmp:
+            tmp = Path(tmp)
+            
+            # 1. Agrégation externe par hachage de user_id
+            sinks = [ParquetSink(tmp / f'partial-{b:04d}.parquet') for b in range(n_buckets)]
+            # Lecture séquentielle sans pré-chargement: mémoire bornée par batch_size
+            for batch in dataset.to_batches(
+                columns=columns,
+                batch_size=batch_size,
+                batch_readahead=0,
+                fragment_readahead=0,
+                use_threads=False,
+                fragment_scan_options=ds.ParquetFragmentScanOptions(pre_buffer=False)
+            ):
+                partial = self._partial_sums(batch.to_pandas())
+                bucket = pd.util.hash_array(partial['user_id'].to_numpy(dtype=object)) % n_buckets
+                for b, part in partial.groupby(bucket, sort=False):
+                    sinks[b].write(part)
+            for sink in sinks:
+                sink.close()
+            
+            # 2. Features par utilisateur et moments du StandardScaler
+            # (lots d'au moins n_features utilisateurs pour la PCA incrémentale)
+            self.scaler = StandardScaler()
+            user_files, pending = [], []
+            for sink in sinks:
+                if sink.rows == 0:
+                    continue
+                users = self.prepare_features(self._combine_partials(pd.read_parquet(sink.path)))
+                feature_cols = self._feature_matrix_columns(users)
+                self.scaler.partial_fit(users[feature_cols])
+                sink.path.unlink()
+                
+                pending.append(users)
+                if sum(len(part) for part in pending) >= len(feature_cols):
+                    user_files.append(tmp / f'users-{len(user_files):04d}.parquet')
+                    pd.concat(pending, ignore_index=True).to_parquet(user_files[-1], index=False)
+                    pending = []
+            if pending:
+                if user_files:
+                    pending.insert(0, pd.read_parquet(user_files[-1]))
+                else:
+                    user_files.append(tmp / 'users-0000.parquet')
+                pd.concat(pending, ignore_index=True).to_parquet(user_files[-1], index=False)
+            
+            def scaled(users: pd.DataFrame) -> np.ndarray:
+                """Features standardisées (manquants = moyenne)"""
+                return np.nan_to_num(self.scaler.transform(users[feature_cols]))
+            
+            # 3. Composantes principales (IncrementalPCA); toutes sont
+            # conservées entre les lots pour que PC1 soit exacte
+            self.pca = IncrementalPCA(n_components=len(feature_cols))
+            for file in user_files:
+                self.pca.partial_fit(scaled(pd.read_parquet(file)))
+            sign = self._component_sign()
+            
+            # 4. Notation: bornes de l'indice, puis écriture normalisée
+            low, high = np.inf, -np.inf
+            for file in user_files:
+                scores = self.pca.transform(scaled(pd.read_parquet(file)))[:, 0] * sign
+                low, high = min(low, scores.min()), max(high, scores.max())
+            
+            n_users = 0
+            with ParquetSink(output_path, compression='zstd') as sink:
+                for file in user_files:
+                    users = pd.read_parquet(file)
+                    scores = self.pca.transform(scaled(users))[:, 0] * sign
+                    users['wealth_index'] = (scores - low) / (high - low)
+                    sink.write(users)
+                    n_users += len(users)
+        
+        self.model = WealthModel.from_fitted(
+            feature_cols, self.scaler.mean_, self.scaler, self.pca, sign, (low, high), n_users
+        )
+        self.is_fitted = True
+        var_explained = self.pca.explained_variance_ratio_[0]
+        logger.info(f"Variance expliquée par PC1: {var_explained:.2%}")
+        logger.info(f"✓ Indice de richesse de {n_users} utilisateurs écrit dans {output_path}")
+        
+        return {
+            'users': n_users,
+            'explained_variance_ratio': float(var_explained),
+            'buckets': len(user_files),
+            'output_path': str(output_path),
+        }
+    
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Note de nouvelles données avec le modèle figé (sans réapprentissage)
+        
+        Args:
+            df: DataFrame avec les données brutes (ex: nouvelles semaines)
+            
+        Returns:
+            DataFrame préparé avec l'indice de richesse
+        """
+        if self.model is None:
+            raise ValueError(
+                "Aucun modèle de richesse: ajuster (process) ou charger un modèle (from_model)"
+            )
+        
+        df_prepared = self.prepare_features(df)
+        df_prepared['wealth_index'] = self.model.score(df_prepared)
+        
+        return df_prepared
+    
+    def save_model(self, path: str) -> Path:
+        """
+        Sauvegarde le modèle de richesse ajusté
+        
+        Args:
+            path: Fichier JSON de l'artefact
+            
+        Returns:
+            Chemin du fichier écrit
+        """
+        if self.model is None:
+            raise ValueError("Aucun modèle de richesse ajusté (méthode PCA requise)")
+        return self.model.save(path)
+    
+    @classmethod
+    def from_model(cls, path: str) -> 'PovertyIndexCalculator':
+        """
+        Crée un calculateur qui note avec un modèle sauvegardé
+        
+        Args:
+            path: Fichier JSON de l'artefact
+            
+        Returns:
+            PovertyIndexCalculator (déjà ajusté)
+        """
+        return cls(model=WealthModel.load(path))
+    
     def assign_quintiles(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Assigne les quintiles de richesse
@@ -205,112 +513,107 @@ class PovertyIndexCalculator:
         if 'wealth_quintile' in df.columns:
             stats['quintile_distribution'] = df['wealth_quintile'].value_counts().to_dict()
         
-        # Statistiques par district si disponible
-        if 'district' in df.columns:
-            district_stats = df.groupby('district').agg({
+        # Inégalités pondérées par la taille des ménages (si disponible)
+        weights = None
+        if WEIGHT_COLUMN in df.columns:
+            weights = df[WEIGHT_COLUMN].astype(float).fillna(1.0).to_numpy()
+        inequality = inequality_measures(df['wealth_index'].to_numpy(), weights)
+        stats['gini_coefficient'] = round(inequality['gini'], 3)
+        stats['inequality'] = {name: round(value, 4) for name, value in inequality.items()}
+        stats['inequality']['weighted_by'] = WEIGHT_COLUMN if weights is not None else None
+        
+        # Statistiques et décompositions par niveau administratif disponible
+        for level in [col for col in ['district', *ADMIN_LEVELS] if col in df.columns]:
+            level_stats = df.groupby(level, observed=True).agg({
                 'wealth_index': ['mean', 'median', 'std'],
                 'is_poor': 'mean' if 'is_poor' in df.columns else 'count'
             }).round(3)
+            level_stats.columns = ['_'.join(col) for col in level_stats.columns]
             
-            stats['by_district'] = district_stats.to_dict()
-        
-        # Coefficient de Gini simplifié
-        wealth_sorted = np.sort(df['wealth_index'].values)
-        n = len(wealth_sorted)
-        cumulative = np.cumsum(wealth_sorted)
-        gini = (n + 1 - 2 * np.sum(cumulative) / cumulative[-1]) / n
-        stats['gini_coefficient'] = round(gini, 3)
+            decomposition = decompose_by_group(df['wealth_index'].to_numpy(), df[level], weights)
+            stats[f'by_{level}'] = level_stats.to_dict()
+            stats[f'inequality_by_{level}'] = decomposition['groups'].round(4).to_dict(orient='index')
+            stats[f'theil_decomposition_{level}'] = decomposition['decomposition']
         
         return stats
     
     def calculate_multidimensional_poverty(
         self,
         df: pd.DataFrame,
-        dimensions: Optional[Dict] = None
+        dimensions: Optional[Dict] = None,
+        k: float = 1 / 3,
+        cutoffs: Optional[np.ndarray] = None
     ) -> pd.DataFrame:
         """
         Calcule l'indice de pauvreté multidimensionnelle (IPM)
         Méthode Alkire-Foster
         
+        Les mesures H, A et M0, les taux de privation censurés et les
+        contributions sont calculés pour tous les seuils k (cutoffs, plus k)
+        et décomposés par niveau administratif; ils sont conservés dans
+        self.mpi_results (voir indicators.alkire_foster).
+        
         Args:
             df: DataFrame avec les indicateurs
             dimensions: Dimensions et seuils personnalisés
+            k: Seuil de pauvreté retenu pour les colonnes par utilisateur
+            cutoffs: Seuils k évalués (défaut: 0.1 à 1.0)
             
         Returns:
             DataFrame avec l'IPM
         """
         logger.info("Calcul de l'IPM (méthode Alkire-Foster)...")
         
-        if dimensions is None:
-            # Dimensions par défaut basées sur les données télécom
-            dimensions = {
-                'economic': {
-                    'indicators': ['recharge_amount_fcfa'],
-                    'threshold': 'percentile_20',
-                    'weight': 0.4
-                },
-                'connectivity': {
-                    'indicators': ['contact_diversity_score'],
-                    'threshold': 0.3,
-                    'weight': 0.3
-                },
-                'mobility': {
-                    'indicators': ['mobility_radius_km'],
-                    'threshold': 2.0,
-                    'weight': 0.3
-                }
-            }
+        # Matrice des privations (utilisateurs x indicateurs)
+        deprivations, weights = deprivation_matrix(df, dimensions or DEFAULT_MPI_DIMENSIONS)
+        if deprivations.empty:
+            return df
         
-        # Calcul des privations par dimension
-        deprivations = []
-        
-        for dim_name, dim_config in dimensions.items():
-            for indicator in dim_config['indicators']:
-                if indicator in df.columns:
-                    threshold = dim_config['threshold']
-                    
-                    if isinstance(threshold, str) and 'percentile' in threshold:
-                        pct = int(threshold.split('_')[1])
-                        threshold_value = df[indicator].quantile(pct / 100)
-                    else:
-                        threshold_value = threshold
-                    
-                    # Privation si en dessous du seuil
-                    deprived = (df[indicator] < threshold_value).astype(int)
-                    deprivations.append(deprived * dim_config['weight'])
-        
-        if deprivations:
-            # Score de privation total
-            df['deprivation_score'] = sum(deprivations)
-            
-            # Pauvre multidimensionnel si score >= 0.33 (1/3 des dimensions)
-            df['is_mpi_poor'] = df['deprivation_score'] >= 0.33
-            
-            # Intensité de la pauvreté
-            df['poverty_intensity'] = df.loc[df['is_mpi_poor'], 'deprivation_score'].mean()
+        levels = [col for col in ADMIN_LEVELS if col in df.columns]
+        cutoffs = np.append(DEFAULT_K_CUTOFFS if cutoffs is None else cutoffs, k)
+        self.mpi_results = alkire_foster(
+            deprivations, weights, cutoffs, df[levels] if levels else None
+        )
+        
+        # Score de privation pondéré, statut au seuil k et intensité individuelle
+        df['deprivation_score'] = deprivations.to_numpy(dtype=float) @ weights.to_numpy()
+        df['is_mpi_poor'] = df['deprivation_score'] >= k - 1e-9
+        df['poverty_intensity'] = df['deprivation_score'].where(df['is_mpi_poor'])
+        
+        measures = self.mpi_results['measures'].loc[k]
+        logger.info(f"IPM (k={k:.2f}): H={measures['H']:.1%}, A={measures['A']:.1%}, M0={measures['M0']:.3f}")
         
         return df
     
     def process(
         self,
         df: pd.DataFrame,
-        calculate_mpi: bool = True
+        calculate_mpi: bool = True,
+        refit: bool = False
     ) -> Tuple[pd.DataFrame, Dict]:
         """
         Pipeline complet de calcul des indicateurs de pauvreté
         
+        Le modèle de richesse est ajusté au premier appel, puis réutilisé
+        tel quel: les indices de lots successifs restent comparables.
+        
         Args:
             df: DataFrame avec les données brutes
             calculate_mpi: Calculer l'IPM en plus
+            refit: Réajuster le modèle même s'il existe déjà
             
         Returns:
             Tuple (DataFrame enrichi, statistiques)
         """
-        # 1. Préparation des features
-        df_prepared = self.prepare_features(df)
-        
-        # 2. Calcul de l'indice de richesse
-        df_wealth = self.calculate_wealth_index(df_prepared)
+        if self.model is not None and not refit:
+            # 1-2. Notation avec le modèle figé
+            df_wealth = self.transform(df)
+        else:
+            # 1. Préparation des features
+            df_prepared = self.prepare_features(df)
+            
+            # 2. Calcul de l'indice de richesse
+            df_wealth = self.calculate_wealth_index(df_prepared)
         
         # 3. Assignation des quintiles
         df_quintiles = self.assign_quintiles(df_wealth)
@@ -323,6 +626,8 @@ class PovertyIndexCalculator:
         
         # 5. Statistiques
         stats = self.calculate_poverty_statistics(df_final)
+        if calculate_mpi and self.mpi_results:
+            stats['mpi_by_k'] = self.mpi_results['measures'].round(4).to_dict(orient='index')
         
         logger.info("✓ Calcul des indicateurs de pauvreté terminé")
         
@@ -0,0 +1,198 @@
+"""
+Modèle d'indice de richesse persisté
+Projet: Mobilité Côte d'Ivoire - ANStat
+
+Le modèle appris par PovertyIndexCalculator (imputation, standardisation,
+première composante principale, bornes de normalisation 0-1) est figé
+dans un artefact JSON versionné. Les nouvelles semaines sont notées sans
+réapprentissage : les étapes linéaires sont repliées en un vecteur de
+poids et une constante, soit un produit matrice-vecteur par lot.
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+# Version du format de l'artefact (à incrémenter si son contenu change)
+MODEL_FORMAT_VERSION = 1
+
+# Emplacement par défaut de l'artefact
+DEFAULT_MODEL_PATH = 'data/models/wealth_model.json'
+
+
+class WealthModel:
+    """
+    Indice de richesse figé: score = clip(X · weights + intercept, 0, 1)
+
+    Les poids combinent la standardisation, les contributions de PC1 et
+    les bornes (min/max des scores d'apprentissage): un même utilisateur
+    reçoit le même indice quel que soit le lot dans lequel il est noté.
+    """
+
+    def __init__(
+        self,
+        feature_columns: List[str],
+        fill_values: np.ndarray,
+        mean: np.ndarray,
+        scale: np.ndarray,
+        loadings: np.ndarray,
+        anchors: tuple,
+        metadata: Optional[Dict] = None
+    ):
+        """
+        Initialise le modèle
+
+        Args:
+            feature_columns: Colonnes de la matrice de features (ordonnées)
+            fill_values: Valeurs d'imputation des manquants (par colonne)
+            mean: Moyennes du StandardScaler
+            scale: Écarts-types du StandardScaler
+            loadings: Contributions de PC1 (signe orienté)
+            anchors: Scores bruts (min, max) ramenés à 0 et 1
+            metadata: Informations d'apprentissage (utilisateurs, variance...)
+        """
+        self.feature_columns = list(feature_columns)
+        self.fill_values = np.asarray(fill_values, dtype=np.float64)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.loadings = np.asarray(loadings, dtype=np.float64)
+        self.anchors = (float(anchors[0]), float(anchors[1]))
+        self.metadata = dict(metadata or {})
+
+        n = len(self.feature_columns)
+        for name in ['fill_values', 'mean', 'scale', 'loadings']:
+            if getattr(self, name).shape != (n,):
+                raise ValueError(f"{name}: {getattr(self, name).shape}, attendu ({n},)")
+
+        # Repliement: ((x - mean) / scale) · loadings, puis (s - min) / (max - min)
+        low, high = self.anchors
+        span = high - low if high > low else 1.0
+        self.weights = self.loadings / self.scale / span
+        self.intercept = -(self.mean / self.scale @ self.loadings + low) / span
+
+    @classmethod
+    def from_fitted(
+        cls,
+        feature_columns: List[str],
+        fill_values: np.ndarray,
+        scaler,
+        pca,
+        sign: float,
+        anchors: tuple,
+        n_users: int
+    ) -> 'WealthModel':
+        """
+        Construit le modèle depuis un StandardScaler et une PCA ajustés
+
+        Args:
+            feature_columns: Colonnes de la matrice de features
+            fill_values: Valeurs d'imputation
+            scaler: StandardScaler ajusté
+            pca: PCA ou IncrementalPCA ajustée
+            sign: Orientation de PC1 (+1 ou -1)
+            anchors: Scores bruts (min, max) de l'apprentissage
+            n_users: Nombre d'utilisateurs d'apprentissage
+
+        Returns:
+            WealthModel
+        """
+        return cls(
+            feature_columns,
+            fill_values,
+            scaler.mean_,
+            scaler.scale_,
+            pca.components_[0] * sign,
+            anchors,
+            metadata={
+                'created_at': datetime.now().isoformat(timespec='seconds'),
+                'n_users': int(n_users),
+                'explained_variance_ratio': float(pca.explained_variance_ratio_[0]),
+            }
+        )
+
+    def score(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Note des utilisateurs (features préparées) sans réapprentissage
+
+        Args:
+            df: DataFrame préparé (une ligne par utilisateur)
+
+        Returns:
+            Indice de richesse 0-1 (borné aux scores d'apprentissage)
+        """
+        missing = [col for col in self.feature_columns if col not in df.columns]
+        if missing:
+            raise ValueError(f"Features absentes pour le modèle de richesse: {missing}")
+
+        X = df[self.feature_columns].to_numpy(dtype=np.float64)
+        X = np.where(np.isnan(X), self.fill_values, X)
+        return np.clip(X @ self.weights + self.intercept, 0.0, 1.0)
+
+    def to_dict(self) -> Dict:
+        """Contenu sérialisable de l'artefact"""
+        return {
+            'format_version': MODEL_FORMAT_VERSION,
+            'feature_columns': self.feature_columns,
+            'fill_values': self.fill_values.tolist(),
+            'mean': self.mean.tolist(),
+            'scale': self.scale.tolist(),
+            'loadings': self.loadings.tolist(),
+            'anchors': list(self.anchors),
+            'metadata': self.metadata,
+        }
+
+    def save(self, path: str) -> Path:
+        """
+        Sauvegarde l'artefact (écriture puis renommage)
+
+        Args:
+            path: Fichier JSON de destination
+
+        Returns:
+            Chemin du fichier écrit
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        tmp_path.replace(path)
+
+        logger.info(f"✓ Modèle de richesse sauvegardé: {path}")
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> 'WealthModel':
+        """
+        Charge un artefact sauvegardé
+
+        Args:
+            path: Fichier JSON du modèle
+
+        Returns:
+            WealthModel
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            content = json.load(f)
+
+        version = content.get('format_version')
+        if version != MODEL_FORMAT_VERSION:
+            raise ValueError(
+                f"Modèle de richesse {path}: format v{version}, "
+                f"v{MODEL_FORMAT_VERSION} attendu (réapprendre le modèle)"
+            )
+
+        return cls(
+            content['feature_columns'],
+            content['fill_values'],
+            content['mean'],
+            content['scale'],
+            content['loadings'],
+            content['anchors'],
+            content.get('metadata')
+        )
@@ -21,9 +21,11 @@ from loguru import logger
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from data_generation.synthetic_generator import SyntheticDataGenerator
+from indicators.feature_aggregator import UserFeatureAggregator
 from indicators.poverty_index import PovertyIndexCalculator
 from indicators.migration_flows import MigrationDetector
 from indicators.mobility_metrics import MobilityMetrics
+from utils.export import DatasetExporter, SUPPORTED_FORMATS
 
 
 class MobilityPipeline:
@@ -45,6 +47,7 @@ class MobilityPipeline:
         # Initialisation des composants
         self.generator = SyntheticDataGenerator(str(config_path))
         self.poverty_calc = PovertyIndexCalculator()
+        self.feature_aggregator: Optional[UserFeatureAggregator] = None
         self.migration_detector = MigrationDetector()
         self.mobility_metrics = MobilityMetrics()
         
@@ -110,10 +113,33 @@ class MobilityPipeline:
         logger.info("-" * 30)
         logger.info("2.1 Indicateurs de pauvreté")
         
+        model_config = self.config.get('wealth_model') or {}
+        model_path = model_config.get('path')
+        if model_path and not model_config.get('refit', True) and Path(model_path).exists():
+            logger.info(f"Notation avec le modèle de richesse figé: {model_path}")
+            self.poverty_calc = PovertyIndexCalculator.from_model(model_path)
+        
         if 'poverty' in self.datasets:
-            poverty_df, poverty_stats = self.poverty_calc.process(
-                self.datasets['poverty']
-            )
+            poverty_input = self.datasets['poverty']
+            
+            # Agrégats persistés: seule la nouvelle période est parcourue
+            aggregator_path = (self.config.get('feature_aggregator') or {}).get('path')
+            if aggregator_path:
+                self.feature_aggregator = UserFeatureAggregator.load_or_create(
+                    aggregator_path, self.poverty_calc.feature_columns
+                )
+                self.feature_aggregator.update(poverty_input)
+                poverty_input = self.feature_aggregator.means()
+            
+            # Taille des ménages des utilisateurs (pondération des inégalités)
+            users = self.datasets.get('users')
+            if users is not None and 'household_size' in users.columns:
+                sizes = users.set_index('user_id')['household_size']
+                poverty_input = poverty_input.assign(
+                    household_size=poverty_input['user_id'].map(sizes).astype(float)
+                )
+            
+            poverty_df, poverty_stats = self.poverty_calc.process(poverty_input)
             self.datasets['poverty_enriched'] = poverty_df
             self.indicators['poverty'] = poverty_stats
         
@@ -167,22 +193,27 @@ class MobilityPipeline:
         output_path.mkdir(parents=True, exist_ok=True)
         
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        exported_files = {}
         
-        # Export des datasets enrichis
-        for name, df in self.datasets.items():
-            if name.endswith('_enriched') or name in ['users', 'poverty', 'migration', 'mobility']:
-                base_name = f"{name}_{timestamp}"
-                
-                if 'csv' in formats:
-                    csv_path = output_path / f"{base_name}.csv"
-                    df.to_csv(csv_path, index=False)
-                    exported_files[f"{name}_csv"] = str(csv_path)
-                
-                if 'parquet' in formats:
-                    parquet_path = output_path / f"{base_name}.parquet"
-                    df.to_parquet(parquet_path, index=False)
-                    exported_files[f"{name}_parquet"] = str(parquet_path)
+        # Export des datasets enrichis (écriture parallèle + manifeste)
+        datasets = {
+            name: df for name, df in self.datasets.items()
+            if name.endswith('_enriched') or name in ['users', 'poverty', 'migration', 'mobility']
+        }
+        dataset_formats = [fmt for fmt in formats if fmt in SUPPORTED_FORMATS]
+        exported_files = {}
+        if datasets and dataset_formats:
+            exporter = DatasetExporter.from_config(self.config.get('export'), formats=dataset_formats)
+            exported_files.update(exporter.export(datasets, output_path, timestamp))
+        
+        # Export du modèle de richesse (réutilisé par le dashboard)
+        model_config = self.config.get('wealth_model') or {}
+        if model_config.get('path') and model_config.get('refit', True) and self.poverty_calc.model is not None:
+            exported_files['wealth_model'] = str(self.poverty_calc.save_model(model_config['path']))
+        
+        # Sauvegarde des agrégats incrémentaux
+        if self.feature_aggregator is not None:
+            aggregator_path = self.config['feature_aggregator']['path']
+            exported_files['feature_aggregator'] = str(self.feature_aggregator.save(aggregator_path))
         
         # Export des indicateurs
         if 'json' in formats:
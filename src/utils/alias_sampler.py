@@ -0,0 +1,118 @@
+"""
+Tirages pondérés par tables d'alias (méthode de Walker/Vose)
+Projet: Mobilité Côte d'Ivoire - ANStat
+
+Une distribution discrète à k modalités est convertie une fois en deux
+tableaux (probabilité d'acceptation, alias). Chaque tirage coûte ensuite
+un entier et un uniforme, quel que soit k, sans revalider ni recumuler
+le vecteur de probabilités comme le fait rng.choice(..., p=...).
+"""
+
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def _alias_table(weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Construit la table d'alias d'une distribution (algorithme de Vose)
+
+    Args:
+        weights: Poids positifs ou nuls (non nécessairement normalisés)
+
+    Returns:
+        Tuple (probabilité d'acceptation, alias) de longueur k
+    """
+    k = len(weights)
+    scaled = weights * (k / weights.sum())
+    accept = np.ones(k)
+    alias = np.arange(k)
+
+    small = list(np.flatnonzero(scaled < 1.0))
+    large = list(np.flatnonzero(scaled >= 1.0))
+    while small and large:
+        s, g = small.pop(), large.pop()
+        accept[s] = scaled[s]
+        alias[s] = g
+        scaled[g] -= 1.0 - scaled[s]
+        (small if scaled[g] < 1.0 else large).append(g)
+
+    # Restes (erreurs d'arrondi): acceptation certaine
+    accept[small + large] = 1.0
+    return accept, alias
+
+
+class AliasSampler:
+    """
+    Échantillonneur d'une distribution discrète, éventuellement par groupe
+
+    Avec des poids 2D (un vecteur par groupe), chaque tirage utilise la
+    distribution de son groupe : les tables de tous les groupes sont
+    empilées et indexées en une seule opération vectorisée.
+    """
+
+    def __init__(self, weights, values: Optional[Sequence] = None):
+        """
+        Construit les tables d'alias
+
+        Args:
+            weights: Poids des k modalités, ou matrice (groupes x k)
+            values: Modalités renvoyées par sample (défaut: codes 0..k-1)
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        self.grouped = weights.ndim == 2
+        weights = np.atleast_2d(weights)
+        if weights.shape[1] == 0:
+            raise ValueError("Distribution vide")
+        if (weights < 0).any() or not np.isfinite(weights).all():
+            raise ValueError("Les poids doivent être finis et positifs")
+        if (weights.sum(axis=1) <= 0).any():
+            raise ValueError("La somme des poids doit être strictement positive")
+
+        tables = [_alias_table(row) for row in weights]
+        self.accept = np.stack([accept for accept, _ in tables])
+        self.alias = np.stack([alias for _, alias in tables])
+        self.n_groups, self.k = weights.shape
+        self.probabilities = weights / weights.sum(axis=1, keepdims=True)
+        self.values = None
+        if values is not None:
+            values = np.asarray(values)
+            if values.dtype.kind in "US":
+                values = values.astype(object)
+            if len(values) != self.k:
+                raise ValueError(f"{len(values)} modalités pour {self.k} poids")
+            self.values = values
+
+    def sample(
+        self,
+        rng: np.random.Generator,
+        size: Optional[int] = None,
+        groups: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Tire des modalités
+
+        Args:
+            rng: Générateur aléatoire
+            size: Nombre de tirages (sans groupes)
+            groups: Code de groupe de chaque tirage (échantillonneur groupé)
+
+        Returns:
+            Codes tirés (ou modalités si values est fourni)
+        """
+        if self.grouped:
+            if groups is None:
+                raise ValueError("Échantillonneur groupé: groups est requis")
+            groups = np.asarray(groups, dtype=np.int64)
+            column = rng.integers(0, self.k, len(groups))
+            accept = self.accept[groups, column]
+            alias = self.alias[groups, column]
+        else:
+            if groups is not None:
+                raise ValueError("Échantillonneur non groupé: groups non supporté")
+            column = rng.integers(0, self.k, int(size))
+            accept = self.accept[0, column]
+            alias = self.alias[0, column]
+
+        codes = np.where(rng.random(len(column)) < accept, column, alias)
+        return codes if self.values is None else self.values[codes]
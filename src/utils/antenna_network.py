@@ -0,0 +1,189 @@
+"""
+Réseau d'antennes synthétique
+Projet: Mobilité Côte d'Ivoire - ANStat
+
+Ce module représente un réseau d'antennes (positions des sites) indexé
+par un cKDTree : l'antenne la plus proche d'un lot de positions est
+trouvée en une seule requête vectorisée. Les cellules de Voronoï des
+antennes donnent leurs zones de couverture pour la cartographie.
+"""
+
+from typing import Optional, Sequence
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+from scipy.spatial import cKDTree
+
+
+def _unit_vectors(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """
+    Positions sur la sphère unité (x, y, z)
+
+    La distance euclidienne (corde) y est croissante avec la distance
+    orthodromique : le plus proche voisin en 3D est l'antenne la plus
+    proche sur la sphère.
+    """
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+class AntennaNetwork:
+    """
+    Ensemble d'antennes avec index de plus proche voisin
+
+    La table des antennes (antenna_id, latitude, longitude, locality) est
+    indexée par code entier ; les identifiants sont renvoyés comme
+    catégories partageant toutes la même liste (celle du réseau).
+    """
+
+    def __init__(
+        self,
+        lat: np.ndarray,
+        lon: np.ndarray,
+        locality: Optional[Sequence] = None,
+        prefix: str = "ANT_",
+    ):
+        """
+        Construit le réseau et son index
+
+        Args:
+            lat: Latitudes des antennes
+            lon: Longitudes des antennes
+            locality: Localité de chaque antenne (optionnel)
+            prefix: Préfixe des identifiants
+        """
+        n = len(lat)
+        width = len(str(max(n - 1, 0)))
+        self.table = pd.DataFrame(
+            {
+                "antenna_id": [f"{prefix}{i:0{width}d}" for i in range(n)],
+                "latitude": np.round(np.asarray(lat, dtype=np.float64), 6),
+                "longitude": np.round(np.asarray(lon, dtype=np.float64), 6),
+            }
+        )
+        if locality is not None:
+            self.table["locality"] = np.asarray(locality, dtype=object)
+
+        self.ids = pd.CategoricalDtype(self.table["antenna_id"])
+        self.tree = cKDTree(
+            _unit_vectors(self.table["latitude"], self.table["longitude"])
+        )
+
+    @classmethod
+    def generate(
+        cls,
+        n_antennas: int,
+        weights: np.ndarray,
+        sample_points,
+        rng: np.random.Generator,
+        names: Optional[Sequence] = None,
+    ) -> "AntennaNetwork":
+        """
+        Place les antennes au prorata du poids de chaque zone
+
+        Chaque zone reçoit au moins une antenne, le reste est réparti
+        proportionnellement aux poids (population).
+
+        Args:
+            n_antennas: Nombre total d'antennes (au moins le nombre de zones)
+            weights: Poids de chaque zone
+            sample_points: Fonction (codes de zone, rng) -> (lat, lon)
+            rng: Générateur aléatoire
+            names: Nom de chaque zone (colonne locality de la table)
+
+        Returns:
+            AntennaNetwork
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        n_zones = len(weights)
+        extra = max(int(n_antennas) - n_zones, 0)
+        counts = 1 + rng.multinomial(extra, weights / weights.sum())
+
+        codes = np.repeat(np.arange(n_zones), counts)
+        lat, lon = sample_points(codes, rng)
+        locality = None if names is None else np.asarray(names, dtype=object)[codes]
+        return cls(lat, lon, locality)
+
+    @classmethod
+    def from_table(cls, table: pd.DataFrame) -> "AntennaNetwork":
+        """
+        Reconstruit un réseau depuis sa table sauvegardée (dataset antennas)
+
+        Args:
+            table: DataFrame antenna_id, latitude, longitude[, locality]
+
+        Returns:
+            AntennaNetwork (mêmes identifiants, dans l'ordre de la table)
+        """
+        network = cls(
+            table["latitude"].to_numpy(dtype=float),
+            table["longitude"].to_numpy(dtype=float),
+            table["locality"] if "locality" in table.columns else None,
+        )
+        network.table["antenna_id"] = np.asarray(table["antenna_id"], dtype=object)
+        network.ids = pd.CategoricalDtype(network.table["antenna_id"])
+        return network
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def nearest(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        """
+        Codes des antennes les plus proches (une requête pour tout le lot)
+
+        Args:
+            lat: Latitudes
+            lon: Longitudes
+
+        Returns:
+            Codes entiers des antennes (index de la table)
+        """
+        if len(lat) == 0:
+            return np.empty(0, dtype=np.int64)
+        _, codes = self.tree.query(_unit_vectors(lat, lon), k=1)
+        return codes
+
+    def assign(self, lat: np.ndarray, lon: np.ndarray) -> pd.Categorical:
+        """
+        Identifiants des antennes les plus proches
+
+        Args:
+            lat: Latitudes
+            lon: Longitudes
+
+        Returns:
+            Categorical des antenna_id (catégories = toutes les antennes)
+        """
+        return pd.Categorical.from_codes(self.nearest(lat, lon), dtype=self.ids)
+
+    def voronoi_cells(self, boundary=None) -> gpd.GeoDataFrame:
+        """
+        Zones de couverture (cellules de Voronoï) des antennes
+
+        Les cellules sont calculées en coordonnées géographiques (usage
+        cartographique) et découpées par la frontière si elle est fournie.
+
+        Args:
+            boundary: Géométrie shapely de découpage (ex: union des limites GADM)
+
+        Returns:
+            GeoDataFrame de la table des antennes avec la cellule de chacune
+        """
+        points = shapely.points(self.table["longitude"], self.table["latitude"])
+        extent = shapely.buffer(shapely.envelope(shapely.multipoints(points)), 1.0)
+        if boundary is not None:
+            extent = shapely.union(extent, shapely.envelope(boundary))
+
+        cells = shapely.get_parts(
+            shapely.voronoi_polygons(
+                shapely.multipoints(points), extend_to=extent, ordered=True
+            )
+        )
+        if boundary is not None:
+            cells = shapely.intersection(cells, boundary)
+
+        return gpd.GeoDataFrame(self.table.copy(), geometry=cells, crs="EPSG:4326")
@@ -0,0 +1,315 @@
+"""
+Export des datasets
+Projet: Mobilité Côte d'Ivoire - ANStat
+
+Ce module écrit un ensemble de DataFrames dans les formats choisis
+(CSV, Parquet), en parallèle sur un pool de threads, et produit un
+manifeste JSON des fichiers écrits. Il est partagé par le générateur
+(save_datasets) et le pipeline (step_3_export_results).
+"""
+
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from loguru import logger
+
+# Ajout du chemin src pour les imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.parquet_sink import widen_dictionary_indices
+
+SUPPORTED_FORMATS = ("csv", "parquet")
+
+
+class DatasetExporter:
+    """
+    Écrit des datasets dans plusieurs formats en parallèle
+
+    Les colonnes texte de faible cardinalité sont encodées en dictionnaire
+    dans Parquet (relues comme catégories), la compression par défaut est
+    zstd, et un partitionnement Hive peut être demandé par dataset.
+    """
+
+    def __init__(
+        self,
+        formats: Iterable[str] = SUPPORTED_FORMATS,
+        compression: str = "zstd",
+        compression_level: Optional[int] = None,
+        dictionary_max_ratio: float = 0.5,
+        partition_cols: Optional[Dict[str, List[str]]] = None,
+        max_workers: Optional[int] = None,
+    ):
+        """
+        Initialise l'exporteur
+
+        Args:
+            formats: Formats de sortie ('csv', 'parquet')
+            compression: Codec Parquet (zstd, snappy, gzip, none)
+            compression_level: Niveau de compression (défaut du codec si None)
+            dictionary_max_ratio: Ratio maximal valeurs distinctes / lignes
+                pour encoder une colonne texte en dictionnaire
+            partition_cols: Colonnes de partitionnement Parquet par dataset
+            max_workers: Taille du pool de threads (défaut: un par fichier)
+        """
+        self.formats = [fmt.lower() for fmt in formats]
+        unknown = set(self.formats) - set(SUPPORTED_FORMATS)
+        if unknown:
+            raise ValueError(f"Formats non supportés: {sorted(unknown)}")
+
+        self.compression = compression
+        self.compression_level = compression_level
+        self.dictionary_max_ratio = dictionary_max_ratio
+        self.partition_cols = partition_cols or {}
+        self.max_workers = max_workers
+
+    @classmethod
+    def from_config(
+        cls, config: Optional[Dict], formats: Optional[Iterable[str]] = None
+    ) -> "DatasetExporter":
+        """
+        Construit un exporteur depuis la section 'export' de la configuration
+
+        Args:
+            config: Section 'export' (peut être None)
+            formats: Formats imposés (remplacent ceux de la configuration)
+
+        Returns:
+            DatasetExporter configuré
+        """
+        config = config or {}
+        return cls(
+            formats=formats or config.get("formats", SUPPORTED_FORMATS),
+            compression=config.get("compression", "zstd"),
+            compression_level=config.get("compression_level"),
+            dictionary_max_ratio=config.get("dictionary_max_ratio", 0.5),
+            partition_cols=config.get("partition_cols"),
+            max_workers=config.get("max_workers"),
+        )
+
+    def _to_arrow(self, df: pd.DataFrame) -> pa.Table:
+        """Convertit en table Arrow en encodant les colonnes texte répétitives"""
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        n_rows = max(len(df), 1)
+
+        for i, field in enumerate(table.schema):
+            if not (
+                pa.types.is_string(field.type) or pa.types.is_large_string(field.type)
+            ):
+                continue
+            column = table.column(i)
+            if pc.count_distinct(column).as_py() / n_rows <= self.dictionary_max_ratio:
+                table = table.set_column(i, field.name, column.dictionary_encode())
+
+        # Indices int32 partout: les parties ajoutées ensuite restent compatibles
+        return table.cast(widen_dictionary_indices(table.schema))
+
+    def _write_parquet(self, name: str, df: pd.DataFrame, path: Path) -> Path:
+        """Écrit un dataset en Parquet (fichier unique ou dataset partitionné)"""
+        table = self._to_arrow(df)
+        partition_cols = [
+            col for col in self.partition_cols.get(name, []) if col in df.columns
+        ]
+
+        if partition_cols:
+            path = path.with_suffix("")
+            pq.write_to_dataset(
+                table,
+                root_path=str(path),
+                partition_cols=partition_cols,
+                compression=self.compression,
+                compression_level=self.compression_level,
+            )
+        else:
+            pq.write_table(
+                table,
+                str(path),
+                compression=self.compression,
+                compression_level=self.compression_level,
+            )
+        return path
+
+    def _write(self, name: str, fmt: str, df: pd.DataFrame, path: Path) -> Dict:
+        """Écrit un dataset dans un format et décrit le résultat"""
+        if fmt == "csv":
+            df.to_csv(path, index=False)
+        else:
+            path = self._write_parquet(name, df, path)
+
+        return self._describe(name, fmt, path, len(df), len(df.columns))
+
+    @staticmethod
+    def _describe(name: str, fmt: str, path: Path, rows: int, columns: int) -> Dict:
+        """Entrée de manifeste d'un dataset écrit (fichier ou répertoire Parquet)"""
+        files = [path] if path.is_file() else sorted(path.rglob("*.parquet"))
+        return {
+            "dataset": name,
+            "format": fmt,
+            "path": str(path),
+            "rows": rows,
+            "columns": columns,
+            "files": len(files),
+            "bytes": sum(f.stat().st_size for f in files),
+        }
+
+    def export(
+        self,
+        datasets: Dict[str, pd.DataFrame],
+        output_dir: str,
+        version: Optional[str] = None,
+    ) -> Dict[str, str]:
+        """
+        Écrit les datasets et leur manifeste
+
+        Args:
+            datasets: Dictionnaire {nom: DataFrame}
+            output_dir: Répertoire de sortie
+            version: Suffixe des fichiers (défaut: horodatage courant)
+
+        Returns:
+            Dictionnaire {'<nom>_<format>': chemin, 'manifest': chemin}
+        """
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+        if version is None:
+            version = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        tasks = [
+            (name, fmt, df, output_path / f"{name}_{version}.{fmt}")
+            for name, df in datasets.items()
+            for fmt in self.formats
+        ]
+
+        # Les écritures (compression, E/S) libèrent le GIL: un thread par fichier
+        max_workers = self.max_workers or max(len(tasks), 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            entries = list(executor.map(lambda task: self._write(*task), tasks))
+
+        exported_files = {
+            f"{entry['dataset']}_{entry['format']}": entry["path"] for entry in entries
+        }
+        for entry in entries:
+            logger.info(
+                f"  ✓ {entry['dataset']} ({entry['format']}): "
+                f"{entry['rows']} enregistrements, {entry['bytes'] / 1e6:.1f} Mo"
+            )
+
+        manifest = {
+            "version": version,
+            "created": datetime.now().isoformat(),
+            "compression": self.compression,
+            "files": entries,
+        }
+        manifest_path = output_path / f"manifest_{version}.json"
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        exported_files["manifest"] = str(manifest_path)
+
+        return exported_files
+
+    def _append_parquet(
+        self, name: str, df: pd.DataFrame, path: Path, part: str
+    ) -> Path:
+        """Ajoute une partie à un dataset Parquet (fichier unique converti en répertoire)"""
+        if path.is_file():
+            directory = path.with_suffix("")
+            directory.mkdir()
+            path.rename(directory / "part-00000.parquet")
+            path = directory
+
+        table = self._to_arrow(df)
+        partition_cols = [
+            col for col in self.partition_cols.get(name, []) if col in df.columns
+        ]
+        if partition_cols:
+            pq.write_to_dataset(
+                table,
+                root_path=str(path),
+                partition_cols=partition_cols,
+                basename_template=f"part-{part}-{{i}}.parquet",
+                compression=self.compression,
+                compression_level=self.compression_level,
+            )
+        else:
+            pq.write_table(
+                table,
+                str(path / f"part-{part}.parquet"),
+                compression=self.compression,
+                compression_level=self.compression_level,
+            )
+        return path
+
+    def append(
+        self,
+        datasets: Dict[str, pd.DataFrame],
+        output_dir: str,
+        version: str,
+        part: str,
+    ) -> Dict[str, str]:
+        """
+        Ajoute des lignes à des datasets déjà exportés
+
+        En Parquet, le bloc devient une nouvelle partie du répertoire du
+        dataset (un fichier unique y est d'abord déplacé comme première
+        partie) ; en CSV, les lignes sont écrites en fin de fichier. Le
+        coût ne dépend que du nombre de lignes ajoutées.
+
+        Args:
+            datasets: Dictionnaire {nom: lignes à ajouter}
+            output_dir: Répertoire des datasets
+            version: Version des fichiers existants
+            part: Nom de la nouvelle partie (ordre lexicographique = ordre des lignes)
+
+        Returns:
+            Dictionnaire {'<nom>_<format>': chemin, 'manifest': chemin si mis à jour}
+        """
+        output_path = Path(output_dir)
+        appended_files = {}
+        manifest_path = output_path / f"manifest_{version}.json"
+        manifest = None
+        if manifest_path.exists():
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        entries = {
+            (entry["dataset"], entry["format"]): entry
+            for entry in (manifest or {}).get("files", [])
+        }
+
+        for name, df in datasets.items():
+            for fmt in self.formats:
+                path = output_path / f"{name}_{version}.{fmt}"
+                if fmt == "parquet" and not path.exists():
+                    path = path.with_suffix("")
+                if not path.exists():
+                    continue
+
+                if fmt == "csv":
+                    df.to_csv(path, mode="a", header=False, index=False)
+                else:
+                    path = self._append_parquet(name, df, path, part)
+                appended_files[f"{name}_{fmt}"] = str(path)
+                logger.info(f"  ✓ {name} ({fmt}): {len(df)} enregistrements ajoutés")
+
+                # Chemin (fichier devenu répertoire), lignes et taille à jour
+                entry = entries.get((name, fmt))
+                if entry is not None:
+                    entry.update(
+                        self._describe(
+                            name, fmt, path, entry["rows"] + len(df), len(df.columns)
+                        )
+                    )
+
+        if manifest is not None:
+            manifest["updated"] = datetime.now().isoformat()
+            with open(manifest_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False)
+            appended_files["manifest"] = str(manifest_path)
+
+        return appended_files
@@ -0,0 +1,182 @@
+"""
+Cache des limites administratives GADM
+Projet: Mobilité Côte d'Ivoire - ANStat
+
+Le GeoJSON GADM (plusieurs Mo) n'est analysé qu'une fois : les limites
+sont réécrites en GeoParquet à côté du fichier source, avec leurs
+attributs précalculés (centroïdes, emprises, aires) et la triangulation
+d'échantillonnage. Le cache est identifié par l'empreinte SHA-256 du
+fichier source et reconstruit dès que celle-ci change. L'empreinte est
+mémorisée avec la taille et la date de modification de la source : elle
+n'est recalculée que si celles-ci changent.
+"""
+
+import hashlib
+import json
+import sys
+from pathlib import Path
+from typing import Optional, Tuple
+
+import geopandas as gpd
+import numpy as np
+import shapely
+from loguru import logger
+
+# Ajout du chemin src pour les imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.spatial_sampling import PolygonSampler
+
+# À incrémenter si le contenu du cache change (invalide les anciens fichiers)
+CACHE_VERSION = 1
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Empreinte SHA-256 d'un fichier (lu par blocs)
+
+    Args:
+        path: Fichier source
+        chunk_size: Taille des blocs lus
+
+    Returns:
+        Empreinte hexadécimale
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_digest(source: str, cache_dir: Optional[str] = None) -> str:
+    """
+    Empreinte du fichier source, recalculée seulement si sa taille ou sa
+    date de modification a changé depuis le dernier calcul
+
+    Args:
+        source: Fichier GADM source
+        cache_dir: Répertoire du cache (défaut: celui de la source)
+
+    Returns:
+        Empreinte hexadécimale
+    """
+    source = Path(source)
+    cache_dir = source.parent if cache_dir is None else Path(cache_dir)
+    stamp_path = cache_dir / f"{source.stem}.digest.json"
+    stat = source.stat()
+    stamp = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    if stamp_path.exists():
+        try:
+            with open(stamp_path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            if {key: stored.get(key) for key in stamp} == stamp:
+                return stored["digest"]
+        except (ValueError, KeyError):
+            logger.debug(f"Empreinte GADM illisible, recalcul: {stamp_path}")
+
+    stamp["digest"] = file_digest(source)
+    stamp_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = stamp_path.with_name(stamp_path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(stamp, f)
+    tmp_path.replace(stamp_path)
+    return stamp["digest"]
+
+
+def cache_paths(
+    source: str, digest: str, cache_dir: Optional[str] = None
+) -> Tuple[Path, Path]:
+    """
+    Fichiers de cache (limites GeoParquet, triangulation) d'une source
+
+    Args:
+        source: Fichier GADM source
+        digest: Empreinte du fichier source
+        cache_dir: Répertoire du cache (défaut: celui de la source)
+
+    Returns:
+        Tuple (fichier .parquet, fichier .npz)
+    """
+    source = Path(source)
+    cache_dir = source.parent if cache_dir is None else Path(cache_dir)
+    stem = f"{source.stem}.{digest[:16]}.v{CACHE_VERSION}"
+    return cache_dir / f"{stem}.parquet", cache_dir / f"{stem}.sampler.npz"
+
+
+def prepare_boundaries(gadm: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+    """
+    Ajoute les attributs précalculés des limites
+
+    Args:
+        gadm: Limites GADM (EPSG:4326)
+
+    Returns:
+        GeoDataFrame avec centroid_lat/lon, emprise (min/max lon/lat) et
+        area_km2 (aire équivalente EPSG:6933)
+    """
+    gadm = gadm.reset_index(drop=True)
+    geometries = gadm.geometry.values
+    centroids = shapely.centroid(geometries)
+    bounds = shapely.bounds(geometries)
+
+    gadm["centroid_lat"] = shapely.get_y(centroids)
+    gadm["centroid_lon"] = shapely.get_x(centroids)
+    gadm["min_lon"] = bounds[:, 0]
+    gadm["min_lat"] = bounds[:, 1]
+    gadm["max_lon"] = bounds[:, 2]
+    gadm["max_lat"] = bounds[:, 3]
+    gadm["area_km2"] = gadm.geometry.to_crs("EPSG:6933").area.to_numpy() / 1e6
+    return gadm
+
+
+def _remove_stale(source: Path, keep: Path) -> None:
+    """Supprime les caches d'anciennes versions de la source"""
+    for stale in keep.parent.glob(f"{source.stem}.*.v*.*"):
+        if not stale.name.startswith(keep.name[: -len(".parquet")]):
+            stale.unlink()
+
+
+def load_gadm(
+    source: str, cache_dir: Optional[str] = None, rebuild: bool = False
+) -> Tuple[gpd.GeoDataFrame, PolygonSampler]:
+    """
+    Charge les limites GADM et leur échantillonneur, via le cache si valide
+
+    Args:
+        source: Fichier GADM (GeoJSON ou tout format lisible par geopandas)
+        cache_dir: Répertoire du cache (défaut: celui de la source)
+        rebuild: Forcer la reconstruction du cache
+
+    Returns:
+        Tuple (limites avec attributs précalculés, PolygonSampler)
+    """
+    source = Path(source)
+    boundaries_path, sampler_path = cache_paths(
+        source, source_digest(source, cache_dir), cache_dir
+    )
+
+    if not rebuild and boundaries_path.exists() and sampler_path.exists():
+        logger.debug(f"Limites GADM lues depuis le cache {boundaries_path}")
+        gadm = gpd.read_parquet(boundaries_path)
+        with np.load(sampler_path) as arrays:
+            sampler = PolygonSampler.from_state(dict(arrays))
+        return gadm, sampler
+
+    logger.info(f"Construction du cache GADM: {boundaries_path}")
+    gadm = prepare_boundaries(gpd.read_file(source))
+    sampler = PolygonSampler(gadm.geometry.values)
+
+    # Écriture puis renommage: un cache interrompu n'est jamais relu
+    boundaries_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_boundaries = boundaries_path.with_name(boundaries_path.name + ".tmp")
+    tmp_sampler = sampler_path.with_name(sampler_path.name + ".tmp")
+    gadm.to_parquet(tmp_boundaries, compression="zstd")
+    with open(tmp_sampler, "wb") as f:
+        np.savez(f, **sampler.state())
+    tmp_sampler.replace(sampler_path)
+    tmp_boundaries.replace(boundaries_path)
+    _remove_stale(source, boundaries_path)
+
+    return gadm, sampler
@@ -0,0 +1,139 @@
+"""
+Calculs géodésiques vectorisés
+Projet: Mobilité Côte d'Ivoire - ANStat
+
+Ce module fournit les calculs de distance et d'azimut sur la sphère
+(rayon terrestre moyen) sous forme d'opérations NumPy sur tableaux.
+Toutes les coordonnées sont en degrés décimaux (WGS84).
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Rayon terrestre moyen en km
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine(
+    lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray
+) -> np.ndarray:
+    """
+    Distance orthodromique (formule de haversine)
+
+    Args:
+        lat1, lon1: Coordonnées des points de départ
+        lat2, lon2: Coordonnées des points d'arrivée
+
+    Returns:
+        Distances en kilomètres (diffusion NumPy des entrées)
+    """
+    lat1, lon1, lat2, lon2 = (
+        np.radians(np.asarray(x, dtype=np.float64)) for x in (lat1, lon1, lat2, lon2)
+    )
+
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def initial_bearing(
+    lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray
+) -> np.ndarray:
+    """
+    Azimut initial du point de départ vers le point d'arrivée
+
+    Args:
+        lat1, lon1: Coordonnées des points de départ
+        lat2, lon2: Coordonnées des points d'arrivée
+
+    Returns:
+        Azimuts en degrés, dans [0, 360) (0 = nord, 90 = est)
+    """
+    lat1, lon1, lat2, lon2 = (
+        np.radians(np.asarray(x, dtype=np.float64)) for x in (lat1, lon1, lat2, lon2)
+    )
+    dlon = lon2 - lon1
+
+    x = np.sin(dlon) * np.cos(lat2)
+    y = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlon)
+    return np.degrees(np.arctan2(x, y)) % 360
+
+
+def destination_point(
+    lat: np.ndarray, lon: np.ndarray, distance_km: np.ndarray, bearing_deg: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Point atteint en parcourant une distance selon un azimut
+
+    Args:
+        lat, lon: Coordonnées des points de départ
+        distance_km: Distances parcourues
+        bearing_deg: Azimuts en degrés (0 = nord, 90 = est)
+
+    Returns:
+        Tuple (latitude, longitude) des points d'arrivée
+    """
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+    delta = np.asarray(distance_km, dtype=np.float64) / EARTH_RADIUS_KM
+    theta = np.radians(np.asarray(bearing_deg, dtype=np.float64))
+
+    sin_lat2 = np.sin(lat) * np.cos(delta) + np.cos(lat) * np.sin(delta) * np.cos(theta)
+    lat2 = np.arcsin(np.clip(sin_lat2, -1, 1))
+    lon2 = lon + np.arctan2(
+        np.sin(theta) * np.sin(delta) * np.cos(lat),
+        np.cos(delta) - np.sin(lat) * sin_lat2,
+    )
+
+    # Normalisation de la longitude dans [-180, 180)
+    lon2 = (np.degrees(lon2) + 540) % 360 - 180
+    return np.degrees(lat2), lon2
+
+
+def pairwise_distance_matrix(
+    lats1: np.ndarray,
+    lons1: np.ndarray,
+    lats2: Optional[np.ndarray] = None,
+    lons2: Optional[np.ndarray] = None,
+    chunk_size: int = 2048,
+) -> np.ndarray:
+    """
+    Matrice des distances de haversine entre deux ensembles de points
+
+    Le calcul est fait par blocs de lignes en float32 : la mémoire
+    temporaire est O(chunk_size × m) au lieu de O(n × m) en float64.
+
+    Args:
+        lats1, lons1: Coordonnées des n points (lignes)
+        lats2, lons2: Coordonnées des m points (colonnes, défaut: les mêmes)
+        chunk_size: Nombre de lignes calculées par bloc
+
+    Returns:
+        Matrice (n, m) des distances en km (float32)
+    """
+    if lats2 is None or lons2 is None:
+        lats2, lons2 = lats1, lons1
+
+    lat1 = np.radians(np.asarray(lats1, dtype=np.float32))
+    lon1 = np.radians(np.asarray(lons1, dtype=np.float32))
+    lat2 = np.radians(np.asarray(lats2, dtype=np.float32))
+    lon2 = np.radians(np.asarray(lons2, dtype=np.float32))
+    cos_lat2 = np.cos(lat2)
+
+    result = np.empty((len(lat1), len(lat2)), dtype=np.float32)
+    for start in range(0, len(lat1), chunk_size):
+        stop = min(start + chunk_size, len(lat1))
+        la = lat1[start:stop, None]
+        lo = lon1[start:stop, None]
+
+        a = (
+            np.sin((lat2 - la) / 2) ** 2
+            + np.cos(la) * cos_lat2 * np.sin((lon2 - lo) / 2) ** 2
+        )
+        np.clip(a, 0, 1, out=a)
+        result[start:stop] = (2 * EARTH_RADIUS_KM) * np.arcsin(np.sqrt(a))
+
+    return result
@@ -0,0 +1,114 @@
+"""
+Indexation H3 vectorisée
+Projet: Mobilité Côte d'Ivoire - ANStat
+
+Ce module calcule les cellules H3 (identifiants int64) de tableaux
+de coordonnées, à plusieurs résolutions en une seule passe.
+Les coordonnées manquantes reçoivent la cellule nulle (MISSING_CELL).
+"""
+
+from itertools import repeat
+from typing import Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+try:
+    from h3.api import basic_int as h3_int
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    h3_int = None
+
+# Identifiant attribué aux coordonnées manquantes (0 n'est pas un index H3 valide)
+MISSING_CELL = 0
+
+
+def h3_available() -> bool:
+    """Indique si la librairie h3 (API v4) est installée"""
+    return h3_int is not None
+
+
+class H3Indexer:
+    """
+    Indexe des coordonnées en cellules H3 à plusieurs résolutions
+
+    Les coordonnées sont dédoublonnées avant l'appel à h3 (positions de
+    domicile répétées, etc.). Chaque résolution est calculée par
+    h3.latlng_to_cell: le parent d'une cellule fine n'est pas toujours la
+    cellule grossière contenant le point.
+    """
+
+    def __init__(self, resolutions: Iterable[int] = (5, 7, 9)):
+        """
+        Initialise l'indexeur
+
+        Args:
+            resolutions: Résolutions H3 à produire
+        """
+        if h3_int is None:
+            raise ImportError(
+                "La librairie h3 (>=4.0) est requise pour l'indexation H3"
+            )
+
+        self.resolutions = sorted(set(int(r) for r in resolutions))
+
+    def index(self, lats: np.ndarray, lons: np.ndarray) -> Dict[int, np.ndarray]:
+        """
+        Calcule les cellules H3 de tableaux de coordonnées
+
+        Args:
+            lats: Latitudes
+            lons: Longitudes
+
+        Returns:
+            Dictionnaire {résolution: identifiants int64}, MISSING_CELL
+            pour les coordonnées manquantes
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+
+        # Dédoublonnage des coordonnées valides
+        valid = ~(np.isnan(lats) | np.isnan(lons))
+        codes, uniques = pd.factorize(lats[valid] + 1j * lons[valid])
+        unique_lats, unique_lons = uniques.real.tolist(), uniques.imag.tolist()
+
+        cells = {}
+        for res in self.resolutions:
+            unique_cells = np.fromiter(
+                map(
+                    h3_int.latlng_to_cell,
+                    unique_lats,
+                    unique_lons,
+                    repeat(res, len(uniques)),
+                ),
+                dtype=np.int64,
+                count=len(uniques),
+            )
+            values = np.full(len(lats), MISSING_CELL, dtype=np.int64)
+            values[valid] = unique_cells[codes]
+            cells[res] = values
+        return cells
+
+    def add_columns(
+        self, df: pd.DataFrame, lat_col: str, lon_col: str, prefix: str
+    ) -> pd.DataFrame:
+        """
+        Ajoute les colonnes H3 '{prefix}_r{résolution}' à un DataFrame
+
+        Args:
+            df: DataFrame à enrichir (modifié en place)
+            lat_col: Colonne de latitude
+            lon_col: Colonne de longitude
+            prefix: Préfixe des colonnes créées (ex: 'home_h3')
+
+        Returns:
+            DataFrame enrichi
+        """
+        cells = self.index(df[lat_col].to_numpy(), df[lon_col].to_numpy())
+        for res, values in cells.items():
+            df[f"{prefix}_r{res}"] = values
+        return df
+
+    @staticmethod
+    def column(prefix: str, resolution: int) -> str:
+        """Nom de la colonne H3 pour un préfixe et une résolution"""
+        return f"{prefix}_r{resolution}"
@@ -0,0 +1,79 @@
+"""
+Ajustement proportionnel itératif (IPF) vectorisé
+Projet: Mobilité Côte d'Ivoire - ANStat
+
+Ce module ajuste un tableau de contingence de dimension quelconque à des
+marges cibles (tables sur un sous-ensemble des dimensions). Chaque
+ajustement est une réduction NumPy suivie d'une multiplication diffusée
+sur tout le tableau ; les cellules nulles de l'a priori (cellules
+structurellement vides) restent nulles.
+"""
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from loguru import logger
+
+# Une marge: axes du tableau couverts (triés) et table cible sur ces axes
+Marginal = Tuple[Tuple[int, ...], np.ndarray]
+
+
+def ipf(
+    seed: np.ndarray,
+    marginals: Sequence[Marginal],
+    max_iter: int = 100,
+    tol: float = 1e-6,
+) -> Tuple[np.ndarray, int]:
+    """
+    Ajuste un tableau de contingence à des marges cibles
+
+    Les marges sont normalisées (somme 1) : le résultat est un tableau de
+    probabilités jointes.
+
+    Args:
+        seed: Tableau a priori (poids positifs ou nuls, une dimension par variable)
+        marginals: Liste de (axes triés, table cible de forme seed.shape[axes])
+        max_iter: Nombre maximal de cycles d'ajustement
+        tol: Écart absolu maximal toléré entre marges ajustées et cibles
+
+    Returns:
+        Tuple (probabilités jointes ajustées, nombre de cycles effectués)
+    """
+    fitted = np.asarray(seed, dtype=np.float64)
+    if (fitted < 0).any() or fitted.sum() <= 0:
+        raise ValueError("L'a priori doit être positif et de somme non nulle")
+    fitted = fitted / fitted.sum()
+
+    targets: List[Tuple[Tuple[int, ...], np.ndarray]] = []
+    for axes, target in marginals:
+        axes = tuple(axes)
+        if list(axes) != sorted(set(axes)):
+            raise ValueError(f"Axes de marge non triés ou répétés: {axes}")
+        target = np.asarray(target, dtype=np.float64)
+        if target.shape != tuple(fitted.shape[ax] for ax in axes):
+            raise ValueError(f"Marge de forme {target.shape} pour les axes {axes}")
+        other = tuple(ax for ax in range(fitted.ndim) if ax not in axes)
+        targets.append((other, target / target.sum()))
+    if not targets:
+        return fitted, 0
+
+    for n_iter in range(1, max_iter + 1):
+        for other, target in targets:
+            current = fitted.sum(axis=other)
+            ratio = np.divide(
+                target, current, out=np.zeros_like(current), where=current > 0
+            )
+            fitted *= np.expand_dims(ratio, other)
+
+        error = max(
+            np.abs(fitted.sum(axis=other) - target).max() for other, target in targets
+        )
+        if error < tol:
+            break
+    else:
+        logger.warning(
+            f"IPF non convergé après {max_iter} cycles (écart {error:.2e}): "
+            "marges incompatibles ou cellules cibles sans support"
+        )
+
+    return fitted, n_iter
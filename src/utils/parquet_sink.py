@@ -0,0 +1,116 @@
+"""
+Écriture Parquet incrémentale
+Projet: Mobilité Côte d'Ivoire - ANStat
+
+Ce module écrit des DataFrames par blocs successifs, soit comme
+row groups d'un fichier Parquet unique, soit comme dataset partitionné
+(style Hive), sans jamais conserver l'ensemble des données en mémoire.
+"""
+
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+class ParquetSink:
+    """
+    Destination Parquet alimentée bloc par bloc
+
+    Le schéma est fixé par le premier bloc non vide ; les blocs suivants
+    y sont convertis. Le nombre de lignes écrites est suivi au fil de l'eau.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        partition_cols: Optional[List[str]] = None,
+        compression: str = "snappy",
+    ):
+        """
+        Initialise la destination
+
+        Args:
+            path: Fichier Parquet, ou répertoire racine si partitionné
+            partition_cols: Colonnes de partitionnement (None = fichier unique)
+            compression: Codec de compression Parquet
+        """
+        self.path = Path(path)
+        self.partition_cols = partition_cols or None
+        self.compression = compression
+
+        self.schema: Optional[pa.Schema] = None
+        self.columns: List[str] = []
+        self.rows = 0
+        self.chunks = 0
+        self._writer: Optional[pq.ParquetWriter] = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        """
+        Écrit un bloc
+
+        Args:
+            df: Bloc de données (les blocs vides sont ignorés)
+        """
+        if len(df) == 0:
+            return
+
+        if self.schema is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            self.schema = widen_dictionary_indices(table.schema)
+            self.columns = list(df.columns)
+            table = table.cast(self.schema)
+        else:
+            table = pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+
+        if self.partition_cols:
+            pq.write_to_dataset(
+                table,
+                root_path=str(self.path),
+                partition_cols=self.partition_cols,
+                basename_template=f"part-{self.chunks:05d}-{{i}}.parquet",
+                compression=self.compression,
+            )
+        else:
+            if self._writer is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._writer = pq.ParquetWriter(
+                    str(self.path), self.schema, compression=self.compression
+                )
+            self._writer.write_table(table)
+
+        self.rows += len(df)
+        self.chunks += 1
+
+    def close(self) -> None:
+        """Ferme le fichier Parquet (sans effet en mode partitionné)"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self) -> "ParquetSink":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def widen_dictionary_indices(schema: pa.Schema) -> pa.Schema:
+    """
+    Élargit les indices des colonnes dictionnaire (catégories) en int32
+
+    pandas choisit le plus petit entier pour les codes d'une catégorie
+    (int8 sous 128 modalités) : un bloc suivant avec plus de modalités
+    ne serait plus convertible vers le schéma du premier bloc.
+    """
+    fields = [
+        (
+            field.with_type(pa.dictionary(pa.int32(), field.type.value_type))
+            if pa.types.is_dictionary(field.type)
+            else field
+        )
+        for field in schema
+    ]
+    return pa.schema(fields, metadata=schema.metadata)
@@ -0,0 +1,171 @@
+"""
+Échantillonnage spatial vectorisé
+Projet: Mobilité Côte d'Ivoire - ANStat
+
+Ce module tire des points uniformément répartis dans des polygones
+(limites administratives GADM) par lots, sans test d'appartenance
+point par point.
+"""
+
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+import shapely
+
+# Tableaux qui décrivent entièrement un échantillonneur (voir state)
+SAMPLER_ARRAYS = (
+    "origin",
+    "edge_1",
+    "edge_2",
+    "cum_areas",
+    "tri_start",
+    "tri_end",
+    "polygon_areas",
+    "area_offset",
+    "centroid_x",
+    "centroid_y",
+    "has_triangles",
+)
+
+
+class PolygonSampler:
+    """
+    Échantillonneur de points uniformes dans un ensemble de polygones
+
+    Chaque polygone est triangulé une seule fois (Delaunay contraint).
+    Un tirage choisit un triangle au prorata de son aire, puis un point
+    uniforme dans ce triangle via les coordonnées barycentriques : le
+    coût par point est O(log T) et tous les points sont tirés d'un bloc.
+    """
+
+    def __init__(self, geometries: Sequence):
+        """
+        Triangule les polygones
+
+        Args:
+            geometries: Séquence de géométries shapely (Polygon/MultiPolygon),
+                indexée par code de polygone
+        """
+        geoms = shapely.make_valid(np.asarray(geometries, dtype=object))
+        self.n_polygons = len(geoms)
+
+        triangles, owner = shapely.get_parts(
+            shapely.constrained_delaunay_triangles(geoms), return_index=True
+        )
+        triangles, owner = self._keep_triangles(triangles, owner)
+
+        # Sommets (A, B, C) de chaque triangle, en (x=lon, y=lat)
+        coords = shapely.get_coordinates(triangles).reshape(-1, 4, 2)[:, :3, :]
+        self.origin = coords[:, 0, :]
+        self.edge_1 = coords[:, 1, :] - coords[:, 0, :]
+        self.edge_2 = coords[:, 2, :] - coords[:, 0, :]
+
+        areas = 0.5 * np.abs(
+            self.edge_1[:, 0] * self.edge_2[:, 1]
+            - self.edge_1[:, 1] * self.edge_2[:, 0]
+        )
+
+        # Aires cumulées globales ; les triangles d'un polygone sont contigus
+        self.cum_areas = np.cumsum(areas)
+        counts = np.bincount(owner, minlength=self.n_polygons)
+        self.tri_end = np.cumsum(counts)
+        self.tri_start = self.tri_end - counts
+        self.polygon_areas = np.bincount(
+            owner, weights=areas, minlength=self.n_polygons
+        )
+        self.area_offset = np.concatenate([[0.0], self.cum_areas])[self.tri_start]
+
+        # Repli pour les polygones sans triangle exploitable
+        centroids = shapely.centroid(geoms)
+        self.centroid_x = shapely.get_x(centroids)
+        self.centroid_y = shapely.get_y(centroids)
+        self.has_triangles = counts > 0
+
+    def state(self) -> Dict[str, np.ndarray]:
+        """
+        Tableaux de la triangulation (pour la mise en cache)
+
+        Returns:
+            Dictionnaire {nom: tableau} (voir SAMPLER_ARRAYS)
+        """
+        return {name: getattr(self, name) for name in SAMPLER_ARRAYS}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, np.ndarray]) -> "PolygonSampler":
+        """
+        Reconstruit un échantillonneur sans retrianguler
+
+        Args:
+            state: Tableaux produits par state()
+
+        Returns:
+            PolygonSampler équivalent à l'original
+        """
+        sampler = cls.__new__(cls)
+        for name in SAMPLER_ARRAYS:
+            setattr(sampler, name, np.asarray(state[name]))
+        sampler.n_polygons = len(sampler.tri_start)
+        return sampler
+
+    @staticmethod
+    def _keep_triangles(
+        triangles: np.ndarray, owner: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Ne conserve que les triangles non vides (polygones dégénérés exclus)"""
+        valid = (shapely.get_type_id(triangles) == 3) & ~shapely.is_empty(triangles)
+        valid &= shapely.get_num_coordinates(triangles) == 4
+        return triangles[valid], owner[valid]
+
+    def sample(
+        self, polygon_idx: np.ndarray, rng: np.random.Generator
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Tire un point uniforme dans chaque polygone demandé
+
+        Args:
+            polygon_idx: Codes des polygones (un point par élément)
+            rng: Générateur aléatoire NumPy
+
+        Returns:
+            Tuple de tableaux (latitude, longitude)
+        """
+        polygon_idx = np.asarray(polygon_idx, dtype=np.int64)
+        n = len(polygon_idx)
+
+        # Choix du triangle proportionnellement à son aire
+        target = self.area_offset[polygon_idx] + rng.random(n) * (
+            self.polygon_areas[polygon_idx]
+        )
+        tri = np.searchsorted(self.cum_areas, target, side="right")
+        tri = np.clip(tri, self.tri_start[polygon_idx], self.tri_end[polygon_idx] - 1)
+        tri = np.clip(tri, 0, max(len(self.cum_areas) - 1, 0))
+
+        # Point uniforme dans le triangle (repli par symétrie si r1 + r2 > 1)
+        r1 = rng.random(n)
+        r2 = rng.random(n)
+        flip = r1 + r2 > 1
+        r1[flip] = 1 - r1[flip]
+        r2[flip] = 1 - r2[flip]
+
+        if len(self.cum_areas) > 0:
+            points = (
+                self.origin[tri]
+                + r1[:, None] * self.edge_1[tri]
+                + r2[:, None] * self.edge_2[tri]
+            )
+            lon, lat = points[:, 0], points[:, 1]
+        else:
+            lon, lat = np.empty(n), np.empty(n)
+
+        # Fallback: centroïde avec bruit pour les polygones non triangulés
+        missing = ~self.has_triangles[polygon_idx]
+        if missing.any():
+            n_missing = int(missing.sum())
+            lat[missing] = self.centroid_y[polygon_idx[missing]] + rng.normal(
+                0, 0.02, n_missing
+            )
+            lon[missing] = self.centroid_x[polygon_idx[missing]] + rng.normal(
+                0, 0.02, n_missing
+            )
+
+        return lat, lon
@@ -63,6 +63,40 @@ class TestSyntheticGenerator:
         
         return str(config_path)
     
+    @pytest.fixture
+    def gadm_config(self, sample_config):
+        """Ajoute un petit fichier GADM (3 localités) au répertoire raw du test"""
+        import geopandas as gpd
+        import yaml
+        from shapely.geometry import MultiPolygon, Polygon
+        
+        with open(sample_config) as f:
+            config = yaml.safe_load(f)
+        
+        square = Polygon([(-4.1, 5.3), (-3.9, 5.3), (-3.9, 5.5), (-4.1, 5.5)])
+        holed = Polygon(
+            [(-5.2, 7.5), (-4.8, 7.5), (-4.8, 7.9), (-5.2, 7.9)],
+            [[(-5.1, 7.6), (-4.9, 7.6), (-4.9, 7.8), (-5.1, 7.8)]]
+        )
+        islands = MultiPolygon([
+            Polygon([(-6.7, 4.7), (-6.6, 4.7), (-6.6, 4.8)]),
+            Polygon([(-6.5, 4.9), (-6.4, 4.9), (-6.4, 5.0), (-6.5, 5.0)])
+        ])
+        gadm = gpd.GeoDataFrame(
+            {
+                'NAME_1': ['Abidjan', 'Vallée du Bandama', 'Bas-Sassandra'],
+                'NAME_2': ['Abidjan', 'Bouaké', 'San-Pédro'],
+                'NAME_4': ['Abidjan-Ville', 'Bouake', 'San-Pedro'],
+            },
+            geometry=[square, holed, islands],
+            crs='EPSG:4326'
+        )
+        raw_dir = Path(config['paths']['raw_dir'])
+        raw_dir.mkdir(parents=True, exist_ok=True)
+        gadm.to_file(raw_dir / 'gadm41_CIV_4.json', driver='GeoJSON')
+        
+        return sample_config
+    
     def test_generator_initialization(self, sample_config):
         """Test l'initialisation du générateur"""
         from data_generation.synthetic_generator import SyntheticDataGenerator
@@ -89,6 +123,204 @@ class TestSyntheticGenerator:
         assert users_df['home_lat'].between(4.0, 11.0).all()
         assert users_df['home_lon'].between(-9.0, -2.0).all()
     
+    def test_user_profiles_columnar_distributions(self, sample_config):
+        """Test la cohérence des attributs tirés en colonnes"""
+        from data_generation.synthetic_generator import SyntheticDataGenerator
+        
+        generator = SyntheticDataGenerator(sample_config)
+        users_df = generator.generate_user_profiles()
+        
+        assert users_df['user_id'].is_unique
+        assert users_df['household_size'].between(1, 8).all()
+        assert users_df['initial_wealth_score'].between(0, 1).all()
+        assert set(users_df['urban_rural']) <= {'urban', 'rural'}
+        assert set(users_df['occupation']) <= {'employee', 'other'}
+    
+    def test_user_ids_batch_matches_single(self, sample_config):
+        """Test que les identifiants en lot ont le format de _generate_user_id"""
+        from data_generation.synthetic_generator import SyntheticDataGenerator
+        
+        generator = SyntheticDataGenerator(sample_config)
+        ids = generator._generate_user_ids(50, offset=10, salt='sel-é')
+        
+        assert list(ids) == [generator._generate_user_id(i, 'sel-é') for i in range(10, 60)]
+    
+    def test_home_points_inside_gadm_localities(self, gadm_config):
+        """Test que les domiciles tirés en lot sont dans leur localité"""
+        import shapely
+        from data_generation.synthetic_generator import SyntheticDataGenerator
+        
+        generator = SyntheticDataGenerator(gadm_config)
+        assert generator.has_gadm
+        
+        users_df = generator.generate_user_profiles()
+        points = shapely.points(users_df['home_lon'], users_df['home_lat'])
+        polygons = generator.gadm.set_index('NAME_4').geometry
+        
+        # Tolérance liée à l'arrondi des coordonnées à 6 décimales
+        inside = shapely.dwithin(
+            polygons.loc[users_df['locality']].values, points, 1e-5
+        )
+        assert inside.all()
+        
+        # Noms NAME_4 partagés: le nom désigne sa première localité
+        generator.gadm.loc[2, 'NAME_4'] = 'Bouake'
+        generator._prepare_localities()
+        assert generator._get_locality_codes(['Bouake', 'Abidjan-Ville']).tolist() == [1, 0]
+    
+    def test_generate_all_with_duplicate_locality_names(self, gadm_config):
+        """Test la génération complète quand NAME_4 répète un nom dans deux régions"""
+        import geopandas as gpd
+        import yaml
+        from data_generation.synthetic_generator import SyntheticDataGenerator
+        
+        with open(gadm_config) as f:
+            raw_dir = Path(yaml.safe_load(f)['paths']['raw_dir'])
+        gadm = gpd.read_file(raw_dir / 'gadm41_CIV_4.json')
+        gadm['NAME_4'] = ['Koko', 'Koko', 'San-Pedro']
+        gadm.to_file(raw_dir / 'gadm41_CIV_4.json', driver='GeoJSON')
+        
+        datasets = SyntheticDataGenerator(gadm_config).generate_all()
+        
+        migration = datasets['migration']
+        assert len(migration) > 0
+        assert set(migration['current_locality']) <= {'Koko', 'San-Pedro'}
+        assert set(datasets['users']['region']) <= set(gadm['NAME_1'])
+    
+    def test_gadm_cache_keyed_by_source_hash(self, gadm_config, monkeypatch):
+        """Test le cache GeoParquet des limites GADM et son invalidation"""
+        import geopandas as gpd
+        import yaml
+        from data_generation.synthetic_generator import SyntheticDataGenerator
+        from utils import gadm_cache
+        
+        with open(gadm_config) as f:
+            raw_dir = Path(yaml.safe_load(f)['paths']['raw_dir'])
+        
+        first = SyntheticDataGenerator(gadm_config)
+        cached = sorted(raw_dir.glob('gadm41_CIV_4.*.v*.*'))
+        assert sorted(p.suffix for p in cached) == ['.npz', '.parquet']
+        mtimes = [p.stat().st_mtime_ns for p in cached]
+        
+        # Deuxième démarrage: lecture du cache sans rehacher la source inchangée
+        with monkeypatch.context() as patch:
+            patch.setattr(gadm_cache, 'file_digest', lambda path: pytest.fail('source rehachée'))
+            second = SyntheticDataGenerator(gadm_config)
+        assert [p.stat().st_mtime_ns for p in cached] == mtimes
+        pd.testing.assert_frame_equal(first.locality_table, second.locality_table)
+        codes = np.repeat(np.arange(3), 50)
+        for a, b in zip(first.locality_sampler.sample(codes, np.random.default_rng(0)),
+                        second.locality_sampler.sample(codes, np.random.default_rng(0))):
+            assert np.array_equal(a, b)
+        
+        # Source modifiée: nouveau cache, l'ancien est supprimé
+        gadm = gpd.read_file(raw_dir / 'gadm41_CIV_4.json')
+        gadm.loc[0, 'NAME_2'] = 'Abidjan Sud'
+        gadm.to_file(raw_dir / 'gadm41_CIV_4.json', driver='GeoJSON')
+        third = SyntheticDataGenerator(gadm_config)
+        assert third.locality_table.loc[0, 'department'] == 'Abidjan Sud'
+        rebuilt = sorted(raw_dir.glob('gadm41_CIV_4.*.v*.*'))
+        assert len(rebuilt) == 2 and not set(rebuilt) & set(cached)
+    
+    def test_locality_table_and_migration_codes(self, gadm_config):
+        """Test la table des localités et les destinations par code entier"""
+        from data_generation.synthetic_generator import SyntheticDataGenerator
+        
+        generator = SyntheticDataGenerator(gadm_config)
+        table = generator.locality_table
+        
+        assert list(table['name']) == ['Abidjan-Ville', 'Bouake', 'San-Pedro']
+        assert list(generator._get_locality_codes(['San-Pedro', 'Bouake'])) == [2, 1]
+        assert (table['area_km2'] > 0).all()
+        
+        users_df = generator.generate_user_profiles()
+        migration_df = generator.generate_migration_data(users_df)
+        
+        assert (migration_df['origin_locality'] != migration_df['current_locality']).all()
+        expected_region = table.set_index('name')['region']
+        assert (
+            migration_df['current_region'].values
+            == expected_region.loc[migration_df['current_locality']].values
+        ).all()
+    
+    def test_migration_batch_invariants(self, gadm_config):
+        """Test la génération vectorisée des migrations (destinations, durées, historique)"""
+        import ast
+        from shapely.geometry import Point
+        from data_generation.synthetic_generator import SyntheticDataGenerator
+        from utils.geodesy import haversine
+        
+        generator = SyntheticDataGenerator(gadm_config)
+        generator.n_users = 3000
+        generator.migration_config['migration_probability'] = 0.5
+        users_df = generator.generate_user_profiles()
+        migration_df = generator.generate_migration_data(users_df)
+        
+        assert len(migration_df) == 1500
+        assert migration_df['user_id'].is_unique
+        assert (migration_df['origin_locality'] != migration_df['current_locality']).all()
+        
+        # Destination dans son polygone GADM, distance cohérente avec les coordonnées
+        polygons = generator.gadm.set_index('NAME_4').geometry
+        for row in migration_df.head(100).itertuples():
+            assert polygons[row.current_locality].buffer(1e-6).contains(Point(row.current_lon, row.current_lat))
+        distance = haversine(migration_df['origin_lat'], migration_df['origin_lon'],
+                             migration_df['current_lat'], migration_df['current_lon'])
+        assert np.allclose(migration_df['distance_km'], distance, atol=0.06)
+        
+        for movement_type, (low, high) in generator.RESIDENCE_DAYS.items():
+            days = migration_df.loc[migration_df['movement_type'] == movement_type, 'residence_duration_days']
+            assert days.between(low, high - 1).all()
+        
+        # Retours: localité intermédiaire distincte de l'origine et de la destination
+        for row in migration_df.itertuples():
+            previous = ast.literal_eval(row.previous_locations)
+            assert previous[0] == row.origin_locality
+            if row.is_return_migration:
+                assert len(previous) == 2
+                assert previous[1] not in (row.origin_locality, row.current_locality)
+            else:
+                assert len(previous) == 1
+    
+    def test_population_calibrated_to_marginals(self, gadm_config, tmp_path):
+        """Test le calage IPF des profils sur des marges région x âge et occupation x sexe"""
+        import yaml
+        from data_generation.synthetic_generator import SyntheticDataGenerator
+        
+        by_region_age = pd.DataFrame({
+            'region': np.repeat(['Abidjan', 'Vallée du Bandama', 'Bas-Sassandra'], 3),
+            'age_group': ['18-24', '25-34', '35+'] * 3,
+            'population': [300, 200, 100, 50, 100, 150, 40, 30, 30],
+        })
+        by_occupation = pd.DataFrame({
+            'occupation': ['employee', 'employee', 'other', 'other'],
+            'gender': ['M', 'F', 'M', 'F'],
+            'population': [450, 50, 200, 300],
+        })
+        by_region_age.to_csv(tmp_path / 'region_age.csv', index=False)
+        by_occupation.to_csv(tmp_path / 'occupation.csv', index=False)
+        
+        with open(gadm_config) as f:
+            config = yaml.safe_load(f)
+        config['generation']['n_users'] = 20000
+        config['calibration'] = {'marginals': [str(tmp_path / 'region_age.csv'), str(tmp_path / 'occupation.csv')]}
+        with open(gadm_config, 'w') as f:
+            yaml.dump(config, f)
+        
+        generator = SyntheticDataGenerator(gadm_config)
+        users_df = generator.generate_user_profiles()
+        
+        for table, dims in ((by_region_age, ['region', 'age_group']), (by_occupation, ['occupation', 'gender'])):
+            target = table.set_index(dims)['population'] / table['population'].sum()
+            fitted = generator.calibrator.marginal(dims).loc[target.index]
+            assert np.allclose(fitted, target, atol=1e-6)
+            observed = users_df.groupby(dims, observed=True).size() / len(users_df)
+            assert np.allclose(observed.reindex(target.index, fill_value=0), target, atol=0.015)
+        
+        # Localités cohérentes avec la région tirée
+        regions = generator.gadm.set_index('NAME_4')['NAME_1']
+        assert (users_df['region'].astype(str).to_numpy() == regions.loc[users_df['locality'].astype(str)].to_numpy()).all()
+    
     def test_generate_poverty_data(self, sample_config):
         """Test la génération des données de pauvreté"""
         from data_generation.synthetic_generator import SyntheticDataGenerator
@@ -104,6 +336,229 @@ class TestSyntheticGenerator:
         # Les scores de diversité doivent être entre 0 et 1
         assert poverty_df['contact_diversity_score'].between(0, 1).all()
     
+    def test_generate_mobility_data_caps(self, sample_config):
+        """Test la génération des trajets, avec et sans plafonds"""
+        from data_generation.synthetic_generator import SyntheticDataGenerator
+        
+        generator = SyntheticDataGenerator(sample_config)
+        users_df = generator.generate_user_profiles()
+        
+        # Sans plafond: tous les utilisateurs, toute la période
+        mobility_df = generator.generate_mobility_data(users_df)
+        assert mobility_df['user_id'].nunique() == len(users_df)
+        assert mobility_df['trip_id'].is_unique
+        assert mobility_df['hour_of_day'].between(5, 22).all()
+        assert (mobility_df['duration_min'] >= 1).all()
+        
+        # Plafonds explicites via la config
+        generator.mobility_config['max_users'] = 10
+        generator.mobility_config['max_days'] = 2
+        capped_df = generator.generate_mobility_data(users_df)
+        assert capped_df['user_id'].nunique() <= 10
+        assert set(capped_df['timestamp'].dt.strftime('%Y-%m-%d')) <= {'2024-01-01', '2024-01-02'}
+    
+    def test_sharded_generation_is_worker_independent(self, sample_config):
+        """Test que la génération par shards ne dépend pas du nombre de workers"""
+        from data_generation.synthetic_generator import SyntheticDataGenerator
+        
+        generator = SyntheticDataGenerator(sample_config)
+        sequential = generator.generate_all(save=False, n_shards=4, n_workers=1)
+        parallel = generator.generate_all(save=False, n_shards=4, n_workers=2)
+        
+        for name, df in sequential.items():
+            pd.testing.assert_frame_equal(df, parallel[name])
+        
+        users_df = sequential['users']
+        assert len(users_df) == 100
+        assert users_df['user_id'].is_unique
+        assert set(sequential['poverty']['user_id']) == set(users_df['user_id'])
+    
+    def test_streaming_generation_to_parquet(self, sample_config, tmp_path):
+        """Test la génération en flux (row groups et dataset partitionné)"""
+        import yaml
+        from data_generation.schema import load_dataset
+        from data_generation.synthetic_generator import SyntheticDataGenerator
+        
+        generator = SyntheticDataGenerator(sample_config)
+        saved = generator.generate_streaming(tmp_path / 'stream', chunk_size=30)
+        
+        # Identique à la génération par shards avec autant de shards que de blocs
+        expected = generator.generate_sharded(n_shards=4, n_workers=1)
+        for name, df in expected.items():
+            streamed = load_dataset(saved[f'{name}_parquet'], name)
+            pd.testing.assert_frame_equal(streamed, df, check_categorical=False)
+        
+        with open(saved['metadata']) as f:
+            metadata = yaml.safe_load(f)
+        assert metadata['datasets']['poverty']['rows'] == len(expected['poverty'])
+        
+        # Les antennes référencées par la mobilité sont écrites avec les blocs
+        antennas = load_dataset(saved['antennas_parquet'], 'antennas')
+        mobility = load_dataset(saved['mobility_parquet'], 'mobility')
+        assert set(mobility['origin_antenna']).issubset(antennas['antenna_id'])
+        
+        # Dataset partitionné par région et semaine
+        generator.config['streaming'] = {'partition_cols': {'poverty': ['region', 'week_start']}}
+        saved = generator.generate_streaming(tmp_path / 'partitioned', chunk_size=30)
+        assert Path(saved['poverty_parquet']).is_dir()
+        assert len(pd.read_parquet(saved['poverty_parquet'])) == len(expected['poverty'])
+    
+    @pytest.mark.parametrize('n_shards', [1, 2])
+    def test_append_period_matches_full_regeneration(self, sample_config, tmp_path, n_shards):
+        """Test le mode ajout: identique à une régénération sur la période prolongée"""
+        import json
+        import yaml
+        from data_generation.schema import find_latest_dataset, load_dataset
+        from data_generation.synthetic_generator import SyntheticDataGenerator
+        
+        SyntheticDataGenerator(sample_config).generate_all(n_shards=n_shards)
+        output_dir = tmp_path / 'output'
+        version = next(output_dir.glob('metadata_*.yml')).stem[len('metadata_'):]
+        
+        # Deux ajouts successifs de 7 jours
+        for _ in range(2):
+            SyntheticDataGenerator(sample_config).append_period(version, 7)
+        
+        with open(sample_config) as f:
+            config = yaml.safe_load(f)
+        config['generation']['days_to_generate'] = 21
+        full_config = tmp_path / 'full_config.yml'
+        with open(full_config, 'w') as f:
+            yaml.dump(config, f)
+        full_generator = SyntheticDataGenerator(str(full_config))
+        if n_shards > 1:
+            full = full_generator.generate_sharded(n_shards=n_shards)
+        else:
+            # Sans shards, les identifiants sont salés par l'horodatage: mêmes profils
+            users_df = load_dataset(output_dir / f'users_{version}.parquet', 'users')
+            full = {
+                'poverty': full_generator.generate_poverty_data(users_df),
+                'mobility': full_generator.generate_mobility_data(users_df),
+            }
+        
+        for name, keys in (('poverty', ['user_id', 'timestamp']), ('mobility', ['trip_id'])):
+            expected = full[name].sort_values(keys, ignore_index=True)
+            parquet_path = find_latest_dataset(output_dir, name)
+            assert parquet_path.is_dir()
+            for path in (parquet_path, output_dir / f'{name}_{version}.csv'):
+                appended = load_dataset(path, name).sort_values(keys, ignore_index=True)
+                pd.testing.assert_frame_equal(appended, expected, check_categorical=False)
+        
+        with open(output_dir / f'metadata_{version}.yml') as f:
+            metadata = yaml.safe_load(f)
+        assert metadata['generation']['days'] == 21
+        assert metadata['datasets']['mobility']['rows'] == len(full['mobility'])
+        
+        # Manifeste réécrit: répertoire des parties, lignes et taille totales
+        with open(output_dir / f'manifest_{version}.json') as f:
+            entries = {(e['dataset'], e['format']): e for e in json.load(f)['files']}
+        mobility = entries[('mobility', 'parquet')]
+        assert Path(mobility['path']).is_dir()
+        assert mobility['rows'] == len(full['mobility'])
+        assert mobility['files'] == len(list(Path(mobility['path']).rglob('*.parquet')))
+    
+    def test_typed_schema_and_loaders(self, sample_config, tmp_path):
+        """Test le schéma typé: générateur, sauvegarde CSV/Parquet et chargeurs"""
+        from data_generation.schema import apply_schema, load_dataset, memory_usage_mb
+        from data_generation.synthetic_generator import SyntheticDataGenerator
+        
+        generator = SyntheticDataGenerator(sample_config)
+        users_df = generator.generate_user_profiles()
+        mobility_df = generator.generate_mobility_data(users_df)
+        
+        assert mobility_df['transport_mode'].dtype == 'category'
+        assert mobility_df['timestamp'].dtype.kind == 'M'
+        assert mobility_df['distance_km'].dtype == np.float32
+        assert mobility_df['hour_of_day'].dtype == np.int8
+        assert users_df['creation_timestamp'].dtype.kind == 'M'
+        assert memory_usage_mb(mobility_df) < memory_usage_mb(mobility_df.astype(object))
+        
+        # Relecture identique depuis le CSV et le Parquet
+        saved = generator.save_datasets(
+            users_df, generator.generate_poverty_data(users_df),
+            generator.generate_migration_data(users_df), mobility_df, tmp_path
+        )
+        for fmt in ('csv', 'parquet'):
+            loaded = load_dataset(saved[f'mobility_{fmt}'], 'mobility')
+            pd.testing.assert_frame_equal(loaded, mobility_df, check_categorical=False)
+        
+        # Backend pyarrow (opt-in)
+        arrow_df = apply_schema(mobility_df, 'mobility', dtype_backend='pyarrow')
+        assert isinstance(arrow_df['transport_mode'].dtype, pd.ArrowDtype)
+        assert arrow_df['distance_km'].sum() == pytest.approx(mobility_df['distance_km'].sum())
+    
+    def test_cdr_events_streamed_with_home_and_migration(self, sample_config, tmp_path):
+        """Test les événements CDR: écriture par blocs, domicile nocturne, migration"""
+        from data_generation.cdr_events import CDREventGenerator
+        from data_generation.synthetic_generator import SyntheticDataGenerator
+        from indicators.migration_flows import MigrationDetector
+        from utils.geodesy import haversine
+        
+        users_df = SyntheticDataGenerator(sample_config).generate_user_profiles()
+        movers = users_df.iloc[:10]
+        migration_df = pd.DataFrame({
+            'user_id': movers['user_id'],
+            'timestamp': pd.Timestamp('2024-01-03'),
+            'current_lat': movers['home_lat'] + 1.0,
+            'current_lon': movers['home_lon'],
+        })
+        
+        generator = CDREventGenerator(users_df, migration_df, n_days=14, events_per_day=15)
+        sink = generator.write_parquet(tmp_path / 'cdr.parquet', chunk_size=30, days_per_block=5)
+        assert sink.chunks == 4 * 3
+        
+        events = pd.read_parquet(tmp_path / 'cdr.parquet')
+        assert len(events) == sink.rows
+        assert set(events['event_type'].unique()) <= {'call', 'sms', 'data'}
+        assert (events.groupby('user_id', observed=True)['timestamp'].diff().dropna() >= pd.Timedelta(0)).all()
+        
+        # Domicile = positions nocturnes; après la migration, nouveau domicile
+        detector = MigrationDetector()
+        before = detector.detect_home_location(events[events['timestamp'] < '2024-01-03'].copy())
+        after = detector.detect_home_location(events[events['timestamp'] >= '2024-01-03'].copy())
+        for homes, shift in ((before, 0.0), (after, 1.0)):
+            homes = homes.set_index('user_id').loc[movers['user_id']]
+            distance = haversine(
+                homes['home_lat'], homes['home_lon'],
+                movers['home_lat'].to_numpy() + shift, movers['home_lon'].to_numpy()
+            )
+            assert np.median(distance) < 2
+    
+    def test_antenna_network_assignment(self, gadm_config):
+        """Test le rattachement des domiciles et trajets aux antennes les plus proches"""
+        import shapely
+        import yaml
+        from data_generation.synthetic_generator import SyntheticDataGenerator
+        
+        with open(gadm_config) as f:
+            config = yaml.safe_load(f)
+        config['antennas'] = {'n_antennas': 40}
+        with open(gadm_config, 'w') as f:
+            yaml.dump(config, f)
+        
+        generator = SyntheticDataGenerator(gadm_config)
+        network = generator.antenna_network
+        assert len(network) == 40
+        assert network.table['locality'].value_counts().min() >= 1
+        
+        # Cellules de couverture découpées par les limites GADM
+        coverage = generator.antenna_coverage()
+        assert len(coverage) == 40
+        assert abs(shapely.area(coverage.geometry.values).sum() - shapely.area(generator.gadm.geometry.values).sum()) < 1e-9
+        
+        users_df = generator.generate_user_profiles()
+        poverty_df = generator.generate_poverty_data(users_df)
+        mobility_df = generator.generate_mobility_data(users_df)
+        
+        # Antenne de pauvreté = antenne du domicile, stable d'une semaine à l'autre
+        home = users_df.set_index('user_id')['home_antenna'].astype(str)
+        assert (poverty_df['antenna_id'].astype(str).to_numpy() == home.loc[poverty_df['user_id']].to_numpy()).all()
+        
+        # Antennes des trajets: les plus proches des positions d'origine/destination
+        expected = network.assign(mobility_df['dest_lat'], mobility_df['dest_lon'])
+        assert (mobility_df['dest_antenna'].to_numpy() == expected).all()
+        assert list(mobility_df['origin_antenna'].cat.categories) == list(network.table['antenna_id'])
+    
     def test_generate_migration_data(self, sample_config):
         """Test la génération des données de migration"""
         from data_generation.synthetic_generator import SyntheticDataGenerator
@@ -143,6 +598,16 @@ class TestPovertyIndex:
             'district': np.random.choice(['Abidjan', 'Bouake'], n)
         })
     
+    @pytest.fixture
+    def weekly_panel(self, sample_data):
+        """Panel hebdomadaire (4 semaines, lignes mélangées)"""
+        rng = np.random.default_rng(7)
+        users = pd.concat([sample_data] * 4, ignore_index=True)
+        weeks = np.repeat(pd.date_range('2024-01-01', periods=4, freq='W-MON'), len(sample_data))
+        numeric = users.select_dtypes('number').columns
+        users[numeric] = users[numeric] * rng.lognormal(0, 0.2, (len(users), len(numeric)))
+        return users.assign(week_start=weeks).sample(frac=1, random_state=1)
+    
     def test_wealth_index_calculation(self, sample_data):
         """Test le calcul de l'indice de richesse"""
         from indicators.poverty_index import PovertyIndexCalculator
@@ -165,6 +630,249 @@ class TestPovertyIndex:
         assert 'gini_coefficient' in stats
         assert 0 <= stats['poverty_rate'] <= 1
         assert 0 <= stats['gini_coefficient'] <= 1
+    
+    def test_wealth_model_saved_and_reused_without_refit(self, sample_data, tmp_path):
+        """Test le modèle figé: sauvegarde versionnée, notation sans réajustement"""
+        import json
+        from indicators.poverty_index import PovertyIndexCalculator
+        
+        calculator = PovertyIndexCalculator()
+        df_result, _ = calculator.process(sample_data)
+        path = calculator.save_model(tmp_path / 'models' / 'wealth_model.json')
+        
+        frozen = PovertyIndexCalculator.from_model(path)
+        assert frozen.is_fitted
+        scored = frozen.transform(sample_data)
+        np.testing.assert_allclose(scored['wealth_index'], df_result['wealth_index'], atol=1e-9)
+        
+        # Un sous-lot garde les indices du modèle (pas de renormalisation min-max)
+        subset = sample_data.iloc[10:20]
+        df_subset, _ = frozen.process(subset, calculate_mpi=False)
+        np.testing.assert_allclose(
+            df_subset['wealth_index'], df_result['wealth_index'].iloc[10:20], atol=1e-9
+        )
+        assert not hasattr(frozen.scaler, 'mean_')
+        
+        # Poids repliés: un produit matrice-vecteur par utilisateur
+        model = frozen.model
+        X = scored[model.feature_columns].to_numpy(dtype=float)
+        np.testing.assert_allclose(
+            np.clip(X @ model.weights + model.intercept, 0, 1), scored['wealth_index']
+        )
+        
+        content = json.loads(path.read_text())
+        content['format_version'] = 0
+        path.write_text(json.dumps(content))
+        with pytest.raises(ValueError):
+            PovertyIndexCalculator.from_model(path)
+    
+    def test_out_of_core_wealth_index_matches_in_memory(self, sample_data, weekly_panel, tmp_path):
+        """Test l'indice hors mémoire (blocs + répartition) contre la PCA en mémoire"""
+        from indicators.poverty_index import PovertyIndexCalculator
+        
+        weekly_panel.to_parquet(tmp_path / 'poverty.parquet', index=False)
+        
+        expected = PovertyIndexCalculator().calculate_wealth_index(
+            PovertyIndexCalculator().prepare_features(weekly_panel)
+        ).set_index('user_id')['wealth_index']
+        
+        calculator = PovertyIndexCalculator()
+        summary = calculator.calculate_wealth_index_out_of_core(
+            tmp_path / 'poverty.parquet', tmp_path / 'wealth.parquet',
+            batch_size=37, bucket_rows=60, tmp_dir=tmp_path
+        )
+        result = pd.read_parquet(tmp_path / 'wealth.parquet').set_index('user_id')
+        
+        assert summary['users'] == len(sample_data)
+        assert summary['buckets'] > 1
+        assert result.index.is_unique
+        assert result['wealth_index'].between(0, 1).all()
+        np.testing.assert_allclose(
+            result['wealth_index'].reindex(expected.index), expected, atol=1e-6
+        )
+        assert list(tmp_path.glob('tmp*')) == []
+    
+    def test_incremental_feature_aggregator(self, weekly_panel, tmp_path):
+        """Test les agrégats incrémentaux (semaine par semaine, persistés)"""
+        from indicators.feature_aggregator import UserFeatureAggregator
+        from indicators.poverty_index import PovertyIndexCalculator
+        
+        calculator = PovertyIndexCalculator()
+        path = tmp_path / 'user_features.parquet'
+        weeks = [week for _, week in weekly_panel.groupby('week_start')]
+        # Première semaine sans une partie des utilisateurs (arrivées ultérieures)
+        weeks[0] = weeks[0][weeks[0]['user_id'] < 'USR_030']
+        
+        # Chaque semaine en deux lots (un fichier par shard)
+        for week in weeks:
+            for batch in (week.iloc[::2], week.iloc[1::2]):
+                aggregator = UserFeatureAggregator.load_or_create(path, calculator.feature_columns)
+                assert aggregator.update(batch) == len(batch)
+                aggregator.save(path)
+        
+        aggregator = UserFeatureAggregator.load(path)
+        assert aggregator.update(weeks[1]) == 0  # couples utilisateur-semaine déjà intégrés
+        assert aggregator.update(pd.concat([weeks[2].iloc[:3], weeks[2].iloc[:3]])) == 0
+        
+        history = pd.concat(weeks)
+        expected = history.groupby('user_id')[calculator.feature_columns]
+        means = aggregator.means().set_index('user_id').sort_index()
+        variances = aggregator.variances().set_index('user_id').sort_index()
+        assert aggregator.n_users == 50 and len(aggregator.weeks) == 4
+        np.testing.assert_allclose(means[calculator.feature_columns], expected.mean(), rtol=1e-10)
+        np.testing.assert_allclose(variances[calculator.feature_columns], expected.var(), rtol=1e-8)
+        assert (aggregator.counts()['data_mb'].sort_index() == expected.size()).all()
+        assert (means['phone_type'] == history.groupby('user_id')['phone_type'].first()).all()
+        
+        # Même indice que le regroupement de l'historique complet
+        from_history = PovertyIndexCalculator().calculate_wealth_index(
+            PovertyIndexCalculator().prepare_features(history)
+        ).set_index('user_id')['wealth_index']
+        from_aggregates = PovertyIndexCalculator().calculate_wealth_index(
+            PovertyIndexCalculator().prepare_features(aggregator.means())
+        ).set_index('user_id')['wealth_index']
+        np.testing.assert_allclose(from_aggregates.reindex(from_history.index), from_history, atol=1e-9)
+
+    
+    def test_alkire_foster_matches_bruteforce(self):
+        """Test le moteur AF matriciel (tous les k, par zone) contre des boucles"""
+        from indicators.alkire_foster import alkire_foster
+        
+        rng = np.random.default_rng(3)
+        n = 2000
+        deprivations = pd.DataFrame(rng.random((n, 4)) < [0.2, 0.35, 0.5, 0.3], columns=list('abcd'))
+        weights = pd.Series([0.4, 0.2, 0.2, 0.2], index=list('abcd'))
+        groups = pd.DataFrame({
+            'region': rng.choice(['R1', 'R2', 'R3'], n),
+            'department': rng.choice(['D1', 'D2'], n),
+        })
+        groups['department'] = groups['region'] + '_' + groups['department']
+        groups.loc[:99, ['region', 'department']] = np.nan  # zone inconnue: groupe distinct
+        cutoffs = [0.2, 0.4, 0.6, 1.0, 1 / 3]
+        
+        results = alkire_foster(deprivations, weights, cutoffs, groups)
+        scores = deprivations.to_numpy() @ weights.to_numpy()
+        
+        def expected(mask, k):
+            poor = mask & (scores >= k - 1e-9)
+            censored = (deprivations.to_numpy() & poor[:, None]).sum(axis=0) / mask.sum()
+            m0 = scores[poor].sum() / mask.sum()
+            return poor.sum() / mask.sum(), scores[poor].mean() if poor.any() else np.nan, m0, censored
+        
+        for k in cutoffs:
+            H, A, M0, censored = expected(np.ones(n, bool), k)
+            row = results['measures'].loc[k]
+            np.testing.assert_allclose([row['H'], row['A'], row['M0']], [H, A, M0])
+            np.testing.assert_allclose(results['censored_headcounts'].loc[k], censored)
+            assert results['contributions'].loc[k].sum() == pytest.approx(1.0)
+            
+            for level in ['region', 'department']:
+                by_level = results[f'by_{level}'].xs(k, level='k')
+                assert by_level['contribution'].sum() == pytest.approx(1.0)
+                assert by_level['population'].sum() == n
+                for zone, zone_row in by_level.iterrows():
+                    mask = groups[level].isna().to_numpy() if pd.isna(zone) else groups[level].to_numpy() == zone
+                    H, A, M0, censored = expected(mask, k)
+                    np.testing.assert_allclose([zone_row['H'], zone_row['A'], zone_row['M0']], [H, A, M0])
+                    np.testing.assert_allclose(zone_row[[f'censored_{c}' for c in 'abcd']], censored)
+    
+    def test_process_reports_mpi_by_admin_level(self, sample_data):
+        """Test l'IPM du pipeline: mesures par k et décomposition régionale"""
+        from indicators.poverty_index import PovertyIndexCalculator
+        
+        data = sample_data.assign(region=np.where(np.arange(len(sample_data)) % 2, 'Nord', 'Sud'))
+        calculator = PovertyIndexCalculator()
+        df_result, stats = calculator.process(data)
+        
+        measures = calculator.mpi_results['measures']
+        assert measures['H'].is_monotonic_decreasing
+        assert measures.loc[1 / 3, 'H'] == pytest.approx(df_result['is_mpi_poor'].mean())
+        assert measures.loc[1 / 3, 'A'] == pytest.approx(df_result['poverty_intensity'].mean())
+        assert set(calculator.mpi_results['by_region'].index.get_level_values('region')) == {'Nord', 'Sud'}
+        assert 1 / 3 in stats['mpi_by_k']
+
+    
+    def test_statistics_by_region_weighted_by_household(self, sample_data):
+        """Test les statistiques par niveau administratif et la pondération des ménages"""
+        from indicators.poverty_index import PovertyIndexCalculator
+        
+        rng = np.random.default_rng(5)
+        data = sample_data.assign(
+            region=rng.choice(['Nord', 'Sud'], len(sample_data)),
+            household_size=rng.integers(1, 9, len(sample_data))
+        )
+        _, stats = PovertyIndexCalculator().process(data)
+        
+        assert set(stats['by_region']['wealth_index_mean']) == {'Nord', 'Sud'}
+        assert set(stats['inequality_by_region']) == {'Nord', 'Sud'}
+        assert stats['inequality']['weighted_by'] == 'household_size'
+        assert stats['inequality']['population'] == data['household_size'].sum()
+        decomposition = stats['theil_decomposition_region']['theil_t']
+        assert decomposition['within'] + decomposition['between'] == pytest.approx(stats['inequality']['theil_t'], abs=1e-4)
+
+
+class TestInequality:
+    """Tests pour les indicateurs d'inégalité"""
+    
+    @staticmethod
+    def reference(values):
+        """Mesures sur un échantillon non pondéré (formules directes)"""
+        y = np.sort(values)
+        n = len(y)
+        gini = (2 * np.arange(1, n + 1) - n - 1) @ y / (n * y.sum())
+        mu = y.mean()
+        
+        def lorenz(p):
+            return np.interp(p, np.arange(n + 1) / n, np.r_[0, np.cumsum(y)] / y.sum())
+        
+        return {
+            'gini': gini,
+            'theil_t': np.mean(y / mu * np.log(y / mu)),
+            'theil_l': np.mean(np.log(mu / y)),
+            'palma_ratio': (1 - lorenz(0.9)) / lorenz(0.4),
+            's80_s20_ratio': (1 - lorenz(0.8)) / lorenz(0.2),
+        }
+    
+    def test_weighted_measures_match_replicated_sample(self):
+        """Test les mesures pondérées contre l'échantillon répliqué selon les poids"""
+        from indicators.inequality import inequality_measures
+        
+        rng = np.random.default_rng(11)
+        values = rng.lognormal(0, 0.8, 400)
+        weights = rng.integers(1, 8, 400)
+        
+        measures = inequality_measures(values, weights)
+        expected = self.reference(np.repeat(values, weights))
+        for name, value in expected.items():
+            assert measures[name] == pytest.approx(value, rel=1e-9), name
+        assert measures['population'] == weights.sum()
+        
+        with pytest.raises(ValueError):
+            inequality_measures(values, np.zeros(400))
+    
+    def test_group_measures_and_theil_decomposition(self):
+        """Test les mesures par zone (un tri) et la décomposition intra/inter"""
+        from indicators.inequality import decompose_by_group, inequality_measures
+        
+        rng = np.random.default_rng(12)
+        groups = rng.choice(['A', 'B', 'C', 'D'], 3000)
+        values = rng.lognormal(np.where(groups == 'A', 1.0, 0.0), 0.5)
+        weights = rng.integers(1, 6, 3000)
+        
+        result = decompose_by_group(values, groups, weights)
+        for zone, row in result['groups'].iterrows():
+            mask = groups == zone
+            expected = inequality_measures(values[mask], weights[mask])
+            for name in ['gini', 'theil_t', 'theil_l', 'palma_ratio', 's80_s20_ratio', 'mean']:
+                assert row[name] == pytest.approx(expected[name], rel=1e-9), (zone, name)
+        
+        national = inequality_measures(values, weights)
+        for name in ['theil_t', 'theil_l']:
+            decomposition = result['decomposition'][name]
+            assert decomposition['total'] == pytest.approx(national[name], rel=1e-9)
+            assert decomposition['within'] + decomposition['between'] == pytest.approx(national[name])
+            assert 0 < decomposition['between_share'] < 1
+        assert result['groups']['population_share'].sum() == pytest.approx(1.0)
 
 
 class TestMobilityMetrics:
@@ -201,6 +909,37 @@ class TestMobilityMetrics:
         assert 'destination' in od_matrix.columns
         assert 'trips' in od_matrix.columns
     
+    def test_h3_od_matrix(self, sample_trips):
+        """Test la matrice O-D par cellules H3 calculées depuis les coordonnées"""
+        from indicators.mobility_metrics import MobilityMetrics
+        import h3
+        from utils.h3_index import MISSING_CELL, H3Indexer
+        
+        trips = sample_trips.assign(
+            origin_lat=np.random.uniform(5.3, 5.4, len(sample_trips)),
+            origin_lon=np.random.uniform(-4.1, -4.0, len(sample_trips)),
+            dest_lat=np.random.uniform(5.3, 5.4, len(sample_trips)),
+            dest_lon=np.random.uniform(-4.1, -4.0, len(sample_trips))
+        )
+        
+        metrics = MobilityMetrics(h3_resolution=6)
+        od_matrix = metrics.calculate_h3_od_matrix(trips)
+        
+        assert od_matrix['trips'].sum() == len(trips)
+        assert od_matrix['origin'].dtype == np.int64
+        
+        # Chaque résolution est la cellule contenant le point (pas le parent de la plus fine)
+        lats = np.append(np.random.uniform(4.5, 10.5, 2000), [np.nan, 5.0])
+        lons = np.append(np.random.uniform(-8.5, -2.5, 2000), [-4.0, -4.0])
+        cells = H3Indexer([5, 7, 9]).index(lats, lons)
+        for res, values in cells.items():
+            expected = [h3.str_to_int(h3.latlng_to_cell(lat, lon, res)) for lat, lon in zip(lats[:-2], lons[:-2])]
+            assert (values[:-2] == expected).all()
+        
+        # Coordonnées manquantes: cellule nulle, pas celle d'un autre point
+        assert cells[9][-2] == MISSING_CELL
+        assert cells[9][-1] != MISSING_CELL
+    
     def test_modal_split(self, sample_trips):
         """Test le calcul de la répartition modale"""
         from indicators.mobility_metrics import MobilityMetrics
@@ -216,5 +955,261 @@ class TestMobilityMetrics:
             assert 99 <= total <= 101
 
 
+
+class TestTemporalFlows:
+    """Tests pour le générateur de flux temporels"""
+    
+    def test_seasonal_flows_vectorized(self):
+        """Test la saisonnalité et la cohérence des flux générés"""
+        from data_generation.temporal_flows import TemporalFlowGenerator
+        
+        generator = TemporalFlowGenerator(n_days=2 * 365, daily_movements=200)
+        df = generator.generate()
+        
+        assert (df['origin'] != df['destination']).all()
+        assert df['date'].min() == pd.Timestamp('2025-01-01')
+        assert df['date'].dt.year.nunique() == 2
+        assert df['flow_count'].between(1, 19).all()
+        
+        # Décembre (fêtes) plus intense que mai (saison des pluies), weekend réduit
+        per_day = df.groupby('date').size()
+        assert per_day[per_day.index.month == 12].mean() > per_day[per_day.index.month == 5].mean()
+        assert per_day[per_day.index.weekday >= 5].mean() < per_day[per_day.index.weekday < 5].mean()
+    
+    def test_parquet_artifact_cache(self, tmp_path):
+        """Test l'écriture, la relecture et l'invalidation de l'artefact"""
+        from data_generation.temporal_flows import load_temporal_flows
+        
+        path = tmp_path / 'temporal_flows.parquet'
+        first = load_temporal_flows(path, n_days=30)
+        mtime = path.stat().st_mtime_ns
+        
+        again = load_temporal_flows(path, n_days=30)
+        assert path.stat().st_mtime_ns == mtime
+        pd.testing.assert_frame_equal(first, again)
+        
+        # Paramètres différents: l'artefact est régénéré
+        longer = load_temporal_flows(path, n_days=60)
+        assert longer['date'].max() > first['date'].max()
+
+
+class TestDatasetExporter:
+    """Tests pour l'exporteur de datasets"""
+    
+    @pytest.fixture
+    def sample_datasets(self):
+        """Crée deux petits datasets"""
+        n = 200
+        poverty = pd.DataFrame({
+            'user_id': [f'u{i % 20}' for i in range(n)],
+            'region': np.random.choice(['Abidjan', 'Gbeke'], n),
+            'week_start': np.random.choice(['2024-01-01', '2024-01-08'], n),
+            'data_mb': np.random.uniform(0, 100, n)
+        })
+        users = pd.DataFrame({'user_id': [f'u{i}' for i in range(20)]})
+        return {'users': users, 'poverty': poverty}
+    
+    def test_export_formats_and_manifest(self, sample_datasets, tmp_path):
+        """Test la sélection des formats, l'encodage dictionnaire et le manifeste"""
+        import json
+        from utils.export import DatasetExporter
+        
+        exporter = DatasetExporter(formats=['parquet'])
+        files = exporter.export(sample_datasets, tmp_path, version='v1')
+        
+        assert set(files) == {'users_parquet', 'poverty_parquet', 'manifest'}
+        assert not list(tmp_path.glob('*.csv'))
+        
+        poverty = pd.read_parquet(files['poverty_parquet'])
+        assert isinstance(poverty['region'].dtype, pd.CategoricalDtype)
+        assert np.allclose(poverty['data_mb'], sample_datasets['poverty']['data_mb'])
+        
+        with open(files['manifest']) as f:
+            manifest = json.load(f)
+        assert manifest['compression'] == 'zstd'
+        assert {e['dataset'] for e in manifest['files']} == {'users', 'poverty'}
+        assert all(e['bytes'] > 0 for e in manifest['files'])
+    
+    def test_export_partitioned(self, sample_datasets, tmp_path):
+        """Test le partitionnement Hive par dataset"""
+        from utils.export import DatasetExporter
+        
+        exporter = DatasetExporter(
+            formats=['csv', 'parquet'],
+            partition_cols={'poverty': ['region', 'week_start']}
+        )
+        files = exporter.export(sample_datasets, tmp_path, version='v1')
+        
+        partitioned = Path(files['poverty_parquet'])
+        assert partitioned.is_dir()
+        assert len(list(partitioned.glob('region=*/week_start=*/*.parquet'))) == 4
+        assert len(pd.read_parquet(partitioned)) == 200
+        assert len(pd.read_csv(files['poverty_csv'])) == 200
+        
+        with pytest.raises(ValueError):
+            DatasetExporter(formats=['xlsx'])
+
+
+class TestGeodesy:
+    """Tests pour le module de géodésie vectorisée"""
+    
+    def test_haversine_and_destination_roundtrip(self):
+        """Test la cohérence distance / azimut / point de destination"""
+        from utils.geodesy import destination_point, haversine, initial_bearing
+        
+        # Paris -> Londres: ~343.5 km
+        assert abs(haversine(48.8566, 2.3522, 51.5074, -0.1278) - 343.5) < 1
+        
+        rng = np.random.default_rng(0)
+        lat = rng.uniform(4.5, 10.5, 1000)
+        lon = rng.uniform(-8.5, -2.5, 1000)
+        distance = rng.exponential(50, 1000)
+        bearing = rng.uniform(0, 360, 1000)
+        
+        dest_lat, dest_lon = destination_point(lat, lon, distance, bearing)
+        assert np.allclose(haversine(lat, lon, dest_lat, dest_lon), distance, atol=1e-6)
+        
+        computed = initial_bearing(lat, lon, dest_lat, dest_lon)
+        diff = np.abs((computed - bearing + 180) % 360 - 180)
+        assert (diff[distance > 1e-3] < 1e-6).all()
+    
+    def test_pairwise_distance_matrix(self):
+        """Test la matrice de distances par blocs en float32"""
+        from utils.geodesy import haversine, pairwise_distance_matrix
+        
+        rng = np.random.default_rng(1)
+        lat = rng.uniform(4.5, 10.5, 50)
+        lon = rng.uniform(-8.5, -2.5, 50)
+        
+        matrix = pairwise_distance_matrix(lat, lon, lat[:7], lon[:7], chunk_size=8)
+        expected = haversine(lat[:, None], lon[:, None], lat[None, :7], lon[None, :7])
+        
+        assert matrix.dtype == np.float32
+        assert matrix.shape == (50, 7)
+        assert np.allclose(matrix, expected, atol=0.05)
+    
+    def test_migration_distances_from_coordinates(self):
+        """Test le calcul des distances de migration manquantes"""
+        from indicators.migration_flows import MigrationDetector
+        
+        migrations = pd.DataFrame({
+            'origin_lat': [5.36, 7.68], 'origin_lon': [-4.0, -5.03],
+            'current_lat': [7.68, 7.68], 'current_lon': [-5.03, -5.03],
+            'current_region': ['Gbeke', 'Gbeke']
+        })
+        
+        detector = MigrationDetector()
+        result = detector.add_distances(migrations)
+        assert 270 < result['distance_km'].iloc[0] < 290
+        assert result['distance_km'].iloc[1] == 0
+        
+        matrix = detector.calculate_zone_distance_matrix(result)
+        assert matrix.shape == (1, 1)
+
+
+class TestAntennaNetwork:
+    """Tests pour le réseau d'antennes"""
+    
+    def test_nearest_matches_brute_force_and_voronoi(self):
+        """Test le plus proche voisin (cKDTree) et les cellules de couverture"""
+        import shapely
+        from utils.antenna_network import AntennaNetwork
+        from utils.geodesy import haversine
+        
+        rng = np.random.default_rng(3)
+        network = AntennaNetwork(rng.uniform(4.5, 10.5, 200), rng.uniform(-8.5, -2.5, 200))
+        lat = rng.uniform(4.5, 10.5, 2000)
+        lon = rng.uniform(-8.5, -2.5, 2000)
+        
+        distances = haversine(
+            lat[:, None], lon[:, None],
+            network.table['latitude'].to_numpy()[None, :], network.table['longitude'].to_numpy()[None, :]
+        )
+        assert (network.nearest(lat, lon) == distances.argmin(axis=1)).all()
+        assert network.assign(lat[:3], lon[:3]).categories.equals(pd.Index(network.table['antenna_id']))
+        
+        boundary = shapely.box(-8.5, 4.5, -2.5, 10.5)
+        cells = network.voronoi_cells(boundary)
+        assert len(cells) == len(network)
+        assert shapely.contains(cells.geometry.values, shapely.points(cells['longitude'], cells['latitude'])).all()
+        assert abs(shapely.area(cells.geometry.values).sum() - boundary.area) < 1e-6
+
+
+class TestIPF:
+    """Tests pour l'ajustement proportionnel itératif"""
+    
+    def test_ipf_large_table_with_structural_zeros(self):
+        """Test la convergence sur 10^5 cellules et la conservation des zéros"""
+        import time
+        from utils.ipf import ipf
+        
+        rng = np.random.default_rng(0)
+        seed = rng.random((20, 10, 25, 40))
+        seed[0, 0] = 0
+        row_target = rng.random((20, 10)) + 0.1
+        row_target[0, 0] = 0
+        col_target = rng.random((25, 40)) + 0.1
+        
+        start = time.perf_counter()
+        fitted, n_iter = ipf(seed, [((0, 1), row_target), ((2, 3), col_target)], tol=1e-8)
+        assert time.perf_counter() - start < 5
+        
+        assert fitted.size == 200_000 and n_iter < 100
+        assert (fitted[0, 0] == 0).all()
+        assert np.isclose(fitted.sum(), 1)
+        assert np.allclose(fitted.sum(axis=(2, 3)), row_target / row_target.sum(), atol=1e-8)
+        assert np.allclose(fitted.sum(axis=(0, 1)), col_target / col_target.sum(), atol=1e-8)
+
+
+class TestAliasSampler:
+    """Tests pour l'échantillonneur par tables d'alias"""
+    
+    def test_alias_frequencies_and_groups(self):
+        """Test les fréquences tirées, les poids nuls et le conditionnement par groupe"""
+        from utils.alias_sampler import AliasSampler
+        
+        rng = np.random.default_rng(0)
+        weights = rng.exponential(1, 1000)
+        weights[:5] = 0
+        sampler = AliasSampler(weights)
+        codes = sampler.sample(rng, 2_000_000)
+        
+        freq = np.bincount(codes, minlength=1000) / len(codes)
+        assert np.abs(freq - weights / weights.sum()).max() < 5e-4
+        assert (freq[:5] == 0).all()
+        
+        grouped = AliasSampler([[1, 0, 0], [0.2, 0.3, 0.5]], values=['a', 'b', 'c'])
+        groups = np.repeat([0, 1], 100_000)
+        values = grouped.sample(rng, groups=groups)
+        assert (values[:100_000] == 'a').all()
+        shares = pd.Series(values[100_000:]).value_counts(normalize=True)
+        assert np.allclose(shares[['a', 'b', 'c']], [0.2, 0.3, 0.5], atol=0.01)
+        
+        with pytest.raises(ValueError):
+            AliasSampler([0, 0])
+        with pytest.raises(ValueError):
+            grouped.sample(rng, 10)
+
+
+class TestBenchmarks:
+    """Tests pour la comparaison des résultats de benchmarks"""
+    
+    def test_compare_flags_regressions(self):
+        """Test la détection des régressions de temps et de mémoire"""
+        sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+        from run_benchmarks import compare_results
+        
+        def results(seconds, rss):
+            stage = {'seconds': seconds, 'rows': 1000, 'rows_per_s': 1000 / seconds, 'peak_rss_mb': rss}
+            return {'scale_factors': {'10k': {'n_users': 10000, 'stages': {'generate_mobility_data': stage}}}}
+        
+        baseline = results(2.0, 500.0)
+        
+        rows = compare_results(baseline, results(2.1, 510.0))
+        assert not any(row['regression'] for row in rows)
+        
+        rows = compare_results(baseline, results(3.0, 800.0))
+        assert {row['metric'] for row in rows if row['regression']} == {'seconds', 'peak_rss_mb'}
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])